@@ -1,16 +1,48 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, g, has_request_context
 import mysql.connector
 from flask_cors import CORS
 import os
 from dotenv import load_dotenv
-import bcrypt
 import re
+import json
+import time
+import base64
+import hmac
+import csv
+import io
+import threading
+import logging
+import functools
+from decimal import Decimal
 from datetime import datetime
+from db_pool import ConnectionPool
+from db_router import ReplicaRouter
+from password_hasher import PasswordHasher, HasherBusy
+from search_index import InterestAreaIndex
+from data_version import DataVersionWatcher
+from metrics import MetricsRegistry, Gauges, begin_request, end_request, current_request
+from slow_query import SlowQueryLog
+from app_logging import setup_logging, get_logger, log_event, dropped_records, Sampler
+from session_tokens import SessionTokens, InvalidToken, parse_keys
+from rate_limit import RouteRateLimit, RateLimited, parse_rate
+from ttl_cache import TTLCache
+from response_encoding import FastJSONProvider, choose_encoding, should_compress, compress
 
 load_dotenv() 
 
+setup_logging(os.getenv('LOG_LEVEL', 'INFO'), os.getenv('LOG_FORMAT', 'json'))
+log = get_logger('app')
+request_log_sampler = Sampler(float(os.getenv('LOG_REQUEST_SAMPLE_RATE', '0.01')))
+
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"])
+
+# orjson-backed jsonify() with the same bytes as Flask's own encoder;
+# JSON_ENCODER=json keeps the stdlib. Bodies of at least COMPRESS_MIN_SIZE
+# bytes are gzip/brotli-compressed for clients that accept it ("off" disables).
+app.json = FastJSONProvider(app, os.getenv('JSON_ENCODER', 'orjson'))
+compress_min_size = os.getenv('COMPRESS_MIN_SIZE', '1024')
+compress_min_size = None if compress_min_size in ('', '0', 'off') else int(compress_min_size)
 
 config = {
     'user': os.getenv('DB_USER', 'apalu3'),
@@ -21,8 +53,368 @@ config = {
 }
 
 
+# Optional read replica (same credentials unless overridden). Read-only
+# handlers use it while its lag is under DB_REPLICA_MAX_LAG seconds and the
+# session token shows no write in the last DB_REPLICA_STICKY seconds.
+replica_config = dict(
+    config,
+    host=os.getenv('DB_REPLICA_HOST'),
+    port=int(os.getenv('DB_REPLICA_PORT', str(config['port']))),
+    user=os.getenv('DB_REPLICA_USER', config['user']),
+    password=os.getenv('DB_REPLICA_PASSWORD', config['password'])
+) if os.getenv('DB_REPLICA_HOST') else None
+
+
+pool_config = {
+    'size': int(os.getenv('DB_POOL_SIZE', '5')),
+    'max_overflow': int(os.getenv('DB_POOL_MAX_OVERFLOW', '10')),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', '30')),
+    'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+    'pre_ping': os.getenv('DB_POOL_PRE_PING', '1') == '1',
+    'reset_session': os.getenv('DB_POOL_RESET_SESSION', '1') == '1'
+}
+
+app_metrics = MetricsRegistry()
+
+
+def slow_query_context():
+    if has_request_context():
+        return {"route": request.url_rule.rule if request.url_rule else request.path,
+                "method": request.method}
+    return {}
+
+
+slow_query_log = SlowQueryLog(
+    threshold=float(os.getenv('SLOW_QUERY_MS', '200')) / 1000,
+    explain_interval=float(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', '60')),
+    capacity=int(os.getenv('SLOW_QUERY_LOG_SIZE', '100')),
+    connect=lambda: mysql.connector.connect(autocommit=True, **config),
+    context=slow_query_context
+)
+
+
+def wrap_cursor(cursor):
+    return slow_query_log.wrap_cursor(app_metrics.wrap_cursor(cursor))
+
+
+db_pool = None
+
+
+def get_db_pool():
+    global db_pool
+    if db_pool is None:
+        db_pool = ConnectionPool(
+            config, autocommit=True,
+            cursor_wrapper=wrap_cursor,
+            on_checkout=app_metrics.checkout.observe,
+            **pool_config
+        )
+    return db_pool
+
+
 def get_db_connection():
-    return mysql.connector.connect(**config, autocommit=True)
+    return get_db_pool().connect()
+
+
+replica_pool = None
+replica_router = None
+_replica_init_lock = threading.Lock()
+
+
+def get_replica_pool():
+    global replica_pool
+    if replica_pool is None:
+        replica_pool = ConnectionPool(
+            replica_config, autocommit=True,
+            cursor_wrapper=wrap_cursor,
+            on_checkout=app_metrics.checkout.observe,
+            **pool_config
+        )
+    return replica_pool
+
+
+def get_replica_router():
+    """Lag monitor behind get_read_connection(); None without DB_REPLICA_HOST"""
+    global replica_router
+    if replica_router is None and replica_config is not None:
+        with _replica_init_lock:
+            if replica_router is None:
+                replica_router = ReplicaRouter(
+                    lambda: mysql.connector.connect(autocommit=True, **replica_config),
+                    max_lag=float(os.getenv('DB_REPLICA_MAX_LAG', '5')),
+                    sticky_window=float(os.getenv('DB_REPLICA_STICKY', '10')),
+                    lag_interval=float(os.getenv('DB_REPLICA_LAG_INTERVAL', '1'))
+                ).start()
+    return replica_router
+
+
+def get_read_connection(session=None):
+    """
+    Connection for a read-only handler: the replica when it is caught up
+    and the `session` claims show no recent write, otherwise the primary.
+    """
+    router = get_replica_router()
+    if router is not None and router.use_replica(session.get('wrt') if session else None):
+        try:
+            return get_replica_pool().connect()
+        except mysql.connector.Error as e:
+            router.replica_failed(e)
+    return get_db_connection()
+
+
+def mark_write(user_id, session=None):
+    """
+    Session fields for a write handler's response: a token stamped with
+    the write time, so reads made with it stay on the primary for
+    DB_REPLICA_STICKY seconds whichever worker serves them. It keeps the
+    expiry of the current `session`; without one it gets a full SESSION_TTL.
+    """
+    return session_response(user_id, wrote_at=time.time(),
+                            expires_at=session['exp'] if session else None)
+
+
+majors_engine = None
+interest_area_index = None
+data_versions = None
+_reference_init_lock = threading.Lock()
+
+
+def get_majors_engine():
+    """In-memory /majors engine, only when MAJORS_ENGINE=memory"""
+    global majors_engine
+    if majors_engine is None and os.getenv('MAJORS_ENGINE') == 'memory':
+        with _reference_init_lock:
+            if majors_engine is None:
+                from majors_engine import MajorsEngine
+                majors_engine = MajorsEngine(
+                    get_db_connection,
+                    poll_interval=float(os.getenv('MAJORS_ENGINE_POLL', '5')),
+                    dumps=functools.partial(app.json.dumps, separators=(",", ":"))
+                ).start()
+    return majors_engine
+
+
+def get_interest_area_index():
+    """Autocomplete index for /search-interest-areas, built on first use"""
+    global interest_area_index
+    if interest_area_index is None:
+        with _reference_init_lock:
+            if interest_area_index is None:
+                interest_area_index = InterestAreaIndex(
+                    get_db_connection,
+                    poll_interval=float(os.getenv('INTEREST_AREA_INDEX_POLL', '30'))
+                ).start()
+    return interest_area_index
+
+
+def get_data_versions():
+    """DataVersion counters behind the reference-data ETags"""
+    global data_versions
+    if data_versions is None:
+        with _reference_init_lock:
+            if data_versions is None:
+                # Versions come from wherever the data is read, so a lagging
+                # replica's rows are never labelled with the primary's version
+                data_versions = DataVersionWatcher(
+                    get_read_connection,
+                    poll_interval=float(os.getenv('DATA_VERSION_POLL', '2'))
+                ).start()
+    return data_versions
+
+
+REFERENCE_CACHE_CONTROL = f"public, max-age={int(os.getenv('REFERENCE_MAX_AGE', '60'))}"
+
+
+def reference_etag(names, engine_backed=False):
+    """ETag for data tracked by the DataVersion rows in `names`"""
+    overrides = None
+    if engine_backed and get_majors_engine() is not None:
+        # Label engine responses with the snapshot they were built from
+        overrides = {'major_stats': get_majors_engine().current.version}
+    return get_data_versions().etag(names, overrides)
+
+
+def conditional_get(*names, engine_backed=False):
+    """
+    ETag + Cache-Control for reference data. A matching If-None-Match is
+    answered with 304 before the view runs, so it costs no DB work.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = reference_etag(names, engine_backed)
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = REFERENCE_CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
+
+
+# SESSION_KEYS="kid:secret,..." - the first key signs, all of them verify.
+# Without it each process makes up a key, so tokens die on restart and are
+# not shared between workers.
+session_tokens = SessionTokens(
+    parse_keys(os.getenv('SESSION_KEYS')),
+    ttl=int(os.getenv('SESSION_TTL', str(12 * 3600)))
+)
+app_metrics.add(Gauges('sessions', "Session token deny-list", session_tokens.stats))
+
+# A password change stores the user's cutoff in SessionRevocation; other
+# processes reject the older tokens once their cached copy of the cutoff
+# (SESSION_REVOCATION_TTL seconds) expires.
+session_revocations = TTLCache(
+    capacity=int(os.getenv('SESSION_REVOCATION_CACHE_SIZE', '100000')),
+    ttl=float(os.getenv('SESSION_REVOCATION_TTL', '5'))
+)
+app_metrics.add(Gauges('session_revocations', "Per-user session revocation cutoff cache",
+                       session_revocations.stats))
+
+REVOKED_BEFORE_QUERY = "SELECT revoked_before FROM SessionRevocation WHERE user_id = %s"
+REVOKE_SESSIONS_QUERY = """
+    INSERT INTO SessionRevocation (user_id, revoked_before) VALUES (%s, %s)
+    ON DUPLICATE KEY UPDATE revoked_before = GREATEST(revoked_before, VALUES(revoked_before))
+"""
+
+
+def revoked_before_value(row):
+    """Cutoff from the REVOKED_BEFORE_QUERY row as a float like "iat" (None if never revoked)"""
+    return float(row['revoked_before']) if row else None
+
+
+def load_revoked_before(user_id):
+    # Primary: a lagging replica would miss a cutoff written moments ago
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(REVOKED_BEFORE_QUERY, (user_id,))
+        return revoked_before_value(cursor.fetchone())
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def revocation_error(claims, revoked_before):
+    try:
+        session_tokens.check_revoked(claims, revoked_before)
+    except InvalidToken as e:
+        return str(e), 401
+    return None
+
+
+def bearer_token(authorization):
+    scheme, _, token = (authorization or '').partition(' ')
+    return token.strip() if scheme.lower() == 'bearer' else None
+
+
+def check_session(authorization, user_id=None, check_revocation=True):
+    """
+    Verify the Authorization header. Returns (claims, None), or
+    (None, (error, status)) when the token is missing, invalid, revoked,
+    or belongs to someone other than `user_id`. The stored revocation
+    cutoff costs one primary-key read per user per SESSION_REVOCATION_TTL;
+    check_revocation=False leaves it to the caller (asgi_app reads it with
+    aiomysql).
+    """
+    token = bearer_token(authorization)
+    if not token:
+        return None, ("Authentication required", 401)
+    try:
+        claims = session_tokens.verify(token)
+    except InvalidToken as e:
+        return None, (str(e), 401)
+    if user_id is not None and str(claims['uid']) != str(user_id):
+        return None, ("Forbidden", 403)
+    if check_revocation:
+        error = revocation_error(claims, session_revocations.get(
+            claims['uid'], lambda: load_revoked_before(claims['uid'])))
+        if error:
+            return None, error
+    return claims, None
+
+
+def session_response(user_id, wrote_at=None, expires_at=None):
+    token, expires_at = session_tokens.issue(user_id, wrote_at, expires_at)
+    return {"token": token, "expires_at": expires_at}
+
+
+def require_session(view):
+    """
+    Only the owner of the `user_id` in the URL (or JSON body) gets through;
+    the verified claims are left in g.session.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        user_id = kwargs.get('user_id')
+        if user_id is None:
+            user_id = (request.get_json(silent=True) or {}).get('user_id')
+        claims, error = check_session(request.headers.get('Authorization'), user_id)
+        if error:
+            response = jsonify({"error": error[0]})
+            response.status_code = error[1]
+            if error[1] == 401:
+                response.headers['WWW-Authenticate'] = 'Bearer'
+            return response
+        g.session = claims
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_started = time.perf_counter()
+    g.metrics_token = begin_request()
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('metrics_started')
+    if started is not None:
+        # Route template, not the raw path, to keep label cardinality bounded
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        elapsed = time.perf_counter() - started
+        stats = current_request()
+        app_metrics.observe_request(route, request.method, response.status_code, elapsed, stats)
+        # One summary line for a sample of requests (and every 5xx), instead
+        # of per-row lines inside the handlers
+        if response.status_code >= 500 or request_log_sampler.sample():
+            log_event(log, logging.INFO, "REQUEST_LOG", "Request summary",
+                      route=route, method=request.method, status=response.status_code,
+                      duration_ms=round(elapsed * 1000, 3),
+                      db_ms=round(stats.db_time * 1000, 3) if stats else None,
+                      statements=stats.statements if stats else None)
+    return response
+
+
+@app.after_request
+def compress_response(response):
+    if response.direct_passthrough or response.is_streamed:
+        return response
+    body = response.get_data()
+    if not should_compress(response.mimetype, response.content_encoding, len(body), compress_min_size):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is not None:
+        response.set_data(compress(body, encoding))
+        response.content_encoding = encoding
+        # The compressed body is a different representation of the same data
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(_exc):
+    token = g.pop('metrics_token', None)
+    if token is not None:
+        end_request(token)
 
 
 @app.route('/')
@@ -61,6 +453,30 @@ def health_check():
             "error": str(e)
         }), 500
 
+@app.route('/pool-stats', methods=['GET'])
+def pool_stats():
+    return jsonify(get_db_pool().stats())
+
+@app.route('/hasher-stats', methods=['GET'])
+def hasher_stats():
+    return jsonify(password_hasher.stats())
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(app_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/admin/slow-queries', methods=['GET'])
+def slow_queries():
+    """Slow statements with their EXPLAIN plans; needs X-Admin-Token matching ADMIN_TOKEN"""
+    admin_token = os.getenv('ADMIN_TOKEN')
+    if not admin_token:
+        # SQL text and plans are not for the public: no token, no route
+        return jsonify({"error": "Not found"}), 404
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode('utf-8'),
+                               admin_token.encode('utf-8')):
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify(slow_query_log.report(limit=request.args.get('limit', default=20, type=int)))
+
 @app.route('/signup', methods=['POST'])
 def signup():
     data = request.json
@@ -69,46 +485,50 @@ def signup():
     password = data.get('password')
     confirm_password = data.get('confirm_password')
     
+    rate_limits['signup'].check(request.remote_addr, email)
+    
     if not all([username, email, password, confirm_password]):
         return jsonify({"error": "All fields are required"}), 400
     
     if password != confirm_password:
         return jsonify({"error": "Passwords do not match"}), 400
     
-
-    
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
+    hashed_password = password_hasher.hash(password)
     
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
         cursor.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
         cursor.execute("START TRANSACTION")
-        cursor.callproc('sp_basic_signup', (username, email, hashed_password.decode('utf-8')))
+        cursor.callproc('sp_basic_signup', (username, email, hashed_password))
         cursor.execute("SELECT LAST_INSERT_ID() as user_id")
         result = cursor.fetchone()
         user_id = result[0] if result else None
         conn.commit()
-        print(f"[SIGNUP_LOG] User {username} (ID: {user_id}) successfully registered with hot majors")
+        log_event(log, logging.INFO, "SIGNUP_LOG", "User registered with hot majors",
+                  username=username, user_id=user_id, outcome="created")
         return jsonify({
             "message": "Account created successfully! Welcome to College Major Explorer.",
             "user_id": user_id,
-            "username": username
+            "username": username,
+            **mark_write(user_id)
         }), 201
     except mysql.connector.Error as e:
         conn.rollback()
         if e.errno == 1644 and "Username or e-mail already taken" in str(e):
-            print(f"[SIGNUP_LOG] Duplicate signup attempt for username: {username}, email: {email}")
+            log_event(log, logging.INFO, "SIGNUP_LOG", "Duplicate signup attempt",
+                      username=username, email=email, outcome="duplicate")
             return jsonify({"error": "Username or email already taken"}), 400
         else:
             error_msg = f"MySQL error: {e.msg} (Error code: {e.errno})"
-            print(f"[ERROR_LOG] Database error during signup: {error_msg}")
+            log_event(log, logging.ERROR, "ERROR_LOG", "Database error during signup",
+                      route="/signup", errno=e.errno, error=e.msg)
             return jsonify({"error": error_msg}), 500
     except Exception as e:
         conn.rollback()
         error_msg = f"Unexpected error: {str(e)}"
-        print(f"[ERROR_LOG] Unexpected error during signup: {error_msg}")
+        log_event(log, logging.ERROR, "ERROR_LOG", "Unexpected error during signup",
+                  route="/signup", error=str(e), exc_info=True)
         return jsonify({"error": error_msg}), 500
     finally:
         cursor.close()
@@ -120,6 +540,8 @@ def login():
     username_or_email = data.get('username_or_email')
     password = data.get('password')
     
+    rate_limits['login'].check(request.remote_addr, username_or_email)
+    
     if not username_or_email or not password:
         return jsonify({"error": "Username/email and password are required"}), 400
     
@@ -137,28 +559,56 @@ def login():
         if not user:
             return jsonify({"error": "Invalid username/email or password"}), 401
         
-        if bcrypt.checkpw(password.encode('utf-8'), user['password_hash'].encode('utf-8')):
+        if password_hasher.check(password, user['password_hash']):
+            if password_hasher.needs_rehash(user['password_hash']):
+                # BCRYPT_ROUNDS changed since this hash was made; upgrade it
+                # now that we have the plaintext. Best effort only.
+                try:
+                    cursor.execute(
+                        "UPDATE User SET password_hash = %s WHERE user_id = %s",
+                        (password_hasher.hash(password), user['user_id'])
+                    )
+                except Exception as e:
+                    log_event(log, logging.WARNING, "ERROR_LOG", "Password rehash skipped",
+                              user_id=user['user_id'], error=str(e))
             return jsonify({
                 "message": "Login successful",
                 "user_id": user['user_id'],
-                "username": user['username']
+                "username": user['username'],
+                **session_response(user['user_id'])
             })
         else:
             return jsonify({"error": "Invalid username/email or password"}), 401
             
+    except HasherBusy:
+        raise
     except Exception as e:
         return jsonify({"error": f"Database error: {str(e)}"}), 500
     finally:
         cursor.close()
         conn.close()
 
+@app.route('/logout', methods=['POST'])
+def logout():
+    token = bearer_token(request.headers.get('Authorization'))
+    if not token:
+        return jsonify({"error": "Authentication required"}), 401
+    try:
+        session_tokens.revoke(token)
+    except InvalidToken:
+        pass  # Already expired or revoked: logging out is still a success
+    return jsonify({"message": "Logged out"})
+
+USER_PROFILE_QUERY = "SELECT user_id, username, email FROM User WHERE user_id = %s"
+
 @app.route('/user/<int:user_id>', methods=['GET'])
+@require_session
 def get_user_profile(user_id):
-    conn = get_db_connection()
+    conn = get_read_connection(g.session)
     cursor = conn.cursor(dictionary=True)
     
     try:
-        cursor.execute("SELECT user_id, username, email FROM User WHERE user_id = %s", (user_id,))
+        cursor.execute(USER_PROFILE_QUERY, (user_id,))
         user = cursor.fetchone()
         
         if not user:
@@ -173,6 +623,7 @@ def get_user_profile(user_id):
         conn.close()
 
 @app.route('/user/<int:user_id>', methods=['PUT'])
+@require_session
 def update_user_profile(user_id):
     data = request.json
     username = data.get('username')
@@ -182,6 +633,9 @@ def update_user_profile(user_id):
     if not any([username, email, password]):
         return jsonify({"error": "At least one field must be provided"}), 400
     
+    # Hash before opening the transaction so no row locks are held meanwhile
+    hashed_password = password_hasher.hash(password) if password else None
+    
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
@@ -209,18 +663,25 @@ def update_user_profile(user_id):
             update_fields.append("email = %s")
             update_values.append(email)
         if password:
-            salt = bcrypt.gensalt()
-            hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
             update_fields.append("password_hash = %s")
-            update_values.append(hashed_password.decode('utf-8'))
+            update_values.append(hashed_password)
         if update_fields:
             update_values.append(user_id)
             query = f"UPDATE User SET {', '.join(update_fields)}, updated_at = NOW() WHERE user_id = %s"
             cursor.execute(query, update_values)
+        if password:
+            revoked_before = session_tokens.now()
+            cursor.execute(REVOKE_SESSIONS_QUERY, (user_id, revoked_before))
         conn.commit()
+        session = g.session
+        if password:
+            # Sign out every other session; this one continues on a fresh token
+            session_tokens.revoke_user(user_id, revoked_before)
+            session = None
         return jsonify({
             "message": "Profile updated successfully",
-            "user_id": user_id
+            "user_id": user_id,
+            **mark_write(user_id, session)
         })
     except Exception as e:
         conn.rollback()
@@ -229,81 +690,423 @@ def update_user_profile(user_id):
         cursor.close()
         conn.close()
 
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '1000'))
+COUNT_CACHE_TTL = float(os.getenv('COUNT_CACHE_TTL', '60'))
+
+# Keyed by client-chosen filters, so bounded: LRU past COUNT_CACHE_SIZE
+count_cache = TTLCache(capacity=int(os.getenv('COUNT_CACHE_SIZE', '10000')), ttl=COUNT_CACHE_TTL)
+app_metrics.add(Gauges('count_cache', "X-Total-Count cache", count_cache.stats))
+
+
+def encode_cursor(value, row_id):
+    """Opaque keyset cursor: the last row's sort value and its id"""
+    payload = json.dumps([None if value is None else str(value), row_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, numeric=True):
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        row_id = int(row_id)
+        if value is not None:
+            if not isinstance(value, str):
+                raise TypeError(value)
+            if numeric:
+                value = Decimal(value)
+                if not value.is_finite():
+                    raise ValueError(value)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return value, row_id
+
+
+def keyset_condition(column, id_column, value, row_id, descending):
+    """
+    WHERE fragment selecting rows after (value, row_id) in ORDER BY
+    column, id_column (both ASC or both DESC). NULLs sort first ascending
+    and last descending, matching MySQL.
+    """
+    if descending:
+        if value is None:
+            return f"({column} IS NULL AND {id_column} < %s)", [row_id]
+        return (f"({column} < %s OR ({column} = %s AND {id_column} < %s) OR {column} IS NULL)",
+                [value, value, row_id])
+    if value is None:
+        return f"(({column} IS NULL AND {id_column} > %s) OR {column} IS NOT NULL)", [row_id]
+    return f"({column} > %s OR ({column} = %s AND {id_column} > %s))", [value, value, row_id]
+
+
+def parse_sort(sort, allowed, default=None):
+    """'-field' -> ('field', True); raises ValueError for unknown fields"""
+    sort = sort or default
+    if not sort:
+        return None, False
+    field = sort.lstrip('-')
+    if field not in allowed:
+        raise ValueError(f"Invalid sort field: {field}")
+    return field, sort.startswith('-')
+
+
+def parse_limit(limit):
+    if limit is not None and limit <= 0:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE) if limit is not None else None
+
+
+def cached_count(key, cursor, query, params):
+    """COUNT(*) result cached for COUNT_CACHE_TTL seconds per filter set"""
+    def load():
+        cursor.execute(query, params)
+        row = cursor.fetchone()
+        return list(row.values())[0] if isinstance(row, dict) else row[0]
+    return count_cache.get(key, load)
+
+BCRYPT_OPERATIONS = {'hashes': 'hash', 'checks': 'check'}
+
+password_hasher = PasswordHasher(
+    rounds=int(os.getenv('BCRYPT_ROUNDS', '12')),
+    workers=int(os.getenv('BCRYPT_WORKERS', str(os.cpu_count() or 2))),
+    max_pending=int(os.getenv('BCRYPT_MAX_PENDING', '32')),
+    retry_after=int(os.getenv('BCRYPT_RETRY_AFTER', '1')),
+    on_done=lambda kind, seconds: app_metrics.bcrypt.observe(seconds, BCRYPT_OPERATIONS[kind])
+)
+
+
+app_metrics.add(Gauges('db_pool', "Connection pool state", lambda: get_db_pool().stats()))
+app_metrics.add(Gauges('bcrypt_pool', "bcrypt worker pool state", password_hasher.stats))
+app_metrics.add(Gauges('log', "Structured log queue", lambda: {'dropped_records': dropped_records()}))
+app_metrics.add(Gauges('json', "Response JSON encoder", app.json.stats))
+if replica_config is not None:
+    app_metrics.add(Gauges('db_replica', "Replica routing", lambda: get_replica_router().stats()))
+    app_metrics.add(Gauges('db_replica_pool', "Replica connection pool state",
+                           lambda: get_replica_pool().stats()))
+
+# "<count>/<seconds>" per client IP and per username/email; "off" disables.
+# Checked before any DB or bcrypt work in /login and /signup.
+rate_limits = {
+    route: RouteRateLimit(
+        ip_rate=parse_rate(os.getenv(f'RATE_LIMIT_{route.upper()}_IP', ip_default)),
+        identity_rate=parse_rate(os.getenv(f'RATE_LIMIT_{route.upper()}_USER', identity_default)),
+        max_keys=int(os.getenv('RATE_LIMIT_MAX_KEYS', '100000'))
+    )
+    for route, ip_default, identity_default in (
+        ('login', '30/60', '10/60'),
+        ('signup', '10/60', '5/60'),
+    )
+}
+for route, limit in rate_limits.items():
+    app_metrics.add(Gauges(f'rate_limit_{route}', f"/{route} rate limiter", limit.stats))
+
+
+@app.errorhandler(HasherBusy)
+def handle_hasher_busy(e):
+    response = jsonify({"error": "Server is busy, please retry shortly"})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+
+@app.errorhandler(RateLimited)
+def handle_rate_limited(e):
+    response = jsonify({"error": "Too many attempts, please try again later"})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+# Public sort names for /majors -> MajorAggregate/Major columns
+MAJOR_SORT_COLUMNS = {
+    'major_id': 'ma.major_id',
+    'major_name': 'm.major_name',
+    'average_salary': 'ma.avg_salary',
+    'job_growth_rate': 'ma.avg_growth_rate',
+    'grads': 'ma.avg_grads'
+}
+
+def majors_filter(area_id, min_salary, min_growth):
+    """WHERE conditions shared by /majors and the export, over MajorAggregate ma"""
+    conditions = ["ma.avg_salary >= %s", "ma.avg_growth_rate >= %s / 100"]
+    params = [min_salary, min_growth]
+    if area_id is not None:
+        conditions.insert(0, "ma.interest_area_id = %s")
+        params.insert(0, area_id)
+    return conditions, params
+
+
+def build_majors_query(area_id, min_salary, min_growth, sort_field=None, descending=False,
+                       limit=None, after=None):
+    """
+    SQL for /majors. Returns (query, params, count_query, count_params).
+    When paging (limit or cursor) the rows carry an extra sort_value column
+    for building the next cursor.
+    """
+    # Reads the trigger-maintained MajorAggregate (setup_major_aggregate.sql)
+    # so the filters are index range scans instead of a GROUP BY over MajorStats
+    conditions, params = majors_filter(area_id, min_salary, min_growth)
+    count_query = f"SELECT COUNT(*) AS total FROM MajorAggregate ma WHERE {' AND '.join(conditions)}"
+    count_params = list(params)
+
+    paging = limit is not None or after is not None
+    if paging:
+        sort_field = sort_field or 'major_id'
+    sort_column = MAJOR_SORT_COLUMNS[sort_field] if sort_field else None
+    # Tie-break on the sort column's own table so a single index
+    # (e.g. idx_major_name for m.major_name) delivers the rows in order
+    id_column = 'm.major_id' if sort_column and sort_column.startswith('m.') else 'ma.major_id'
+    if after is not None:
+        condition, condition_params = keyset_condition(
+            sort_column, id_column, after[0], after[1], descending
+        )
+        conditions.append(condition)
+        params.extend(condition_params)
+    sort_select = f",\n        {sort_column} AS sort_value" if paging else ""
+
+    query = f"""
+    SELECT
+        m.major_id,
+        m.major_name,
+        ma.interest_area_id,
+        ROUND(ma.avg_salary, 2) AS average_salary,
+        ROUND(ma.avg_growth_rate * 100, 2) AS job_growth_rate,
+        ROUND(ma.avg_grads, 0) AS grads{sort_select}
+    FROM MajorAggregate ma
+    JOIN Major m ON m.major_id = ma.major_id
+    WHERE {' AND '.join(conditions)}
+"""
+    if sort_column is not None:
+        direction = 'DESC' if descending else 'ASC'
+        query += f"    ORDER BY {sort_column} {direction}, {id_column} {direction}\n"
+    if limit is not None:
+        query += "    LIMIT %s\n"
+        params.append(limit)
+    return query, params, count_query, count_params
+
+
+def finish_majors_page(results, limit, paging):
+    """Strip sort_value from paged rows; returns the next cursor or None"""
+    next_cursor = None
+    if paging:
+        if limit is not None and len(results) == limit:
+            next_cursor = encode_cursor(results[-1]['sort_value'], results[-1]['major_id'])
+        for row in results:
+            del row['sort_value']
+    return next_cursor
+
 @app.route('/majors', methods=['GET'])
+@conditional_get('major_stats', 'interest_area', engine_backed=True)
 def get_majors():
     area_id    = request.args.get('area_id', type=int)
     min_salary = request.args.get('min_salary', type=float, default=0)
     min_growth = request.args.get('min_growth', type=float, default=0)
+    cursor_arg = request.args.get('cursor')
+    want_total = request.args.get('count') == '1'
 
-    query = """
-    SELECT
-        m.major_id,
-        m.major_name,
-        m.interest_area_id,
-        ROUND(AVG(ms.avg_salary), 2) AS average_salary,
-        ROUND(AVG(ms.job_growth_rate) * 100, 2) AS job_growth_rate,
-        ROUND(AVG(ms.grad_count), 0) AS grads
-    FROM MajorStats ms
-    JOIN Major m ON m.major_id = ms.major_id
-    WHERE (%s IS NULL OR m.interest_area_id = %s)
-    GROUP BY m.major_id, m.major_name, m.interest_area_id
-    HAVING AVG(ms.avg_salary) >= %s AND AVG(ms.job_growth_rate) * 100 >= %s
-"""
+    # The body stays a plain array for the frontend; paging metadata goes in
+    # X-Next-Cursor / X-Total-Count headers
+    try:
+        sort_field, descending = parse_sort(request.args.get('sort'), MAJOR_SORT_COLUMNS)
+        limit = parse_limit(request.args.get('limit', type=int))
+        after = None
+        if cursor_arg:
+            sort_field = sort_field or 'major_id'
+            after = decode_cursor(cursor_arg, numeric=sort_field != 'major_name')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    conn = get_db_connection()
+    filter_key = ('majors', area_id, min_salary, min_growth)
+    headers = {}
+
+    engine = get_majors_engine()
+    if engine is not None:
+        snapshot = engine.current
+        idx = snapshot.select(area_id, min_salary, min_growth, sort_field, descending, limit, after)
+        if limit is not None and len(idx) == limit:
+            last = idx[-1]
+            headers['X-Next-Cursor'] = encode_cursor(
+                snapshot.sort_value(sort_field, last), int(snapshot.major_id[last])
+            )
+        if want_total:
+            headers['X-Total-Count'] = str(len(snapshot.select(area_id, min_salary, min_growth)))
+        return app.response_class(snapshot.render(idx) + "\n", mimetype='application/json',
+                                  headers=headers)
+
+    query, params, count_query, count_params = build_majors_query(
+        area_id, min_salary, min_growth, sort_field, descending, limit, after
+    )
+
+    conn = get_read_connection()
     cursor = conn.cursor(dictionary=True)
-    cursor.execute(query, (area_id, area_id, min_salary, min_growth))
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return jsonify(results)
+    try:
+        cursor.execute(query, params)
+        results = cursor.fetchall()
+        if want_total:
+            headers['X-Total-Count'] = str(cached_count(filter_key, cursor, count_query, count_params))
+    finally:
+        cursor.close()
+        conn.close()
+
+    next_cursor = finish_majors_page(results, limit, limit is not None or after is not None)
+    if next_cursor:
+        headers['X-Next-Cursor'] = next_cursor
+    response = jsonify(results)
+    response.headers.update(headers)
+    return response
+
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '1000'))
+
+EXPORT_COLUMNS = [
+    'stat_id', 'major_id', 'major_name', 'interest_area_id', 'year',
+    'avg_salary', 'job_growth_rate', 'grad_count',
+    'source_id', 'source_name', 'source_url'
+]
+
+@app.route('/export/major-stats', methods=['GET'])
+def export_major_stats():
+    """Stream every MajorStats row (with major and source) as NDJSON or CSV"""
+    export_format = request.args.get('format', 'ndjson')
+    area_id    = request.args.get('area_id', type=int)
+    min_salary = request.args.get('min_salary', type=float, default=0)
+    min_growth = request.args.get('min_growth', type=float, default=0)
+
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+
+    # Same filters as /majors, applied per major through MajorAggregate
+    conditions, params = majors_filter(area_id, min_salary, min_growth)
+
+    query = f"""
+        SELECT
+            ms.stat_id,
+            ms.major_id,
+            m.major_name,
+            m.interest_area_id,
+            ms.year,
+            ms.avg_salary,
+            ms.job_growth_rate,
+            ms.grad_count,
+            ms.source_id,
+            ds.name AS source_name,
+            ds.url AS source_url
+        FROM MajorAggregate ma
+        JOIN Major m ON m.major_id = ma.major_id
+        JOIN MajorStats ms ON ms.major_id = ma.major_id
+        LEFT JOIN DataSource ds ON ds.source_id = ms.source_id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY ms.major_id, ms.stat_id
+    """
+
+    def generate():
+        conn = get_read_connection()
+        # Unbuffered cursor: rows are read off the socket chunk by chunk, so
+        # memory stays flat regardless of how many rows are exported
+        cursor = conn.cursor(buffered=False)
+        try:
+            cursor.execute(query, params)
+            if export_format == 'csv':
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(EXPORT_COLUMNS)
+            while True:
+                rows = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+                if not rows:
+                    break
+                if export_format == 'csv':
+                    writer.writerows(rows)
+                    chunk = buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                else:
+                    chunk = ''.join(
+                        json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + '\n'
+                        for row in rows
+                    )
+                yield chunk
+            if export_format == 'csv' and buffer.tell():
+                yield buffer.getvalue()
+        finally:
+            # An abandoned stream leaves unread rows; the pool sees
+            # unread_result on checkin and discards the connection
+            try:
+                cursor.close()
+            except Exception:
+                pass
+            conn.close()
+
+    if export_format == 'csv':
+        mimetype = 'text/csv'
+        filename = 'major_stats.csv'
+    else:
+        mimetype = 'application/x-ndjson'
+        filename = 'major_stats.ndjson'
+    return Response(generate(), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
 
 @app.route('/interest-areas', methods=['GET'])
+@conditional_get('interest_area')
 def get_interest_areas():
-    conn = get_db_connection()
+    conn = get_read_connection()
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT interest_area_id, name FROM InterestArea")
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    try:
+        cursor.execute("SELECT interest_area_id, name FROM InterestArea")
+        results = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
     return jsonify(results)
 
 @app.route('/search-interest-areas', methods=['GET'])
 def search_interest_areas():
     query = request.args.get('q', '').strip()
+    try:
+        limit = parse_limit(request.args.get('limit', type=int))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     if not query:
         return jsonify([])
     
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    
+    # Served from the in-memory n-gram index; no DB round-trip per keystroke
     try:
-        cursor.execute(
-            "SELECT interest_area_id, name FROM InterestArea WHERE LOWER(name) LIKE LOWER(%s) ORDER BY name",
-            (f'%{query}%',)
-        )
-        results = cursor.fetchall()
-        
+        results = get_interest_area_index().search(query, limit)
         return jsonify(results)
-        
     except Exception as e:
-        print(f"[ERROR_LOG] Error searching interest areas: {str(e)}")
+        log_event(log, logging.ERROR, "ERROR_LOG", "Error searching interest areas",
+                  route="/search-interest-areas", error=str(e), exc_info=True)
         return jsonify({"error": f"Database error: {str(e)}"}), 500
-    finally:
-        cursor.close()
-        conn.close()
+
+SAVE_COMPARISON_RETRIES = 3
+
+
+def split_saved_duplicates(major_ids, already_saved):
+    """
+    (ids to insert, duplicate ids) in request order. A repeated id within
+    the request counts as a duplicate, as it did with the per-row trigger.
+    """
+    seen = set(already_saved)
+    new_ids = []
+    duplicates = []
+    for major_id in major_ids:
+        if major_id in seen:
+            duplicates.append(major_id)
+        else:
+            seen.add(major_id)
+            new_ids.append(major_id)
+    return new_ids, duplicates
 
 @app.route('/save-comparison', methods=['POST'])
+@require_session
 def save_comparison():
     data = request.json
     user_id = data.get('user_id')
     major_ids = data.get('major_ids', [])
     
-    print(f"[DEBUG] Save comparison request - user_id: {user_id}, major_ids: {major_ids}")
+    log_event(log, logging.DEBUG, "DEBUG", "Save comparison request - user_id: %s, major_ids: %s",
+              user_id, major_ids)
     
     if not user_id or not major_ids:
-        print(f"[DEBUG] Missing data - user_id: {user_id}, major_ids: {major_ids}")
+        log_event(log, logging.DEBUG, "DEBUG", "Missing data - user_id: %s, major_ids: %s",
+                  user_id, major_ids)
         return jsonify({"error": "Missing user_id or major_ids"}), 400
 
     conn = get_db_connection()
@@ -311,94 +1114,163 @@ def save_comparison():
     try:
         cursor.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
         cursor.execute("START TRANSACTION")
-        saved_count = 0
-        skipped_count = 0
-        trigger_errors = []
-        for major_id in major_ids:
+        # Set-based save: one lookup of what is already saved, then a single
+        # multi-row INSERT, so round-trips don't grow with len(major_ids)
+        for attempt in range(SAVE_COMPARISON_RETRIES):
+            placeholders = ', '.join(['%s'] * len(major_ids))
+            cursor.execute(
+                f"SELECT major_id FROM SavedComparison WHERE user_id = %s AND major_id IN ({placeholders})",
+                [user_id] + list(major_ids)
+            )
+            new_ids, trigger_errors = split_saved_duplicates(
+                major_ids, {row[0] for row in cursor.fetchall()}
+            )
             try:
-                print(f"[DEBUG] Attempting to save major {major_id} for user {user_id}")
-                cursor.execute(
-                    "INSERT INTO SavedComparison (user_id, major_id, saved_at) VALUES (%s, %s, NOW())",
-                    (user_id, major_id)
-                )
-                saved_count += 1
-                print(f"[SAVE_LOG] User {user_id} successfully saved major {major_id}")
+                if new_ids:
+                    values = ', '.join(['(%s, %s, NOW())'] * len(new_ids))
+                    cursor.execute(
+                        f"INSERT INTO SavedComparison (user_id, major_id, saved_at) VALUES {values}",
+                        [value for major_id in new_ids for value in (user_id, major_id)]
+                    )
+                break
             except mysql.connector.Error as e:
-                print(f"[DEBUG] MySQL error for major {major_id}: {e}")
-                if e.errno == 1644 and "Comparison already saved" in str(e):
-                    skipped_count += 1
-                    trigger_errors.append(major_id)
-                    print(f"[TRIGGER_LOG] User {user_id} attempted duplicate save for major {major_id} - MySQL trigger prevented insertion")
-                else:
-                    raise e
+                # A concurrent save of the same pair slipped in between the
+                # lookup and the insert; the trigger rejected the whole
+                # statement, so diff again
+                if e.errno == 1644 and "Comparison already saved" in str(e) \
+                        and attempt < SAVE_COMPARISON_RETRIES - 1:
+                    continue
+                raise
+        saved_count = len(new_ids)
+        skipped_count = len(trigger_errors)
+        if trigger_errors:
+            log_event(log, logging.INFO, "TRIGGER_LOG", "Duplicate save prevented",
+                      user_id=user_id, major_ids=trigger_errors)
         conn.commit()
         if saved_count > 0 or skipped_count > 0:
-            print(f"[SUMMARY_LOG] User {user_id} save operation: {saved_count} saved, {skipped_count} duplicates prevented")
+            log_event(log, logging.DEBUG, "SUMMARY_LOG", "Save operation",
+                      user_id=user_id, saved=saved_count, skipped=skipped_count)
         if saved_count > 0 and skipped_count > 0:
             message = f"Saved {saved_count} new comparisons. {skipped_count} were already saved."
         elif saved_count > 0:
             message = f"Successfully saved {saved_count} comparison(s)."
         else:
             message = f"All {skipped_count} comparison(s) were already saved."
-        return jsonify({"message": message, "saved": saved_count, "skipped": skipped_count})
+        return jsonify({
+            "message": message,
+            "saved": saved_count,
+            "skipped": skipped_count,
+            "duplicates": trigger_errors,
+            **mark_write(g.session['uid'], g.session)
+        })
     except mysql.connector.Error as e:
         conn.rollback()
         error_msg = f"MySQL error: {e.msg} (Error code: {e.errno})"
-        print(f"[ERROR_LOG] Database error during save_comparison: {error_msg}")
+        log_event(log, logging.ERROR, "ERROR_LOG", "Database error during save_comparison",
+                  route="/save-comparison", errno=e.errno, error=e.msg)
         return jsonify({"error": error_msg}), 500
     except Exception as e:
         conn.rollback()
         error_msg = f"Unexpected error: {str(e)}"
-        print(f"[ERROR_LOG] Unexpected error during save_comparison: {error_msg}")
+        log_event(log, logging.ERROR, "ERROR_LOG", "Unexpected error during save_comparison",
+                  route="/save-comparison", error=str(e), exc_info=True)
         return jsonify({"error": error_msg}), 500
     finally:
         cursor.close()
         conn.close()
 
-@app.route('/saved-comparisons/<int:user_id>', methods=['GET'])
-def get_saved_comparisons(user_id):
-    print(f"[DEBUG] Getting saved comparisons for user {user_id}")
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    
-    try:
-        cursor.execute("""
+SAVED_COMPARISONS_QUERY = """
             SELECT 
                 sc.major_id,
                 m.major_name,
-                AVG(ms.avg_salary) as avg_salary,
-                COUNT(ms.stat_id) as job_count,
+                ma.avg_salary as avg_salary,
+                COALESCE(ma.stat_count, 0) as job_count,
                 sc.saved_at
             FROM SavedComparison sc
             JOIN Major m ON sc.major_id = m.major_id
-            LEFT JOIN MajorStats ms ON m.major_id = ms.major_id
+            LEFT JOIN MajorAggregate ma ON m.major_id = ma.major_id
             WHERE sc.user_id = %s
-            GROUP BY sc.major_id, m.major_name, sc.saved_at
             ORDER BY sc.saved_at DESC
-        """, (user_id,))
-        
-        saved_comparisons = cursor.fetchall()
-        print(f"[DEBUG] Found {len(saved_comparisons)} saved comparisons for user {user_id}")
-        
-        return jsonify({
-            "user_id": user_id,
-            "saved_comparisons": saved_comparisons,
-            "count": len(saved_comparisons)
-        })
-        
+        """
+
+# Each user's saved list, keyed by (user_id, SavedComparisonVersion).
+# Triggers bump the version in the same transaction as any insert or
+# delete, so every serve.py worker misses on its next read after a write,
+# whichever worker made it; checking costs one primary-key lookup instead
+# of the join. SAVED_CACHE_TTL only bounds the MajorAggregate columns.
+saved_comparisons_cache = TTLCache(
+    capacity=int(os.getenv('SAVED_CACHE_SIZE', '10000')),
+    ttl=float(os.getenv('SAVED_CACHE_TTL', '30'))
+)
+app_metrics.add(Gauges('saved_comparisons_cache', "Per-user saved comparisons cache",
+                       saved_comparisons_cache.stats))
+
+
+SAVED_VERSION_QUERY = "SELECT version FROM SavedComparisonVersion WHERE user_id = %s"
+
+
+def saved_comparisons_key(row, user_id):
+    """Cache key from the SAVED_VERSION_QUERY row (None before the first save)"""
+    return (str(user_id), row['version'] if row else 0)
+
+
+def load_saved_comparisons(cursor, user_id):
+    cursor.execute(SAVED_COMPARISONS_QUERY, (user_id,))
+    return cursor.fetchall()
+
+
+def cached_saved_comparisons(cursor, user_id):
+    cursor.execute(SAVED_VERSION_QUERY, (user_id,))
+    key = saved_comparisons_key(cursor.fetchone(), user_id)
+    return saved_comparisons_cache.get(key, lambda: load_saved_comparisons(cursor, user_id))
+
+
+@app.route('/saved-comparisons/<int:user_id>', methods=['GET'])
+@require_session
+def get_saved_comparisons(user_id):
+    log_event(log, logging.DEBUG, "DEBUG", "Getting saved comparisons for user %s", user_id)
+
+    conn = get_read_connection(g.session)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        saved_comparisons = cached_saved_comparisons(cursor, user_id)
     except Exception as e:
         return jsonify({"error": f"Database error: {str(e)}"}), 500
     finally:
         cursor.close()
         conn.close()
 
-@app.route('/major-jobs/<int:major_id>', methods=['GET'])
-def get_major_jobs(major_id):
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    
-    try:
-        cursor.execute("""
+    log_event(log, logging.DEBUG, "DEBUG", "Found %s saved comparisons for user %s",
+              len(saved_comparisons), user_id)
+    return jsonify({
+        "user_id": user_id,
+        "saved_comparisons": saved_comparisons,
+        "count": len(saved_comparisons)
+    })
+
+# Public sort names for /major-jobs -> MajorStats columns; each is backed
+# by a (major_id, column) index from setup_pagination_indexes.sql
+MAJOR_JOB_SORT_COLUMNS = {
+    'stat_id': 'ms.stat_id',
+    'avg_salary': 'ms.avg_salary',
+    'job_growth_rate': 'ms.job_growth_rate',
+    'grad_count': 'ms.grad_count',
+    'year': 'ms.year'
+}
+
+def build_major_jobs_query(major_id, sort_field, descending, limit=None, after=None):
+    """SQL for one page of /major-jobs; returns (query, params)"""
+    sort_column = MAJOR_JOB_SORT_COLUMNS[sort_field]
+    direction = 'DESC' if descending else 'ASC'
+    conditions = ["ms.major_id = %s"]
+    params = [major_id]
+    if after is not None:
+        condition, condition_params = keyset_condition(
+            sort_column, 'ms.stat_id', after[0], after[1], descending
+        )
+        conditions.append(condition)
+        params.extend(condition_params)
+    query = f"""
             SELECT 
                 ms.stat_id,
                 ms.avg_salary,
@@ -409,22 +1281,176 @@ def get_major_jobs(major_id):
                 ds.url as source_url
             FROM MajorStats ms
             LEFT JOIN DataSource ds ON ms.source_id = ds.source_id
-            WHERE ms.major_id = %s
-            ORDER BY ms.avg_salary DESC
-        """, (major_id,))
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {sort_column} {direction}, ms.stat_id {direction}
+        """
+    if limit is not None:
+        query += "LIMIT %s"
+        params.append(limit)
+    return query, params
+
+MAX_BATCH_MAJORS = int(os.getenv('MAX_BATCH_MAJORS', '50'))
+
+
+def parse_id_list(values):
+    """ids from ?ids=1,2,3 and/or repeated ?ids=1&ids=2, de-duplicated in order"""
+    ids = []
+    for value in values:
+        for part in value.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            if not part.isdigit():
+                raise ValueError(f"Invalid major id: {part}")
+            if int(part) not in ids:
+                ids.append(int(part))
+    if not ids:
+        raise ValueError("ids is required")
+    if len(ids) > MAX_BATCH_MAJORS:
+        raise ValueError(f"At most {MAX_BATCH_MAJORS} ids per request")
+    return ids
+
+
+def build_major_jobs_batch_query(major_ids, sort_field, descending, limit=None):
+    """
+    One query for the stats of several majors plus their names. A window
+    function numbers each major's rows in sort order so `limit` applies per
+    major; majors without stats still come back once with NULL stat columns.
+    """
+    sort_column = MAJOR_JOB_SORT_COLUMNS[sort_field]
+    direction = 'DESC' if descending else 'ASC'
+    placeholders = ', '.join(['%s'] * len(major_ids))
+    query = f"""
+            SELECT
+                m.major_id,
+                m.major_name,
+                j.stat_id,
+                j.avg_salary,
+                j.job_growth_rate,
+                j.grad_count,
+                j.year,
+                j.source_name,
+                j.source_url,
+                j.total
+            FROM Major m
+            LEFT JOIN (
+                SELECT
+                    ms.major_id,
+                    ms.stat_id,
+                    ms.avg_salary,
+                    ms.job_growth_rate,
+                    ms.grad_count,
+                    ms.year,
+                    ds.name as source_name,
+                    ds.url as source_url,
+                    ROW_NUMBER() OVER (PARTITION BY ms.major_id
+                                       ORDER BY {sort_column} {direction}, ms.stat_id {direction}) AS rn,
+                    COUNT(*) OVER (PARTITION BY ms.major_id) AS total
+                FROM MajorStats ms
+                LEFT JOIN DataSource ds ON ms.source_id = ds.source_id
+                WHERE ms.major_id IN ({placeholders})
+            ) j ON j.major_id = m.major_id{' AND j.rn <= %s' if limit is not None else ''}
+            WHERE m.major_id IN ({placeholders})
+            ORDER BY m.major_id, j.rn
+        """
+    params = list(major_ids) + ([limit] if limit is not None else []) + list(major_ids)
+    return query, params
+
+
+def group_major_jobs(major_ids, rows, limit=None, want_total=False):
+    """Rows of build_major_jobs_batch_query -> one /major-jobs style entry per id"""
+    groups = {major_id: {"major_id": major_id, "major_name": "Unknown Major", "jobs": [], "total": 0}
+              for major_id in major_ids}
+    for row in rows:
+        group = groups[row['major_id']]
+        group["major_name"] = row['major_name']
+        if row['stat_id'] is not None:
+            group["total"] = row['total']
+            group["jobs"].append({key: row[key] for key in (
+                'stat_id', 'avg_salary', 'job_growth_rate', 'grad_count', 'year',
+                'source_name', 'source_url')})
+    majors = []
+    for major_id in major_ids:
+        group = groups[major_id]
+        group["count"] = len(group["jobs"])
+        if limit is not None:
+            group["has_more"] = group["total"] > group["count"]
+        if not want_total:
+            del group["total"]
+        majors.append(group)
+    return majors
+
+
+@app.route('/major-jobs', methods=['GET'])
+@conditional_get('major_stats', 'data_source')
+def get_major_jobs_batch():
+    """Stats for several majors in one round-trip: /major-jobs?ids=1,2,3&limit=5"""
+    want_total = request.args.get('count') == '1'
+    try:
+        major_ids = parse_id_list(request.args.getlist('ids'))
+        sort_field, descending = parse_sort(request.args.get('sort'), MAJOR_JOB_SORT_COLUMNS,
+                                            default='-avg_salary')
+        limit = parse_limit(request.args.get('limit', type=int))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    query, params = build_major_jobs_batch_query(major_ids, sort_field, descending, limit)
+
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(query, params)
+        majors = group_major_jobs(major_ids, cursor.fetchall(), limit, want_total)
+        return jsonify({"majors": majors, "count": len(majors)})
+    except Exception as e:
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+@app.route('/major-jobs/<int:major_id>', methods=['GET'])
+@conditional_get('major_stats', 'data_source')
+def get_major_jobs(major_id):
+    cursor_arg = request.args.get('cursor')
+    want_total = request.args.get('count') == '1'
+    try:
+        sort_field, descending = parse_sort(request.args.get('sort'), MAJOR_JOB_SORT_COLUMNS,
+                                            default='-avg_salary')
+        limit = parse_limit(request.args.get('limit', type=int))
+        after = decode_cursor(cursor_arg) if cursor_arg else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    query, params = build_major_jobs_query(major_id, sort_field, descending, limit, after)
+
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    
+    try:
+        cursor.execute(query, params)
         
         jobs = cursor.fetchall()
         
         cursor.execute("SELECT major_name FROM Major WHERE major_id = %s", (major_id,))
         major_result = cursor.fetchone()
         major_name = major_result['major_name'] if major_result else "Unknown Major"
-        
-        return jsonify({
+
+        result = {
             "major_id": major_id,
             "major_name": major_name,
             "jobs": jobs,
             "count": len(jobs)
-        })
+        }
+        if limit is not None:
+            last = jobs[-1] if len(jobs) == limit else None
+            result["next_cursor"] = encode_cursor(last[sort_field], last['stat_id']) if last else None
+        if want_total:
+            result["total"] = cached_count(
+                ('major-jobs', major_id), cursor,
+                "SELECT COUNT(*) AS total FROM MajorStats WHERE major_id = %s", (major_id,)
+            )
+        
+        return jsonify(result)
         
     except Exception as e:
         return jsonify({"error": f"Database error: {str(e)}"}), 500
@@ -432,7 +1458,97 @@ def get_major_jobs(major_id):
         cursor.close()
         conn.close()
 
+TRENDING_MAJORS_QUERY = """
+            SELECT
+                h.rank_pos AS `rank`,
+                h.major_id,
+                m.major_name,
+                m.interest_area_id,
+                h.saves,
+                h.window_days,
+                h.refreshed_at
+            FROM HotMajors h
+            JOIN Major m ON m.major_id = h.major_id
+            ORDER BY h.rank_pos
+            LIMIT %s
+        """
+
+def trending_payload(rows):
+    """HotMajors rows -> /trending-majors body; the window metadata is shared"""
+    meta = rows[0] if rows else {}
+    return {
+        "window_days": meta.get('window_days'),
+        "refreshed_at": meta.get('refreshed_at'),
+        "majors": [{key: value for key, value in row.items() if key not in ('window_days', 'refreshed_at')}
+                   for row in rows]
+    }
+
+@app.route('/trending-majors', methods=['GET'])
+def trending_majors():
+    """Most-saved majors of the last 30 days, from the HotMajors leaderboard"""
+    try:
+        limit = parse_limit(request.args.get('limit', type=int, default=10))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(TRENDING_MAJORS_QUERY, (limit,))
+        rows = cursor.fetchall()
+    except Exception as e:
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+    return jsonify(trending_payload(rows))
+
+@app.route('/bootstrap/<int:user_id>', methods=['GET'])
+@require_session
+def bootstrap(user_id):
+    """
+    Everything the frontend loads after login (profile, interest areas,
+    majors, saved comparisons) in one request. Reference data comes from
+    the in-memory index/engine when available; the per-user queries share
+    one pooled connection.
+    """
+    engine = get_majors_engine()
+    interest_areas = get_interest_area_index().current.rows
+
+    conn = get_read_connection(g.session)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(USER_PROFILE_QUERY, (user_id,))
+        user = cursor.fetchone()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+
+        saved_comparisons = cached_saved_comparisons(cursor, user_id)
+
+        if engine is not None:
+            snapshot = engine.current
+            majors = snapshot.records(snapshot.select())
+        else:
+            query, params, _, _ = build_majors_query(None, 0, 0)
+            cursor.execute(query, params)
+            majors = cursor.fetchall()
+    except Exception as e:
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+    return jsonify({
+        "user": user,
+        "interest_areas": interest_areas,
+        "majors": majors,
+        "saved_comparisons": saved_comparisons,
+        "saved_count": len(saved_comparisons)
+    })
+
 @app.route('/saved-comparisons/<int:user_id>/<int:major_id>', methods=['DELETE'])
+@require_session
 def remove_saved_comparison(user_id, major_id):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -447,7 +1563,8 @@ def remove_saved_comparison(user_id, major_id):
             conn.rollback()
             return jsonify({"error": "Saved comparison not found"}), 404
         conn.commit()
-        return jsonify({"message": "Saved comparison removed successfully"})
+        return jsonify({"message": "Saved comparison removed successfully",
+                        **mark_write(user_id, g.session)})
     except Exception as e:
         conn.rollback()
         return jsonify({"error": f"Database error: {str(e)}"}), 500
@@ -458,5 +1575,56 @@ def remove_saved_comparison(user_id, major_id):
 
 
 
+def warm_majors_query():
+    """Run the default /majors query once so MySQL has its pages cached"""
+    query, params, _, _ = build_majors_query(None, 0, 0)
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def warm_up():
+    """
+    Open this process's pools and load the reference data before it takes
+    traffic (serve.py runs it in every worker after fork). A failing step
+    is logged and left to the lazy getters to retry on first use.
+    """
+    started = time.perf_counter()
+    steps = [
+        ('db_pool', lambda: get_db_pool().prefill()),
+        ('replica', lambda: get_replica_router() and get_replica_router().healthy()
+                            and get_replica_pool().prefill()),
+        ('majors_engine', get_majors_engine),
+        ('interest_area_index', get_interest_area_index),
+        ('data_versions', get_data_versions),
+        ('majors_query', lambda: get_majors_engine() is None and warm_majors_query()),
+    ]
+    failed = []
+    for name, step in steps:
+        try:
+            step()
+        except Exception as e:
+            failed.append(name)
+            log_event(log, logging.ERROR, "ERROR_LOG", "Warm-up step failed", step=name, error=str(e))
+    log_event(log, logging.INFO, "STARTUP_LOG", "Process warmed up", pid=os.getpid(),
+              duration_ms=round((time.perf_counter() - started) * 1000, 3), failed=failed)
+    return not failed
+
+
+def shut_down():
+    """Stop the replica lag monitor and close this process's pooled connections"""
+    if replica_router is not None:
+        replica_router.stop()
+    for pool in (db_pool, replica_pool):
+        if pool is not None:
+            pool.dispose()
+
+
 if __name__ == '__main__':
+    warm_up()
     app.run(debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
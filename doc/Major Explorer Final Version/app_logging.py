@@ -0,0 +1,150 @@
+"""
+Structured, non-blocking logging for the API
+
+Request threads only append a record to an in-memory queue; a single
+QueueListener thread formats it and writes to stdout. When the queue is
+full, records are dropped and counted rather than blocking a request.
+
+Every record carries an `event` (the old print() tags: SIGNUP_LOG,
+TRIGGER_LOG, ERROR_LOG, ...) and a dict of structured `fields`. With
+LOG_FORMAT=json (default) each line is one JSON object; LOG_FORMAT=text
+prints "[EVENT] message key=value ...", close to the old output.
+
+DEBUG records cost one level check when disabled: pass values as
+%-style args (log_event(..., "user %s", user_id)) so nothing is
+formatted unless the record is emitted.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+
+LOGGER_NAME = 'major_explorer'
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", None),
+            "message": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        line = f"[{getattr(record, 'event', None) or record.levelname}] {record.getMessage()}"
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks and skips the per-record pre-format"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Freeze the message now so later mutation of the args cannot change
+        # it, but leave JSON/text formatting to the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(level='INFO', fmt='json', stream=None, queue_size=10000):
+    """Install the queue handler on the app's logger tree (idempotent)"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+        log_queue = queue.Queue(maxsize=queue_size)
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(TextFormatter() if fmt == 'text' else JsonFormatter())
+
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.setLevel(level.upper() if isinstance(level, str) else level)
+        logger.propagate = False
+        logger.handlers = [DroppingQueueHandler(log_queue)]
+
+        _listener = logging.handlers.QueueListener(log_queue, output)
+        _listener.start()
+        atexit.register(_listener.stop)
+        return _listener
+
+
+def _restart_after_fork():
+    """
+    Threads do not survive fork(): a child that inherited a configured logger
+    gets its own queue and listener thread, or its records would pile up in
+    a queue nobody drains.
+    """
+    global _listener, _setup_lock
+    _setup_lock = threading.Lock()
+    inherited = _listener
+    if inherited is None:
+        return
+    atexit.unregister(inherited.stop)  # the parent's thread is not ours to stop
+    log_queue = queue.Queue(maxsize=inherited.queue.maxsize)
+    for handler in logging.getLogger(LOGGER_NAME).handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            handler.queue = log_queue
+            handler.dropped = 0
+    _listener = logging.handlers.QueueListener(log_queue, *inherited.handlers)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def get_logger(name):
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def log_event(logger, level, event, message, *args, exc_info=None, **fields):
+    """Log `message % args` tagged with `event` and structured `fields`"""
+    if logger.isEnabledFor(level):
+        logger.log(level, message, *args, exc_info=exc_info,
+                   extra={"event": event, "fields": fields})
+
+
+def dropped_records():
+    handlers = logging.getLogger(LOGGER_NAME).handlers
+    return sum(getattr(handler, "dropped", 0) for handler in handlers)
+
+
+class Sampler:
+    """Keeps roughly `rate` of the calls to sample(); 0 disables, 1 keeps all"""
+
+    def __init__(self, rate):
+        self.rate = rate
+
+    def sample(self):
+        return self.rate >= 1 or (self.rate > 0 and random.random() < self.rate)
@@ -0,0 +1,838 @@
+"""
+Async (ASGI) entry point for the College Major Explorer API
+
+Serves app.py's API routes on an asyncio event loop, using aiomysql
+with its own connection pool and the shared bcrypt worker pool for CPU
+work. Responses are encoded with the Flask app's JSON provider in compact
+mode, so bodies are byte-identical to app.py and cs411projectfrontend.html
+works unchanged; CompressionMiddleware applies app.py's gzip/brotli rules.
+
+Flask-only for now: /export/major-stats (streams through the sync pool),
+/pool-stats, /hasher-stats, /metrics and /admin/slow-queries.
+
+Run with:
+    uvicorn asgi_app:app --host 127.0.0.1 --port 5000
+or, one pre-forked worker per core:
+    python serve.py --asgi
+"""
+
+import asyncio
+import functools
+import logging
+import os
+from contextlib import asynccontextmanager
+
+import aiomysql
+import pymysql
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Route
+from werkzeug.http import parse_etags
+
+import app as flask_app_module
+from app import (
+    config, pool_config, password_hasher, HasherBusy,
+    MAJOR_SORT_COLUMNS, MAJOR_JOB_SORT_COLUMNS, SAVE_COMPARISON_RETRIES,
+    parse_sort, parse_limit, decode_cursor, encode_cursor,
+    count_cache,
+    build_majors_query, finish_majors_page, build_major_jobs_query, split_saved_duplicates,
+    parse_id_list, build_major_jobs_batch_query, group_major_jobs,
+    USER_PROFILE_QUERY, SAVED_COMPARISONS_QUERY, TRENDING_MAJORS_QUERY, trending_payload,
+    reference_etag, REFERENCE_CACHE_CONTROL,
+    session_tokens, InvalidToken, bearer_token, check_session, session_response,
+    session_revocations, REVOKED_BEFORE_QUERY, REVOKE_SESSIONS_QUERY, revoked_before_value,
+    revocation_error,
+    rate_limits, RateLimited,
+    replica_config, get_replica_router, mark_write, warm_up, shut_down, get_interest_area_index,
+    saved_comparisons_cache, SAVED_VERSION_QUERY, saved_comparisons_key,
+    compress_min_size,
+)
+from app_logging import get_logger, log_event
+from response_encoding import choose_encoding, should_compress, compress
+
+flask_app = flask_app_module.app
+
+log = get_logger('asgi')
+
+db_pool = None
+replica_pool = None
+
+
+def json_response(obj, status_code=200, headers=None):
+    """Same bytes as Flask's jsonify() outside debug mode"""
+    body = flask_app.json.encode(obj)
+    return Response(body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def mysql_error(e):
+    """(errno, message) from a PyMySQL error"""
+    if len(e.args) >= 2:
+        return e.args[0], e.args[1]
+    return None, str(e)
+
+
+def arg(request, name, type_=str, default=None):
+    """request.args.get(name, type=..., default=...) with Flask's semantics"""
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    try:
+        return type_(value)
+    except (TypeError, ValueError):
+        return default
+
+
+async def reference_etag_async(names, engine_backed=False):
+    """
+    app.reference_etag(); the DataVersion watcher and the majors engine do
+    blocking I/O on first use, so if warm-up did not build them that
+    happens in a thread instead of on the event loop
+    """
+    if flask_app_module.data_versions is None or (
+            engine_backed and flask_app_module.majors_engine is None
+            and os.getenv('MAJORS_ENGINE') == 'memory'):
+        return await asyncio.to_thread(reference_etag, names, engine_backed)
+    return reference_etag(names, engine_backed)
+
+
+def conditional_get(*names, engine_backed=False):
+    """app.conditional_get for async handlers: 304 before any DB work"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(request):
+            etag = await reference_etag_async(names, engine_backed)
+            if parse_etags(request.headers.get('if-none-match')).contains_weak(etag):
+                response = Response(status_code=304)
+            else:
+                response = await handler(request)
+                if response.status_code != 200:
+                    return response
+            response.headers['ETag'] = f'"{etag}"'
+            response.headers['Cache-Control'] = REFERENCE_CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
+
+
+def require_session(handler):
+    """app.require_session for async handlers"""
+    @functools.wraps(handler)
+    async def wrapper(request):
+        user_id = request.path_params.get('user_id')
+        if user_id is None:
+            user_id = (await get_json(request)).get('user_id')
+        claims, error = check_session(request.headers.get('authorization'), user_id,
+                                      check_revocation=False)
+        if not error:
+            uid = claims['uid']
+            error = revocation_error(claims, await session_revocations.get_async(
+                uid, lambda: load_revoked_before(uid)))
+        if error:
+            headers = {'WWW-Authenticate': 'Bearer'} if error[1] == 401 else None
+            return json_response({"error": error[0]}, error[1], headers=headers)
+        request.state.session = claims
+        return await handler(request)
+    return wrapper
+
+
+async def load_revoked_before(user_id):
+    async with db_pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(REVOKED_BEFORE_QUERY, (user_id,))
+            return revoked_before_value(await cursor.fetchone())
+
+
+async def get_json(request):
+    try:
+        return await request.json()
+    except Exception:
+        return {}
+
+
+def create_pool(db_config):
+    return aiomysql.create_pool(
+        host=db_config['host'],
+        port=db_config['port'],
+        user=db_config['user'],
+        password=db_config['password'],
+        db=db_config['database'],
+        autocommit=True,
+        minsize=pool_config['size'],
+        maxsize=pool_config['size'] + pool_config['max_overflow'],
+        pool_recycle=int(pool_config['max_idle'])
+    )
+
+
+@asynccontextmanager
+async def read_connection(session=None):
+    """app.get_read_connection for aiomysql: replica when caught up, else primary"""
+    router = get_replica_router()
+    if replica_pool is not None and router.use_replica(session.get('wrt') if session else None):
+        try:
+            conn = await replica_pool.acquire()
+        except Exception as e:
+            router.replica_failed(e)
+        else:
+            try:
+                yield conn
+            finally:
+                replica_pool.release(conn)
+            return
+    async with db_pool.acquire() as conn:
+        yield conn
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    global db_pool, replica_pool
+    db_pool = await create_pool(config)
+    if replica_config is not None:
+        replica_pool = await create_pool(replica_config)
+        await asyncio.to_thread(get_replica_router)
+    # In-memory reference data loads through the sync pool in its own thread
+    await asyncio.to_thread(warm_up)
+    try:
+        yield
+    finally:
+        for pool in (db_pool, replica_pool):
+            if pool is not None:
+                pool.close()
+                await pool.wait_closed()
+        shut_down()
+
+
+async def handle_hasher_busy(request, e):
+    return json_response({"error": "Server is busy, please retry shortly"}, 503,
+                         headers={'Retry-After': str(e.retry_after)})
+
+
+async def handle_rate_limited(request, e):
+    return json_response({"error": "Too many attempts, please try again later"}, 429,
+                         headers={'Retry-After': str(e.retry_after)})
+
+
+def client_ip(request):
+    return request.client.host if request.client else None
+
+
+async def index(request):
+    return json_response({"message": "College Major Explorer backend is running!"})
+
+
+async def health_check(request):
+    try:
+        async with db_pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("SHOW TABLES LIKE 'User'")
+                users_table_exists = await cursor.fetchone() is not None
+                users_count = 0
+                if users_table_exists:
+                    await cursor.execute("SELECT COUNT(*) FROM User")
+                    users_count = (await cursor.fetchone())[0]
+        return json_response({
+            "status": "healthy",
+            "database_connected": True,
+            "users_table_exists": users_table_exists,
+            "users_count": users_count
+        })
+    except Exception as e:
+        return json_response({
+            "status": "unhealthy",
+            "database_connected": False,
+            "error": str(e)
+        }, 500)
+
+
+async def signup(request):
+    data = await get_json(request)
+    username = data.get('username')
+    email = data.get('email')
+    password = data.get('password')
+    confirm_password = data.get('confirm_password')
+
+    rate_limits['signup'].check(client_ip(request), email)
+
+    if not all([username, email, password, confirm_password]):
+        return json_response({"error": "All fields are required"}, 400)
+    if password != confirm_password:
+        return json_response({"error": "Passwords do not match"}, 400)
+
+    hashed_password = await password_hasher.hash_async(password)
+
+    async with db_pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            try:
+                await cursor.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+                await cursor.execute("START TRANSACTION")
+                await cursor.callproc('sp_basic_signup', (username, email, hashed_password))
+                await cursor.execute("SELECT LAST_INSERT_ID() as user_id")
+                result = await cursor.fetchone()
+                user_id = result[0] if result else None
+                await conn.commit()
+                log_event(log, logging.INFO, "SIGNUP_LOG", "User registered with hot majors",
+                          username=username, user_id=user_id, outcome="created")
+                return json_response({
+                    "message": "Account created successfully! Welcome to College Major Explorer.",
+                    "user_id": user_id,
+                    "username": username,
+                    **mark_write(user_id)
+                }, 201)
+            except pymysql.MySQLError as e:
+                await conn.rollback()
+                errno, msg = mysql_error(e)
+                if errno == 1644 and "Username or e-mail already taken" in str(msg):
+                    log_event(log, logging.INFO, "SIGNUP_LOG", "Duplicate signup attempt",
+                              username=username, email=email, outcome="duplicate")
+                    return json_response({"error": "Username or email already taken"}, 400)
+                error_msg = f"MySQL error: {msg} (Error code: {errno})"
+                log_event(log, logging.ERROR, "ERROR_LOG", "Database error during signup",
+                          route="/signup", errno=errno, error=msg)
+                return json_response({"error": error_msg}, 500)
+            except Exception as e:
+                await conn.rollback()
+                error_msg = f"Unexpected error: {str(e)}"
+                log_event(log, logging.ERROR, "ERROR_LOG", "Unexpected error during signup",
+                          route="/signup", error=str(e), exc_info=True)
+                return json_response({"error": error_msg}, 500)
+
+
+async def login(request):
+    data = await get_json(request)
+    username_or_email = data.get('username_or_email')
+    password = data.get('password')
+
+    rate_limits['login'].check(client_ip(request), username_or_email)
+
+    if not username_or_email or not password:
+        return json_response({"error": "Username/email and password are required"}, 400)
+
+    async with db_pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            try:
+                column = 'email' if '@' in username_or_email else 'username'
+                await cursor.execute(
+                    f"SELECT user_id, username, password_hash FROM User WHERE {column} = %s",
+                    (username_or_email,)
+                )
+                user = await cursor.fetchone()
+                if not user:
+                    return json_response({"error": "Invalid username/email or password"}, 401)
+
+                if not await password_hasher.check_async(password, user['password_hash']):
+                    return json_response({"error": "Invalid username/email or password"}, 401)
+
+                if password_hasher.needs_rehash(user['password_hash']):
+                    try:
+                        await cursor.execute(
+                            "UPDATE User SET password_hash = %s WHERE user_id = %s",
+                            (await password_hasher.hash_async(password), user['user_id'])
+                        )
+                    except Exception as e:
+                        log_event(log, logging.WARNING, "ERROR_LOG", "Password rehash skipped",
+                                  user_id=user['user_id'], error=str(e))
+                return json_response({
+                    "message": "Login successful",
+                    "user_id": user['user_id'],
+                    "username": user['username'],
+                    **session_response(user['user_id'])
+                })
+            except HasherBusy:
+                raise
+            except Exception as e:
+                return json_response({"error": f"Database error: {str(e)}"}, 500)
+
+
+async def logout(request):
+    token = bearer_token(request.headers.get('authorization'))
+    if not token:
+        return json_response({"error": "Authentication required"}, 401)
+    try:
+        session_tokens.revoke(token)
+    except InvalidToken:
+        pass
+    return json_response({"message": "Logged out"})
+
+
+@require_session
+async def get_user_profile(request):
+    user_id = request.path_params['user_id']
+    async with read_connection(request.state.session) as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            try:
+                await cursor.execute(USER_PROFILE_QUERY, (user_id,))
+                user = await cursor.fetchone()
+                if not user:
+                    return json_response({"error": "User not found"}, 404)
+                return json_response(user)
+            except Exception as e:
+                return json_response({"error": f"Database error: {str(e)}"}, 500)
+
+
+@require_session
+async def update_user_profile(request):
+    user_id = request.path_params['user_id']
+    data = await get_json(request)
+    username = data.get('username')
+    email = data.get('email')
+    password = data.get('password')
+
+    if not any([username, email, password]):
+        return json_response({"error": "At least one field must be provided"}, 400)
+
+    hashed_password = await password_hasher.hash_async(password) if password else None
+
+    async with db_pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            try:
+                await cursor.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+                await cursor.execute("START TRANSACTION")
+                await cursor.execute("SELECT username, email FROM User WHERE user_id = %s", (user_id,))
+                if not await cursor.fetchone():
+                    await conn.rollback()
+                    return json_response({"error": "User not found"}, 404)
+                update_fields = []
+                update_values = []
+                if username:
+                    await cursor.execute("SELECT user_id FROM User WHERE username = %s AND user_id != %s", (username, user_id))
+                    if await cursor.fetchone():
+                        await conn.rollback()
+                        return json_response({"error": "Username already taken"}, 400)
+                    update_fields.append("username = %s")
+                    update_values.append(username)
+                if email:
+                    await cursor.execute("SELECT user_id FROM User WHERE email = %s AND user_id != %s", (email, user_id))
+                    if await cursor.fetchone():
+                        await conn.rollback()
+                        return json_response({"error": "Email already taken"}, 400)
+                    update_fields.append("email = %s")
+                    update_values.append(email)
+                if password:
+                    update_fields.append("password_hash = %s")
+                    update_values.append(hashed_password)
+                if update_fields:
+                    update_values.append(user_id)
+                    query = f"UPDATE User SET {', '.join(update_fields)}, updated_at = NOW() WHERE user_id = %s"
+                    await cursor.execute(query, update_values)
+                if password:
+                    revoked_before = session_tokens.now()
+                    await cursor.execute(REVOKE_SESSIONS_QUERY, (user_id, revoked_before))
+                await conn.commit()
+                session = request.state.session
+                if password:
+                    session_tokens.revoke_user(user_id, revoked_before)
+                    session = None
+                return json_response({
+                    "message": "Profile updated successfully",
+                    "user_id": user_id,
+                    **mark_write(user_id, session)
+                })
+            except Exception as e:
+                await conn.rollback()
+                return json_response({"error": f"Database error: {str(e)}"}, 500)
+
+
+@conditional_get('major_stats', 'interest_area', engine_backed=True)
+async def get_majors(request):
+    area_id = arg(request, 'area_id', int)
+    min_salary = arg(request, 'min_salary', float, 0)
+    min_growth = arg(request, 'min_growth', float, 0)
+    cursor_arg = arg(request, 'cursor')
+    want_total = arg(request, 'count') == '1'
+
+    try:
+        sort_field, descending = parse_sort(arg(request, 'sort'), MAJOR_SORT_COLUMNS)
+        limit = parse_limit(arg(request, 'limit', int))
+        after = None
+        if cursor_arg:
+            sort_field = sort_field or 'major_id'
+            after = decode_cursor(cursor_arg, numeric=sort_field != 'major_name')
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+
+    headers = {}
+    engine = flask_app_module.majors_engine
+    if engine is not None:
+        snapshot = engine.current
+        idx = snapshot.select(area_id, min_salary, min_growth, sort_field, descending, limit, after)
+        if limit is not None and len(idx) == limit:
+            last = idx[-1]
+            headers['X-Next-Cursor'] = encode_cursor(
+                snapshot.sort_value(sort_field, last), int(snapshot.major_id[last])
+            )
+        if want_total:
+            headers['X-Total-Count'] = str(len(snapshot.select(area_id, min_salary, min_growth)))
+        return Response(snapshot.render(idx) + "\n", media_type="application/json", headers=headers)
+
+    query, params, count_query, count_params = build_majors_query(
+        area_id, min_salary, min_growth, sort_field, descending, limit, after
+    )
+    async with read_connection() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(query, params)
+            results = list(await cursor.fetchall())
+            if want_total:
+                async def count():
+                    await cursor.execute(count_query, count_params)
+                    return (await cursor.fetchone())['total']
+                filter_key = ('majors', area_id, min_salary, min_growth)
+                headers['X-Total-Count'] = str(await count_cache.get_async(filter_key, count))
+
+    next_cursor = finish_majors_page(results, limit, limit is not None or after is not None)
+    if next_cursor:
+        headers['X-Next-Cursor'] = next_cursor
+    return json_response(results, headers=headers)
+
+
+@conditional_get('interest_area')
+async def get_interest_areas(request):
+    async with read_connection() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute("SELECT interest_area_id, name FROM InterestArea")
+            return json_response(list(await cursor.fetchall()))
+
+
+async def interest_area_index():
+    """app.get_interest_area_index(), built off the event loop if warm-up did not"""
+    index = flask_app_module.interest_area_index
+    if index is None:
+        index = await run_in_threadpool(get_interest_area_index)
+    return index
+
+
+async def search_interest_areas(request):
+    query = arg(request, 'q', default='').strip()
+    try:
+        limit = parse_limit(arg(request, 'limit', int))
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+    if not query:
+        return json_response([])
+    try:
+        return json_response((await interest_area_index()).search(query, limit))
+    except Exception as e:
+        log_event(log, logging.ERROR, "ERROR_LOG", "Error searching interest areas",
+                  route="/search-interest-areas", error=str(e), exc_info=True)
+        return json_response({"error": f"Database error: {str(e)}"}, 500)
+
+
+@require_session
+async def save_comparison(request):
+    data = await get_json(request)
+    user_id = data.get('user_id')
+    major_ids = data.get('major_ids', [])
+
+    if not user_id or not major_ids:
+        return json_response({"error": "Missing user_id or major_ids"}, 400)
+
+    async with db_pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            try:
+                await cursor.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+                await cursor.execute("START TRANSACTION")
+                for attempt in range(SAVE_COMPARISON_RETRIES):
+                    placeholders = ', '.join(['%s'] * len(major_ids))
+                    await cursor.execute(
+                        f"SELECT major_id FROM SavedComparison WHERE user_id = %s AND major_id IN ({placeholders})",
+                        [user_id] + list(major_ids)
+                    )
+                    new_ids, trigger_errors = split_saved_duplicates(
+                        major_ids, {row[0] for row in await cursor.fetchall()}
+                    )
+                    try:
+                        if new_ids:
+                            values = ', '.join(['(%s, %s, NOW())'] * len(new_ids))
+                            await cursor.execute(
+                                f"INSERT INTO SavedComparison (user_id, major_id, saved_at) VALUES {values}",
+                                [value for major_id in new_ids for value in (user_id, major_id)]
+                            )
+                        break
+                    except pymysql.MySQLError as e:
+                        errno, msg = mysql_error(e)
+                        if errno == 1644 and "Comparison already saved" in str(msg) \
+                                and attempt < SAVE_COMPARISON_RETRIES - 1:
+                            continue
+                        raise
+                await conn.commit()
+                saved_count = len(new_ids)
+                skipped_count = len(trigger_errors)
+                if trigger_errors:
+                    log_event(log, logging.INFO, "TRIGGER_LOG", "Duplicate save prevented",
+                              user_id=user_id, major_ids=trigger_errors)
+                log_event(log, logging.DEBUG, "SUMMARY_LOG", "Save operation",
+                          user_id=user_id, saved=saved_count, skipped=skipped_count)
+                if saved_count > 0 and skipped_count > 0:
+                    message = f"Saved {saved_count} new comparisons. {skipped_count} were already saved."
+                elif saved_count > 0:
+                    message = f"Successfully saved {saved_count} comparison(s)."
+                else:
+                    message = f"All {skipped_count} comparison(s) were already saved."
+                return json_response({
+                    "message": message,
+                    "saved": saved_count,
+                    "skipped": skipped_count,
+                    "duplicates": trigger_errors,
+                    **mark_write(request.state.session['uid'], request.state.session)
+                })
+            except pymysql.MySQLError as e:
+                await conn.rollback()
+                errno, msg = mysql_error(e)
+                error_msg = f"MySQL error: {msg} (Error code: {errno})"
+                log_event(log, logging.ERROR, "ERROR_LOG", "Database error during save_comparison",
+                          route="/save-comparison", errno=errno, error=msg)
+                return json_response({"error": error_msg}, 500)
+            except Exception as e:
+                await conn.rollback()
+                error_msg = f"Unexpected error: {str(e)}"
+                log_event(log, logging.ERROR, "ERROR_LOG", "Unexpected error during save_comparison",
+                          route="/save-comparison", error=str(e), exc_info=True)
+                return json_response({"error": error_msg}, 500)
+
+
+async def load_saved_comparisons(cursor, user_id):
+    await cursor.execute(SAVED_COMPARISONS_QUERY, (user_id,))
+    return list(await cursor.fetchall())
+
+
+async def cached_saved_comparisons(cursor, user_id):
+    """app.cached_saved_comparisons for aiomysql cursors"""
+    await cursor.execute(SAVED_VERSION_QUERY, (user_id,))
+    key = saved_comparisons_key(await cursor.fetchone(), user_id)
+    return await saved_comparisons_cache.get_async(key, lambda: load_saved_comparisons(cursor, user_id))
+
+
+@require_session
+async def get_saved_comparisons(request):
+    user_id = request.path_params['user_id']
+
+    try:
+        async with read_connection(request.state.session) as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                saved_comparisons = await cached_saved_comparisons(cursor, user_id)
+        return json_response({
+            "user_id": user_id,
+            "saved_comparisons": saved_comparisons,
+            "count": len(saved_comparisons)
+        })
+    except Exception as e:
+        return json_response({"error": f"Database error: {str(e)}"}, 500)
+
+
+async def trending_majors(request):
+    try:
+        limit = parse_limit(arg(request, 'limit', int, 10))
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+    try:
+        async with read_connection() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(TRENDING_MAJORS_QUERY, (limit,))
+                rows = list(await cursor.fetchall())
+        return json_response(trending_payload(rows))
+    except Exception as e:
+        return json_response({"error": f"Database error: {str(e)}"}, 500)
+
+
+@require_session
+async def bootstrap(request):
+    user_id = request.path_params['user_id']
+    engine = flask_app_module.majors_engine
+    try:
+        interest_areas = (await interest_area_index()).current.rows
+        async with read_connection(request.state.session) as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(USER_PROFILE_QUERY, (user_id,))
+                user = await cursor.fetchone()
+                if not user:
+                    return json_response({"error": "User not found"}, 404)
+                saved_comparisons = await cached_saved_comparisons(cursor, user_id)
+                if engine is not None:
+                    snapshot = engine.current
+                    majors = snapshot.records(snapshot.select())
+                else:
+                    query, params, _, _ = build_majors_query(None, 0, 0)
+                    await cursor.execute(query, params)
+                    majors = list(await cursor.fetchall())
+        return json_response({
+            "user": user,
+            "interest_areas": interest_areas,
+            "majors": majors,
+            "saved_comparisons": saved_comparisons,
+            "saved_count": len(saved_comparisons)
+        })
+    except Exception as e:
+        return json_response({"error": f"Database error: {str(e)}"}, 500)
+
+
+@conditional_get('major_stats', 'data_source')
+async def get_major_jobs_batch(request):
+    want_total = arg(request, 'count') == '1'
+    try:
+        major_ids = parse_id_list(request.query_params.getlist('ids'))
+        sort_field, descending = parse_sort(arg(request, 'sort'), MAJOR_JOB_SORT_COLUMNS,
+                                            default='-avg_salary')
+        limit = parse_limit(arg(request, 'limit', int))
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+
+    query, params = build_major_jobs_batch_query(major_ids, sort_field, descending, limit)
+    try:
+        async with read_connection() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params)
+                majors = group_major_jobs(major_ids, await cursor.fetchall(), limit, want_total)
+        return json_response({"majors": majors, "count": len(majors)})
+    except Exception as e:
+        return json_response({"error": f"Database error: {str(e)}"}, 500)
+
+
+@conditional_get('major_stats', 'data_source')
+async def get_major_jobs(request):
+    major_id = request.path_params['major_id']
+    cursor_arg = arg(request, 'cursor')
+    want_total = arg(request, 'count') == '1'
+    try:
+        sort_field, descending = parse_sort(arg(request, 'sort'), MAJOR_JOB_SORT_COLUMNS,
+                                            default='-avg_salary')
+        limit = parse_limit(arg(request, 'limit', int))
+        after = decode_cursor(cursor_arg) if cursor_arg else None
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+
+    query, params = build_major_jobs_query(major_id, sort_field, descending, limit, after)
+    try:
+        async with read_connection() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params)
+                jobs = list(await cursor.fetchall())
+                await cursor.execute("SELECT major_name FROM Major WHERE major_id = %s", (major_id,))
+                major_result = await cursor.fetchone()
+                major_name = major_result['major_name'] if major_result else "Unknown Major"
+
+                result = {
+                    "major_id": major_id,
+                    "major_name": major_name,
+                    "jobs": jobs,
+                    "count": len(jobs)
+                }
+                if limit is not None:
+                    last = jobs[-1] if len(jobs) == limit else None
+                    result["next_cursor"] = encode_cursor(last[sort_field], last['stat_id']) if last else None
+                if want_total:
+                    async def count():
+                        await cursor.execute(
+                            "SELECT COUNT(*) AS total FROM MajorStats WHERE major_id = %s", (major_id,)
+                        )
+                        return (await cursor.fetchone())['total']
+                    result["total"] = await count_cache.get_async(('major-jobs', major_id), count)
+        return json_response(result)
+    except Exception as e:
+        return json_response({"error": f"Database error: {str(e)}"}, 500)
+
+
+@require_session
+async def remove_saved_comparison(request):
+    user_id = request.path_params['user_id']
+    major_id = request.path_params['major_id']
+    async with db_pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            try:
+                await cursor.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+                await cursor.execute("START TRANSACTION")
+                await cursor.execute(
+                    "DELETE FROM SavedComparison WHERE user_id = %s AND major_id = %s",
+                    (user_id, major_id)
+                )
+                if cursor.rowcount == 0:
+                    await conn.rollback()
+                    return json_response({"error": "Saved comparison not found"}, 404)
+                await conn.commit()
+                return json_response({"message": "Saved comparison removed successfully",
+                                      **mark_write(user_id, request.state.session)})
+            except Exception as e:
+                await conn.rollback()
+                return json_response({"error": f"Database error: {str(e)}"}, 500)
+
+
+routes = [
+    Route('/', index),
+    Route('/health', health_check, methods=['GET']),
+    Route('/signup', signup, methods=['POST']),
+    Route('/login', login, methods=['POST']),
+    Route('/logout', logout, methods=['POST']),
+    Route('/user/{user_id:int}', get_user_profile, methods=['GET']),
+    Route('/user/{user_id:int}', update_user_profile, methods=['PUT']),
+    Route('/majors', get_majors, methods=['GET']),
+    Route('/interest-areas', get_interest_areas, methods=['GET']),
+    Route('/search-interest-areas', search_interest_areas, methods=['GET']),
+    Route('/save-comparison', save_comparison, methods=['POST']),
+    Route('/saved-comparisons/{user_id:int}', get_saved_comparisons, methods=['GET']),
+    Route('/trending-majors', trending_majors, methods=['GET']),
+    Route('/bootstrap/{user_id:int}', bootstrap, methods=['GET']),
+    Route('/major-jobs', get_major_jobs_batch, methods=['GET']),
+    Route('/major-jobs/{major_id:int}', get_major_jobs, methods=['GET']),
+    Route('/saved-comparisons/{user_id:int}/{major_id:int}', remove_saved_comparison, methods=['DELETE']),
+]
+
+class CompressionMiddleware:
+    """app.compress_response for ASGI; streamed (multi-part) bodies pass through"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or compress_min_size is None:
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = None
+        for name, value in scope['headers']:
+            if name == b'accept-encoding':
+                accept_encoding = value.decode('latin-1')
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message['type'] == 'http.response.start':
+                start = message
+                return
+            if start is None or message['type'] != 'http.response.body':
+                await send(message)
+                return
+            headers = MutableHeaders(raw=start['headers'])
+            body = message.get('body', b'')
+            if not message.get('more_body') and should_compress(
+                    headers.get('content-type'), headers.get('content-encoding'), len(body),
+                    compress_min_size):
+                headers.add_vary_header('Accept-Encoding')
+                encoding = choose_encoding(accept_encoding)
+                if encoding is not None:
+                    # CPU-bound on large bodies; keep it off the event loop
+                    body = await run_in_threadpool(compress, body, encoding)
+                    headers['Content-Encoding'] = encoding
+                    headers['Content-Length'] = str(len(body))
+                    etag = headers.get('etag')
+                    if etag and not etag.startswith('W/'):
+                        headers['ETag'] = f'W/{etag}'
+                    message = dict(message, body=body)
+            await send(start)
+            start = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+app = Starlette(
+    routes=routes,
+    middleware=[Middleware(
+        CORSMiddleware,
+        allow_origins=['*'],
+        allow_methods=['*'],
+        allow_headers=['*'],
+        expose_headers=['X-Next-Cursor', 'X-Total-Count', 'ETag']
+    ), Middleware(CompressionMiddleware)],
+    exception_handlers={HasherBusy: handle_hasher_busy, RateLimited: handle_rate_limited},
+    lifespan=lifespan,
+)
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Endpoint load test and latency benchmark for app.py
+
+1. (optional) --setup creates the schema in a local MySQL from schema.sql
+   and the setup_*.sql scripts; --seed fills it with generate_data.py
+   (all of its options are accepted here).
+2. Drives every route of a running server (python app.py, or the ASGI
+   entry point) from --concurrency worker threads for --duration seconds,
+   with a weighted mix of reads and writes.
+3. Prints throughput and p50/p95/p99 per endpoint and writes the same
+   numbers as JSON (--output) so runs can be compared with --compare.
+
+Local stand-in: any MySQL 8 works, e.g.
+    docker run -d -p 3306:3306 -e MYSQL_ROOT_PASSWORD=bench -e MYSQL_DATABASE=college_major_db mysql:8
+    DB_USER=root DB_PASSWORD=bench python benchmark.py --setup --seed
+    DB_USER=root DB_PASSWORD=bench RATE_LIMIT_LOGIN_IP=off RATE_LIMIT_SIGNUP_IP=off python app.py &
+    DB_USER=root DB_PASSWORD=bench python benchmark.py --duration 30 --concurrency 16
+
+All load comes from one IP, so the server's per-IP /login and /signup
+limits have to be off (as above) or those routes measure 429s.
+
+Example regression check:
+    python benchmark.py --output new.json --compare baseline.json --max-regression 0.2
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit, urlencode
+
+import mysql.connector
+from dotenv import load_dotenv
+
+import generate_data
+
+load_dotenv()
+
+config = {
+    'user': os.getenv('DB_USER', 'apalu3'),
+    'password': os.getenv('DB_PASSWORD', 'password328'),
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'database': os.getenv('DB_NAME', 'college_major_db'),
+    'port': int(os.getenv('DB_PORT', '3306'))
+}
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+SETUP_FILES = [
+    'schema.sql',
+    'setup_data_version.sql',
+    'setup_major_aggregate.sql',
+    'setup_pagination_indexes.sql',
+    'setup_ingestion.sql',
+    'setup_hot_majors.sql',
+]
+
+# Errors that only mean "already set up" when re-running the scripts
+ALREADY_EXISTS = {1050, 1061, 1826}
+
+BENCH_PASSWORD = 'Benchmark1'
+BENCH_USER_PREFIX = 'bench_user_'
+
+
+# ---------------------------------------------------------------- database
+
+def run_sql_file(conn, path):
+    """Execute a .sql script, honouring DELIMITER lines like the mysql CLI"""
+    delimiter = ';'
+    statement = []
+    cursor = conn.cursor()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.upper().startswith('DELIMITER '):
+                delimiter = stripped.split()[1]
+                continue
+            if not statement and (not stripped or stripped.startswith('--')):
+                continue
+            statement.append(line)
+            if stripped.endswith(delimiter):
+                sql = ''.join(statement).rstrip()[:-len(delimiter)]
+                statement = []
+                try:
+                    cursor.execute(sql)
+                    if cursor.with_rows:
+                        cursor.fetchall()
+                except mysql.connector.Error as e:
+                    if e.errno not in ALREADY_EXISTS:
+                        raise
+    cursor.close()
+    conn.commit()
+
+
+def setup_schema(conn):
+    for name in SETUP_FILES:
+        print(f"[BENCH_LOG] Running {name}")
+        run_sql_file(conn, os.path.join(HERE, name))
+
+
+def load_targets(conn, username_prefix):
+    """Ids the scenarios pick from"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT user_id, username FROM User WHERE username LIKE %s", (username_prefix + '%',))
+    users = cursor.fetchall()
+    cursor.execute("SELECT major_id FROM Major")
+    major_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT interest_area_id, name FROM InterestArea")
+    areas = cursor.fetchall()
+    cursor.close()
+    if not users or not major_ids or not areas:
+        raise SystemExit("No benchmark data found; run with --seed first")
+    return {'users': users, 'major_ids': major_ids, 'areas': areas}
+
+
+# ---------------------------------------------------------------- load
+
+class Client:
+    """Keep-alive HTTP client that reconnects when the server closes"""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method, path, body=None, token=None):
+        return self.fetch(method, path, body, token)[0]
+
+    def fetch(self, method, path, body=None, token=None):
+        """(status, response body bytes)"""
+        headers = {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if token is not None:
+            headers['Authorization'] = f'Bearer {token}'
+        for attempt in (0, 1):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                if response.will_close:
+                    self.conn.close()
+                    self.conn = None
+                return response.status, data
+            except (http.client.HTTPException, ConnectionError):
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+
+
+def login_sessions(args, users):
+    """
+    Log in a sample of users up front so the per-user routes can send a
+    session token; logging in inside the timed loop would charge a bcrypt
+    check to the first request of every user.
+    """
+    client = Client(args.base_url, args.timeout)
+    sessions = []
+    for user_id, username in random.Random(args.random_seed).sample(users, min(args.session_users, len(users))):
+        status, data = client.fetch('POST', '/login', {'username_or_email': username, 'password': args.password})
+        if status != 200:
+            raise SystemExit(f"Login as {username} failed with HTTP {status}: {data[:200]!r}")
+        sessions.append((user_id, username, json.loads(data)['token']))
+    print(f"[BENCH_LOG] Logged in {len(sessions)} users for the authenticated routes")
+    return sessions
+
+
+def build_scenarios(targets, rng_seed, password):
+    """
+    (name, weight, expected statuses, factory(rng) -> (method, path, body[, token]))
+    """
+    users = targets['users']
+    sessions = targets['sessions']
+    major_ids = targets['major_ids']
+    areas = targets['areas']
+    counter = iter(range(10 ** 9))
+    counter_lock = threading.Lock()
+    run_tag = f"{rng_seed}_{int(time.time())}"
+
+    def next_id():
+        with counter_lock:
+            return next(counter)
+
+    def user(rng):
+        return rng.choice(users)
+
+    def session(rng):
+        return rng.choice(sessions)
+
+    def filtered_majors(rng):
+        query = urlencode({
+            'area_id': rng.choice(areas)[0],
+            'min_salary': rng.choice([0, 40000, 60000, 80000]),
+            'min_growth': rng.choice([0, 2, 5]),
+        })
+        return 'GET', f'/majors?{query}', None
+
+    def search(rng):
+        name = rng.choice(areas)[1]
+        start = rng.randrange(max(len(name) - 2, 1))
+        return 'GET', '/search-interest-areas?' + urlencode({'q': name[start:start + rng.randint(1, 4)]}), None
+
+    def signup(rng):
+        n = next_id()
+        name = f"bench_signup_{run_tag}_{n}"
+        return 'POST', '/signup', {'username': name, 'email': f"{name}@example.com",
+                                   'password': password, 'confirm_password': password}
+
+    return [
+        ('GET /', 1, {200}, lambda rng: ('GET', '/', None)),
+        ('GET /health', 1, {200}, lambda rng: ('GET', '/health', None)),
+        ('GET /pool-stats', 1, {200}, lambda rng: ('GET', '/pool-stats', None)),
+        ('GET /hasher-stats', 1, {200}, lambda rng: ('GET', '/hasher-stats', None)),
+        ('GET /interest-areas', 10, {200}, lambda rng: ('GET', '/interest-areas', None)),
+        ('GET /search-interest-areas', 10, {200}, search),
+        ('GET /majors', 10, {200}, lambda rng: ('GET', '/majors', None)),
+        ('GET /majors (filtered)', 10, {200}, filtered_majors),
+        ('GET /majors (sorted page)', 5, {200},
+         lambda rng: ('GET', '/majors?sort=-average_salary&limit=20', None)),
+        ('GET /major-jobs/<id>', 10, {200},
+         lambda rng: ('GET', f'/major-jobs/{rng.choice(major_ids)}', None)),
+        ('GET /major-jobs?ids', 5, {200},
+         lambda rng: ('GET', '/major-jobs?ids=' + ','.join(
+             str(i) for i in rng.sample(major_ids, min(4, len(major_ids)))) + '&limit=10', None)),
+        ('GET /saved-comparisons/<id>', 10, {200},
+         lambda rng: (lambda s: ('GET', f'/saved-comparisons/{s[0]}', None, s[2]))(session(rng))),
+        ('GET /user/<id>', 5, {200},
+         lambda rng: (lambda s: ('GET', f'/user/{s[0]}', None, s[2]))(session(rng))),
+        ('GET /bootstrap/<id>', 3, {200},
+         lambda rng: (lambda s: ('GET', f'/bootstrap/{s[0]}', None, s[2]))(session(rng))),
+        ('GET /trending-majors', 3, {200}, lambda rng: ('GET', '/trending-majors', None)),
+        ('PUT /user/<id>', 1, {200},
+         lambda rng: (lambda s: ('PUT', f'/user/{s[0]}', {'username': s[1]}, s[2]))(session(rng))),
+        ('POST /login', 2, {200},
+         lambda rng: ('POST', '/login', {'username_or_email': user(rng)[1], 'password': password})),
+        ('POST /signup', 1, {201}, signup),
+        ('POST /save-comparison', 3, {200},
+         lambda rng: (lambda s: ('POST', '/save-comparison',
+                                 {'user_id': s[0], 'major_ids': rng.sample(major_ids, min(3, len(major_ids)))},
+                                 s[2]))(session(rng))),
+        ('DELETE /saved-comparisons/<uid>/<mid>', 2, {200, 404},
+         lambda rng: (lambda s: ('DELETE', f'/saved-comparisons/{s[0]}/{rng.choice(major_ids)}',
+                                 None, s[2]))(session(rng))),
+        ('GET /export/major-stats', 1, {200},
+         lambda rng: ('GET', f'/export/major-stats?area_id={rng.choice(areas)[0]}', None)),
+    ]
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    rank = max(int(round(p / 100.0 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def run_load(args, scenarios):
+    names = [s[0] for s in scenarios]
+    weights = [s[1] for s in scenarios]
+    samples = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    lock = threading.Lock()
+    warmup_end = time.monotonic() + args.warmup
+    end = warmup_end + args.duration
+
+    def worker(worker_id):
+        rng = random.Random(args.random_seed * 1000 + worker_id)
+        client = Client(args.base_url, args.timeout)
+        while True:
+            now = time.monotonic()
+            if now >= end:
+                return
+            index = rng.choices(range(len(scenarios)), weights)[0]
+            name, _, expected, factory = scenarios[index]
+            method, path, body, *token = factory(rng)
+            started = time.perf_counter()
+            try:
+                status = client.request(method, path, body, *token)
+                ok = status in expected
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - started
+            if now < warmup_end:
+                continue
+            with lock:
+                samples[name].append(elapsed)
+                if not ok:
+                    errors[name] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(args.concurrency)]
+    print(f"[BENCH_LOG] {args.concurrency} workers, {args.warmup}s warm-up, {args.duration}s measured "
+          f"against {args.base_url}")
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    endpoints = {}
+    for name in names:
+        values = sorted(samples[name])
+        if not values:
+            continue
+        endpoints[name] = {
+            'count': len(values),
+            'errors': errors[name],
+            'rps': len(values) / args.duration,
+            'mean_ms': 1000 * sum(values) / len(values),
+            'p50_ms': 1000 * percentile(values, 50),
+            'p95_ms': 1000 * percentile(values, 95),
+            'p99_ms': 1000 * percentile(values, 99),
+            'max_ms': 1000 * values[-1],
+        }
+    all_values = sorted(v for name in names for v in samples[name])
+    total = {
+        'count': len(all_values),
+        'errors': sum(errors.values()),
+        'rps': len(all_values) / args.duration,
+        'p50_ms': 1000 * (percentile(all_values, 50) or 0),
+        'p95_ms': 1000 * (percentile(all_values, 95) or 0),
+        'p99_ms': 1000 * (percentile(all_values, 99) or 0),
+    }
+    return endpoints, total
+
+
+# ---------------------------------------------------------------- report
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def print_table(endpoints, total):
+    print(f"\n{'endpoint':40} {'count':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, e in endpoints.items():
+        print(f"{name:40} {e['count']:7d} {e['errors']:5d} {e['rps']:8.1f} "
+              f"{e['p50_ms']:8.2f} {e['p95_ms']:8.2f} {e['p99_ms']:8.2f}")
+    print(f"{'TOTAL':40} {total['count']:7d} {total['errors']:5d} {total['rps']:8.1f} "
+          f"{total['p50_ms']:8.2f} {total['p95_ms']:8.2f} {total['p99_ms']:8.2f}  (ms)")
+
+
+def compare(results, baseline_path, max_regression):
+    """Print p95 deltas against a previous run; returns the regressed endpoints"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressed = []
+    print(f"\nComparison with {baseline_path} (p95 ms):")
+    for name, e in results['endpoints'].items():
+        old = baseline.get('endpoints', {}).get(name)
+        if not old:
+            continue
+        change = (e['p95_ms'] - old['p95_ms']) / old['p95_ms'] if old['p95_ms'] else 0.0
+        flag = ''
+        if change > max_regression:
+            regressed.append(name)
+            flag = '  REGRESSION'
+        print(f"  {name:40} {old['p95_ms']:8.2f} -> {e['p95_ms']:8.2f} ({change:+.0%}){flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the College Major Explorer API")
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--setup', action='store_true', help="create the schema before running")
+    parser.add_argument('--seed', action='store_true', help="insert a synthetic dataset before running")
+    parser.add_argument('--seed-only', action='store_true', help="stop after --setup/--seed")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--warmup', type=float, default=5)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--session-users', type=int, default=50,
+                        help="users logged in before the run for the per-user routes")
+    parser.add_argument('--output', help="write results JSON here "
+                                         "(default bench_results/<timestamp>.json)")
+    parser.add_argument('--compare', help="previous results JSON to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help="fail when an endpoint's p95 grows by more than this fraction")
+    generate_data.add_arguments(parser.add_argument_group('dataset (--seed, see generate_data.py)'))
+    parser.set_defaults(username_prefix=BENCH_USER_PREFIX, password=BENCH_PASSWORD)
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**config)
+    try:
+        if args.setup:
+            setup_schema(conn)
+        if args.seed:
+            generate_data.generate(conn, args)
+        if args.seed_only:
+            return
+        targets = load_targets(conn, args.username_prefix)
+    finally:
+        conn.close()
+    targets['sessions'] = login_sessions(args, targets['users'])
+
+    endpoints, total = run_load(args, build_scenarios(targets, args.random_seed, args.password))
+    print_table(endpoints, total)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'base_url': args.base_url,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'warmup': args.warmup,
+            'random_seed': args.random_seed,
+            'dataset': {'users': len(targets['users']), 'majors': len(targets['major_ids']),
+                        'areas': len(targets['areas'])},
+            'session_users': len(targets['sessions']),
+        },
+        'endpoints': endpoints,
+        'total': total,
+    }
+    output = args.output or os.path.join(
+        'bench_results', datetime.now().strftime('%Y%m%d-%H%M%S') + '.json'
+    )
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n[BENCH_LOG] Results written to {output}")
+
+    if args.compare and compare(results, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+In-memory copy of the DataVersion table
+
+setup_data_version.sql bumps a row of DataVersion whenever the data
+behind a group of endpoints changes ('major_stats', 'interest_area',
+'data_source').
+DataVersionWatcher keeps those counters in memory, refreshed by a
+background poll, so app.py can build ETags and answer If-None-Match
+without touching MySQL. ETag strings are built once per version change.
+"""
+
+import logging
+import threading
+
+from app_logging import get_logger, log_event
+
+log = get_logger('data_version')
+
+VERSIONS_QUERY = "SELECT name, version FROM DataVersion"
+
+
+class DataVersionWatcher:
+    def __init__(self, connect, poll_interval=2.0):
+        self._connect = connect
+        self.poll_interval = poll_interval
+        self.versions = {}
+        self._etags = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load(self):
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(VERSIONS_QUERY)
+            versions = dict(cursor.fetchall())
+        finally:
+            cursor.close()
+            conn.close()
+        with self._lock:
+            if versions != self.versions:
+                self.versions = versions
+                self._etags = {}
+        return versions
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.load()
+            except Exception as e:
+                log_event(log, logging.ERROR, "ERROR_LOG", "Data version refresh failed", error=str(e))
+
+    def start(self):
+        if self._thread is None:
+            self.load()
+            self._thread = threading.Thread(target=self._poll, name="data-version", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def etag(self, names, overrides=None):
+        """
+        Opaque tag for the current versions of `names`, e.g. "major_stats.42".
+        `overrides` pins a name to another version (a snapshot still
+        serving older data must not be labelled with the newer version).
+        """
+        key = (names, tuple(sorted(overrides.items())) if overrides else None)
+        tag = self._etags.get(key)
+        if tag is None:
+            with self._lock:
+                versions = dict(self.versions, **(overrides or {}))
+                tag = '-'.join(f"{name}.{versions.get(name, 0)}" for name in names)
+                self._etags[key] = tag
+        return tag
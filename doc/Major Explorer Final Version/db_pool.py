@@ -0,0 +1,248 @@
+"""
+MySQL connection pool used by app.py
+
+Connections are handed out wrapped in a PooledConnection, so the existing
+route code (cursor() ... conn.close()) keeps working: close() hands the
+connection back to the pool instead of tearing down the TCP session.
+"""
+
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector import errors
+
+
+class PoolTimeout(errors.PoolError):
+    """Raised when no connection could be checked out within the timeout"""
+
+
+class PooledConnection:
+    """Thin proxy around a raw connection; close() returns it to the pool"""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        if self.__dict__.get("_raw") is None:
+            raise errors.OperationalError("Connection already returned to the pool")
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self.__getattr__("cursor")(*args, **kwargs)
+        wrap = self._pool.cursor_wrapper
+        return wrap(cursor) if wrap is not None else cursor
+
+    def close(self):
+        raw, self._raw = self.__dict__.get("_raw"), None
+        if raw is not None:
+            self._pool._checkin(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # Safety net for code paths that forget close(); never raise here
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Bounded pool of MySQL connections.
+
+    size          connections kept open while idle
+    max_overflow  extra connections opened under load, closed when returned
+    timeout       seconds a caller waits for a free connection
+    max_idle      idle connections older than this are closed and replaced
+    pre_ping      ping a connection before handing it out
+    reset_session reset session state (isolation level, user variables,
+                  open transaction) when a connection is returned
+    cursor_wrapper  optional callable applied to every cursor handed out
+    on_checkout     optional callable(seconds) told how long connect() took
+    """
+
+    def __init__(self, db_config, size=5, max_overflow=10, timeout=30.0,
+                 max_idle=300.0, pre_ping=True, reset_session=True,
+                 cursor_wrapper=None, on_checkout=None, **connect_args):
+        self.db_config = dict(db_config, **connect_args)
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.pre_ping = pre_ping
+        self.reset_session = reset_session
+        self.cursor_wrapper = cursor_wrapper
+        self.on_checkout = on_checkout
+
+        self._idle = deque()  # (raw_connection, returned_at)
+        self._cond = threading.Condition()
+        self._open = 0
+        self._checked_out = 0
+        self._waiters = 0
+        self._disposed = False
+        self._stats = {
+            "created": 0,
+            "discarded": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    def _new_raw(self):
+        raw = mysql.connector.connect(**self.db_config)
+        with self._cond:
+            self._stats["created"] += 1
+        return raw
+
+    def _discard(self, raw):
+        with self._cond:
+            self._stats["discarded"] += 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _healthy(self, raw, returned_at):
+        if self.max_idle and time.monotonic() - returned_at > self.max_idle:
+            return False
+        if self.pre_ping:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
+
+    def connect(self):
+        """Borrow a connection, waiting up to `timeout` seconds"""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+
+        with self._cond:
+            while not self._idle and self._open >= self.size + self.max_overflow:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"No database connection available after {self.timeout}s "
+                        f"({self._checked_out} checked out)"
+                    )
+                waited = True
+                self._waiters += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+
+            if waited:
+                wait_time = time.monotonic() - started
+                self._stats["waits"] += 1
+                self._stats["wait_time_total"] += wait_time
+                self._stats["wait_time_max"] = max(self._stats["wait_time_max"], wait_time)
+
+            candidate = self._idle.pop() if self._idle else None
+            # Reserve the slot before leaving the lock so concurrent callers
+            # cannot overshoot size + max_overflow while we connect or ping.
+            if candidate is None:
+                self._open += 1
+            self._checked_out += 1
+            self._stats["checkouts"] += 1
+
+        try:
+            if candidate is not None:
+                raw, returned_at = candidate
+                if not self._healthy(raw, returned_at):
+                    self._discard(raw)
+                    raw = self._new_raw()
+            else:
+                raw = self._new_raw()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._checked_out -= 1
+                self._cond.notify()
+            raise
+
+        if self.on_checkout is not None:
+            self.on_checkout(time.monotonic() - started)
+        return PooledConnection(self, raw)
+
+    def _checkin(self, raw):
+        # Rows still on the wire (an abandoned unbuffered cursor) would fail
+        # the next borrower's first query with "Unread result found"
+        keep = not raw.unread_result
+        try:
+            if keep and raw.in_transaction:
+                raw.rollback()
+            if keep and self.reset_session:
+                raw.reset_session()
+                raw.autocommit = self.db_config.get("autocommit", False)
+        except Exception:
+            keep = False
+
+        with self._cond:
+            self._checked_out -= 1
+            keep = keep and not self._disposed and len(self._idle) < self.size
+            if keep:
+                self._idle.append((raw, time.monotonic()))
+            else:
+                self._open -= 1
+            self._cond.notify()
+        if not keep:
+            self._discard(raw)
+
+    def prefill(self, count=None):
+        """Open idle connections up to `count` (default `size`) before traffic arrives"""
+        count = self.size if count is None else min(count, self.size)
+        while True:
+            with self._cond:
+                if self._open >= count:
+                    return
+                self._open += 1
+            try:
+                raw = self._new_raw()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((raw, time.monotonic()))
+                self._cond.notify()
+
+    def dispose(self):
+        """Close every idle connection; checked-out ones are closed on return"""
+        with self._cond:
+            self._disposed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+        for raw, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "checked_out": self._checked_out,
+                "overflow": max(0, self._open - self.size),
+                "waiters": self._waiters,
+            })
+        snapshot["wait_time_avg"] = (
+            snapshot["wait_time_total"] / snapshot["waits"] if snapshot["waits"] else 0.0
+        )
+        return snapshot
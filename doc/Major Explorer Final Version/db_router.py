@@ -0,0 +1,137 @@
+"""
+Primary/replica routing for read-only handlers
+
+ReplicaRouter decides, per request, whether a read may go to the replica:
+
+- a background thread measures replication lag every `lag_interval`
+  seconds (SHOW REPLICA STATUS, falling back to SHOW SLAVE STATUS on
+  servers older than 8.0.22); while the lag is above `max_lag`, unknown,
+  or not refreshed for 3 intervals, every read goes to the primary
+- a read made with a session token whose "wrt" claim (set by the write
+  handlers) is less than `sticky_window` seconds old goes to the primary
+  (read-your-writes); the client carries the pin, so it holds whichever
+  worker serves the read
+
+The router only decides; app.py and asgi_app.py own the pools and call
+replica_failed() when a replica connection cannot be opened, which also
+sends reads to the primary until the next successful lag check.
+"""
+
+import logging
+import threading
+import time
+
+from app_logging import get_logger, log_event
+
+log = get_logger('db_router')
+
+LAG_COLUMNS = ('Seconds_Behind_Source', 'Seconds_Behind_Master')
+
+
+class ReplicaRouter:
+    def __init__(self, connect, max_lag=5.0, sticky_window=10.0, lag_interval=1.0,
+                 clock=time.monotonic, wall_clock=time.time):
+        self._connect = connect
+        self.max_lag = max_lag
+        self.sticky_window = sticky_window
+        self.lag_interval = lag_interval
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self.lag = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._conn = None
+        self._counts = {"replica_reads": 0, "sticky_reads": 0, "lag_fallbacks": 0,
+                        "replica_errors": 0}
+
+    # ------------------------------------------------------------ lag
+
+    def _measure(self):
+        if self._conn is None:
+            self._conn = self._connect()
+        cursor = self._conn.cursor(dictionary=True)
+        try:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except Exception:
+                cursor.execute("SHOW SLAVE STATUS")
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        if not rows:
+            # No replication channel (e.g. two stand-alone test servers)
+            return 0
+        lags = [next((row[col] for col in LAG_COLUMNS if col in row), None) for row in rows]
+        if any(lag is None for lag in lags):
+            return None  # replication stopped or broken
+        return max(lags)
+
+    def check_lag(self):
+        try:
+            lag = self._measure()
+        except Exception as e:
+            lag = None
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+            log_event(log, logging.WARNING, "ERROR_LOG", "Replica lag check failed", error=str(e))
+        previous = self.lag
+        self.lag, self._checked_at = lag, self._clock()
+        if (lag is None or lag > self.max_lag) != (previous is None or previous > self.max_lag):
+            log_event(log, logging.INFO, "REPLICA_LOG", "Replica routing changed",
+                      lag=lag, max_lag=self.max_lag,
+                      reads="primary" if lag is None or lag > self.max_lag else "replica")
+        return lag
+
+    def _poll(self):
+        while not self._stop.wait(self.lag_interval):
+            self.check_lag()
+
+    def start(self):
+        if self._thread is None:
+            self.check_lag()
+            self._thread = threading.Thread(target=self._poll, name="replica-lag", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    # ------------------------------------------------------------ routing
+
+    def healthy(self):
+        checked_at = self._checked_at
+        return (self.lag is not None and self.lag <= self.max_lag and checked_at is not None
+                and self._clock() - checked_at <= 3 * self.lag_interval)
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def use_replica(self, wrote_at=None):
+        """True when this read may go to the replica; `wrote_at` is the session's "wrt" claim"""
+        if wrote_at is not None and self._wall_clock() - wrote_at < self.sticky_window:
+            self._count("sticky_reads")
+            return False
+        if not self.healthy():
+            self._count("lag_fallbacks")
+            return False
+        self._count("replica_reads")
+        return True
+
+    def replica_failed(self, error):
+        self._count("replica_errors")
+        self.lag = None
+        log_event(log, logging.WARNING, "ERROR_LOG", "Replica connection failed, using primary",
+                  error=str(error))
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+        return dict(counts, lag=self.lag if self.lag is not None else -1, max_lag=self.max_lag,
+                    healthy=int(self.healthy()))
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for scale testing
+
+Fills User, InterestArea, Major, DataSource, MajorStats, UserInterestArea
+and SavedComparison with skewed, repeatable data:
+
+  - major popularity is Zipfian (--zipf), so a handful of majors collect
+    most of the saves and interest areas follow the same curve
+  - every major has stats for a run of consecutive years per source, with
+    salaries drifting year over year around a per-area baseline
+  - users sign up across the last --months months and save comparisons
+    between their signup and --end-date, so saved_at is spread over
+    months and leans recent
+
+Rows are written with explicit ids in multi-row INSERT batches, committed
+per batch, with a rows/sec line every --report-every rows. The load runs
+with @bulk_load set, so the per-row triggers on MajorStats and
+SavedComparison (aggregate upkeep, the duplicate check, version bumps)
+are skipped; afterwards MajorAggregate is rebuilt once and every new
+user's SavedComparisonVersion is bumped once. The same
+--random-seed and --end-date always produce the same data. Users all share one
+bcrypt hash of --password so benchmarks can log in as any of them.
+
+Examples:
+  python generate_data.py --users 10000 --majors 500
+  python generate_data.py --users 2000000 --saves-per-user 12 --fast
+"""
+
+import argparse
+import bisect
+import itertools
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+import bcrypt
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+config = {
+    'user': os.getenv('DB_USER', 'apalu3'),
+    'password': os.getenv('DB_PASSWORD', 'password328'),
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'database': os.getenv('DB_NAME', 'college_major_db'),
+    'port': int(os.getenv('DB_PORT', '3306'))
+}
+
+AREA_NAMES = [
+    'Engineering', 'Computer Science', 'Business', 'Health', 'Biology',
+    'Physical Sciences', 'Mathematics', 'Social Sciences', 'Psychology',
+    'Education', 'Arts', 'Humanities', 'Communications', 'Law & Public Policy',
+    'Agriculture', 'Architecture', 'Industrial Arts', 'Interdisciplinary',
+]
+
+MAJOR_PREFIXES = [
+    'Applied', 'General', 'Advanced', 'Computational', 'Environmental',
+    'International', 'Clinical', 'Digital', 'Industrial', 'Theoretical',
+]
+
+MAJOR_FIELDS = [
+    'Engineering', 'Economics', 'Statistics', 'Design', 'Management',
+    'Chemistry', 'Physics', 'Studies', 'Systems', 'Sciences', 'Analytics',
+    'Technology', 'Policy', 'Media', 'Biology',
+]
+
+# MySQL errors for a missing procedure / table (setup script not run)
+NO_SUCH_PROCEDURE = 1305
+NO_SUCH_TABLE = 1146
+
+SAVED_VERSION_BUMP = """
+    INSERT INTO SavedComparisonVersion (user_id, version)
+    SELECT DISTINCT user_id, 1 FROM SavedComparison WHERE user_id BETWEEN %s AND %s
+    ON DUPLICATE KEY UPDATE version = version + 1
+"""
+
+
+def add_arguments(parser):
+    """Generator options, shared with benchmark.py --seed"""
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--areas', type=int, default=20)
+    parser.add_argument('--majors', type=int, default=500)
+    parser.add_argument('--sources', type=int, default=2)
+    parser.add_argument('--years', type=int, default=5, help="most years of stats per major and source")
+    parser.add_argument('--saves-per-user', type=float, default=5, help="mean saved comparisons per user")
+    parser.add_argument('--interests-per-user', type=float, default=1.5, help="mean interest areas per user")
+    parser.add_argument('--zipf', type=float, default=1.1, help="popularity skew exponent")
+    parser.add_argument('--months', type=int, default=12, help="how far back signups and saves go")
+    parser.add_argument('--end-date', default=None, help="YYYY-MM-DD of the newest save (default today)")
+    parser.add_argument('--password', default='Password1')
+    parser.add_argument('--username-prefix', default='user_')
+    parser.add_argument('--random-seed', type=int, default=411)
+    parser.add_argument('--batch-size', type=int, default=2000)
+    parser.add_argument('--report-every', type=int, default=100000)
+    parser.add_argument('--fast', action='store_true',
+                        help="skip unique and foreign key checks while loading")
+
+
+class BatchInserter:
+    """Buffers rows for one table and flushes them as multi-row INSERTs"""
+
+    def __init__(self, conn, table, columns, batch_size, report_every, parent=None):
+        self.conn = conn
+        self.parent = parent
+        self.cursor = conn.cursor()
+        self.table = table
+        self.prefix = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+        self.placeholders = '(' + ', '.join(['%s'] * len(columns)) + ')'
+        self.batch_size = batch_size
+        self.report_every = report_every
+        self.rows = []
+        self.count = 0
+        self.started = time.monotonic()
+        self.next_report = report_every
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        if self.parent is not None:
+            # Parent rows must land before their children when checks are on
+            self.parent.flush()
+        self.cursor.execute(
+            self.prefix + ', '.join([self.placeholders] * len(self.rows)),
+            [value for row in self.rows for value in row]
+        )
+        self.conn.commit()
+        self.count += len(self.rows)
+        self.rows = []
+        if self.count >= self.next_report:
+            self.report()
+            self.next_report = self.count + self.report_every
+
+    def report(self, done=False):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        state = 'done' if done else 'so far'
+        print(f"[GENERATE_LOG] {self.table}: {self.count:,} rows {state} "
+              f"({self.count / elapsed:,.0f} rows/s)")
+
+    def close(self):
+        self.flush()
+        self.report(done=True)
+        self.cursor.close()
+
+
+def zipf_cum_weights(n, s):
+    """Cumulative weights for ranks 1..n with P(rank k) proportional to 1/k^s"""
+    return list(itertools.accumulate(1.0 / (k ** s) for k in range(1, n + 1)))
+
+
+def zipf_sample(rng, cum_weights, k):
+    """k distinct rank indexes drawn by Zipf weight (rejection on repeats)"""
+    k = min(k, len(cum_weights))
+    total = cum_weights[-1]
+    chosen = set()
+    attempts = 0
+    while len(chosen) < k:
+        chosen.add(bisect.bisect(cum_weights, rng.random() * total))
+        attempts += 1
+        if attempts > 20 * k:
+            # The tail is so thin that repeats dominate; fill from the head
+            chosen.update(itertools.islice((i for i in range(len(cum_weights)) if i not in chosen),
+                                           k - len(chosen)))
+    return chosen
+
+
+def poisson(rng, mean):
+    """Small-mean Poisson draw (Knuth); means here are single digits"""
+    if mean <= 0:
+        return 0
+    limit = pow(2.718281828459045, -mean)
+    k, p = 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def next_id(cursor, table, column):
+    cursor.execute(f"SELECT COALESCE(MAX({column}), 0) + 1 FROM {table}")
+    return cursor.fetchone()[0]
+
+
+def refresh_major_aggregate(cursor):
+    """Rebuild MajorAggregate once, in place of the skipped per-row triggers"""
+    try:
+        cursor.callproc('sp_refresh_major_aggregate')
+    except mysql.connector.Error as e:
+        # Without setup_major_aggregate.sql there is nothing to rebuild
+        if e.errno != NO_SUCH_PROCEDURE:
+            raise
+
+
+def bump_saved_versions(conn, cursor, first_user, last_user, step=100000):
+    """One SavedComparisonVersion bump per new user with saves, committed per id range"""
+    for low in range(first_user, last_user + 1, step):
+        try:
+            cursor.execute(SAVED_VERSION_BUMP, (low, min(low + step - 1, last_user)))
+        except mysql.connector.Error as e:
+            # Without setup_data_version.sql there are no versions to bump
+            if e.errno != NO_SUCH_TABLE:
+                raise
+            return
+        conn.commit()
+
+
+def generate(conn, args):
+    rng = random.Random(args.random_seed)
+    end = datetime.strptime(args.end_date, '%Y-%m-%d') if args.end_date \
+        else datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    end = end.replace(hour=23, minute=59, second=59)
+    span = timedelta(days=30 * args.months).total_seconds()
+    started = time.monotonic()
+
+    cursor = conn.cursor()
+    if args.fast:
+        cursor.execute("SET SESSION unique_checks = 0")
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+
+    def inserter(table, columns, parent=None):
+        return BatchInserter(conn, table, columns, args.batch_size, args.report_every, parent)
+
+    # Interest areas, ordered by popularity rank
+    first_area = next_id(cursor, 'InterestArea', 'interest_area_id')
+    area_ids = list(range(first_area, first_area + args.areas))
+    out = inserter('InterestArea', ['interest_area_id', 'name'])
+    for n, area_id in enumerate(area_ids):
+        base = AREA_NAMES[n % len(AREA_NAMES)]
+        out.add((area_id, base if n < len(AREA_NAMES) else f"{base} {n // len(AREA_NAMES) + 1}"))
+    out.close()
+    area_weights = zipf_cum_weights(len(area_ids), args.zipf)
+    area_salary = {area_id: rng.lognormvariate(11.0, 0.25) for area_id in area_ids}
+
+    # Sources
+    first_source = next_id(cursor, 'DataSource', 'source_id')
+    source_ids = list(range(first_source, first_source + args.sources))
+    out = inserter('DataSource', ['source_id', 'name', 'url'])
+    for n, source_id in enumerate(source_ids):
+        out.add((source_id, f"Synthetic Source {n + 1}", None))
+    out.close()
+
+    # Majors, ordered by popularity rank; areas picked on the same skew
+    first_major = next_id(cursor, 'Major', 'major_id')
+    major_ids = list(range(first_major, first_major + args.majors))
+    major_area = {}
+    out = inserter('Major', ['major_id', 'major_name', 'interest_area_id'])
+    for n, major_id in enumerate(major_ids):
+        area_id = area_ids[bisect.bisect(area_weights, rng.random() * area_weights[-1])]
+        major_area[major_id] = area_id
+        name = f"{MAJOR_PREFIXES[n % len(MAJOR_PREFIXES)]} {MAJOR_FIELDS[(n // len(MAJOR_PREFIXES)) % len(MAJOR_FIELDS)]}"
+        cycle = n // (len(MAJOR_PREFIXES) * len(MAJOR_FIELDS))
+        out.add((major_id, name if not cycle else f"{name} {cycle + 1}", area_id))
+    out.close()
+    major_weights = zipf_cum_weights(len(major_ids), args.zipf)
+
+    # Stats: a run of consecutive years per major and source, aggregated once at the end
+    cursor.execute("SET @bulk_load = 1")
+    out = inserter('MajorStats', ['major_id', 'source_id', 'year', 'avg_salary', 'job_growth_rate', 'grad_count'])
+    last_year = end.year - 1
+    for rank, major_id in enumerate(major_ids, start=1):
+        salary = area_salary[major_area[major_id]] * rng.uniform(0.75, 1.3)
+        grads = max(int(20000 / rank ** 0.6 * rng.uniform(0.5, 1.5)), 10)
+        growth = rng.gauss(0.04, 0.03)
+        for source_id in source_ids:
+            years = rng.randint(min(2, args.years), args.years)
+            for year in range(last_year - years + 1, last_year + 1):
+                drift = 1 + growth * (year - last_year)
+                out.add((major_id, source_id, year,
+                         round(salary * drift * rng.uniform(0.97, 1.03), 2),
+                         round(min(max(growth + rng.gauss(0, 0.01), -0.5), 0.9), 4),
+                         max(int(grads * rng.uniform(0.9, 1.1)), 1)))
+    out.close()
+
+    # Users with their interest areas and saved comparisons
+    password_hash = bcrypt.hashpw(args.password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    first_user = next_id(cursor, 'User', 'user_id')
+    users = inserter('User', ['user_id', 'username', 'email', 'password_hash', 'created_at'])
+    interests = inserter('UserInterestArea', ['user_id', 'interest_area_id', 'saved_at'], users)
+    saves = inserter('SavedComparison', ['user_id', 'major_id', 'saved_at'], users)
+    for user_id in range(first_user, first_user + args.users):
+        name = f"{args.username_prefix}{user_id}"
+        created = end - timedelta(seconds=rng.random() * span)
+        users.add((user_id, name, f"{name}@example.com", password_hash, created))
+        remaining = (end - created).total_seconds()
+        for i in sorted(zipf_sample(rng, area_weights, poisson(rng, args.interests_per_user))):
+            interests.add((user_id, area_ids[i], created + timedelta(seconds=rng.random() * remaining)))
+        for i in sorted(zipf_sample(rng, major_weights, poisson(rng, args.saves_per_user))):
+            saves.add((user_id, major_ids[i], created + timedelta(seconds=rng.random() * remaining)))
+    interests.close()
+    saves.close()
+    users.close()
+
+    cursor.execute("SET @bulk_load = NULL")
+    refresh_major_aggregate(cursor)
+    conn.commit()
+    bump_saved_versions(conn, cursor, first_user, first_user + args.users - 1)
+
+    if args.fast:
+        cursor.execute("SET SESSION unique_checks = 1")
+        cursor.execute("SET SESSION foreign_key_checks = 1")
+    cursor.close()
+    print(f"[GENERATE_LOG] Finished in {time.monotonic() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic data for scale testing")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**config)
+    try:
+        generate(conn, args)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Bulk loader for MajorStats / Major / DataSource
+
+Streams a CSV row by row, keeps only the columns it needs, maps each row
+to a Major (and its InterestArea), and upserts MajorStats in batches keyed
+on (major_id, source_id, year). Run setup_ingestion.sql once first.
+The per-row MajorAggregate triggers are skipped for the load (@bulk_load)
+and the aggregate is rebuilt once at the end (setup_major_aggregate.sql).
+
+Supported formats:
+  kaggle     Kaggle / FiveThirtyEight college-majors tables (recent-grads.csv,
+             all-ages.csv, grad-students.csv): one row per major.
+             Resumable: progress is checkpointed after every batch.
+  scorecard  College Scorecard field-of-study file: one row per
+             institution x program. Rows are folded into one running
+             aggregate per major (memory grows with the number of majors,
+             not the file), then upserted; re-running is idempotent.
+
+Examples:
+  python ingest_data.py kaggle recent-grads.csv --year 2015
+  python ingest_data.py scorecard Most-Recent-Cohorts-Field-of-Study.csv --year 2021
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+config = {
+    'user': os.getenv('DB_USER', 'apalu3'),
+    'password': os.getenv('DB_PASSWORD', 'password328'),
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'database': os.getenv('DB_NAME', 'college_major_db'),
+    'port': int(os.getenv('DB_PORT', '3306'))
+}
+
+# Column defaults per format; each can be overridden on the command line
+FORMATS = {
+    'kaggle': {
+        'name_column': 'Major',
+        'category_column': 'Major_category',
+        'salary_column': 'Median',
+        'count_column': 'Total',
+        'growth_column': None,
+        'source_name': 'Kaggle College Majors',
+        'source_url': 'https://www.kaggle.com/datasets/tunguz/college-majors',
+    },
+    'scorecard': {
+        'name_column': 'CIPDESC',
+        'category_column': 'CIPCODE',
+        'salary_column': 'EARN_MDN_HI_1YR',
+        'count_column': 'IPEDSCOUNT2',
+        'growth_column': None,
+        'source_name': 'College Scorecard',
+        'source_url': 'https://collegescorecard.ed.gov/data',
+    },
+}
+
+# Two-digit CIP family -> the Kaggle major categories, so both sources
+# share one set of interest areas
+CIP_FAMILY_AREAS = {
+    '01': 'Agriculture & Natural Resources', '03': 'Agriculture & Natural Resources',
+    '04': 'Arts', '50': 'Arts',
+    '26': 'Biology & Life Science',
+    '52': 'Business',
+    '09': 'Communications & Journalism', '10': 'Communications & Journalism',
+    '11': 'Computers & Mathematics', '27': 'Computers & Mathematics',
+    '13': 'Education',
+    '14': 'Engineering', '15': 'Engineering',
+    '51': 'Health', '31': 'Health',
+    '05': 'Humanities & Liberal Arts', '16': 'Humanities & Liberal Arts',
+    '23': 'Humanities & Liberal Arts', '24': 'Humanities & Liberal Arts',
+    '38': 'Humanities & Liberal Arts', '39': 'Humanities & Liberal Arts',
+    '54': 'Humanities & Liberal Arts',
+    '12': 'Industrial Arts & Consumer Services', '19': 'Industrial Arts & Consumer Services',
+    '46': 'Industrial Arts & Consumer Services', '47': 'Industrial Arts & Consumer Services',
+    '48': 'Industrial Arts & Consumer Services', '49': 'Industrial Arts & Consumer Services',
+    '30': 'Interdisciplinary',
+    '22': 'Law & Public Policy', '43': 'Law & Public Policy', '44': 'Law & Public Policy',
+    '40': 'Physical Sciences', '41': 'Physical Sciences',
+    '42': 'Psychology & Social Work',
+    '45': 'Social Science',
+}
+
+MISSING_VALUES = {'', 'NULL', 'NA', 'N/A', 'PrivacySuppressed'}
+
+# MySQL error for CALL on a procedure that does not exist
+NO_SUCH_PROCEDURE = 1305
+
+UPSERT_SQL = """
+    INSERT INTO MajorStats (major_id, source_id, year, avg_salary, job_growth_rate, grad_count)
+    VALUES {values}
+    ON DUPLICATE KEY UPDATE
+        avg_salary = VALUES(avg_salary),
+        job_growth_rate = VALUES(job_growth_rate),
+        grad_count = VALUES(grad_count)
+"""
+
+
+def to_number(value, cast=float):
+    if value is None or value.strip() in MISSING_VALUES:
+        return None
+    try:
+        return cast(float(value.replace(',', '')))
+    except ValueError:
+        return None
+
+
+def cip_family(cip):
+    """Two-digit CIP family; a code read as a number ("101" for 01.01) gets its leading zero back"""
+    cip = (cip or '').strip()
+    if '.' in cip:
+        return cip.split('.')[0].zfill(2)
+    return cip.zfill(4)[:2]
+
+
+def start_bulk_load(conn):
+    """Make this session's MajorStats triggers skip MajorAggregate/DataVersion"""
+    cursor = conn.cursor()
+    cursor.execute("SET @bulk_load = 1")
+    cursor.close()
+
+
+def refresh_major_aggregate(conn):
+    """Turn the per-row triggers back on and rebuild MajorAggregate once"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SET @bulk_load = NULL")
+        try:
+            cursor.callproc('sp_refresh_major_aggregate')
+        except mysql.connector.Error as e:
+            # Without setup_major_aggregate.sql there is nothing to rebuild
+            if e.errno != NO_SUCH_PROCEDURE:
+                raise
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def clean_major_name(name):
+    name = name.strip().rstrip('.')
+    return name.title() if name.isupper() else name
+
+
+class Catalog:
+    """Get-or-create lookups for InterestArea, Major and DataSource"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        cursor = conn.cursor()
+        cursor.execute("SELECT interest_area_id, name FROM InterestArea")
+        self.areas = {name.casefold(): area_id for area_id, name in cursor.fetchall()}
+        cursor.execute("SELECT major_id, major_name FROM Major")
+        self.majors = {name.casefold(): major_id for major_id, name in cursor.fetchall()}
+        cursor.close()
+
+    def _insert(self, query, params):
+        cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        new_id = cursor.lastrowid
+        cursor.close()
+        return new_id
+
+    def area_id(self, name):
+        if not name:
+            return None
+        key = name.casefold()
+        if key not in self.areas:
+            self.areas[key] = self._insert("INSERT INTO InterestArea (name) VALUES (%s)", (name,))
+        return self.areas[key]
+
+    def major_id(self, name, area_name):
+        key = name.casefold()
+        if key not in self.majors:
+            self.majors[key] = self._insert(
+                "INSERT INTO Major (major_name, interest_area_id) VALUES (%s, %s)",
+                (name, self.area_id(area_name))
+            )
+        return self.majors[key]
+
+    def source_id(self, name, url):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT source_id FROM DataSource WHERE name = %s", (name,))
+        row = cursor.fetchone()
+        cursor.close()
+        if row:
+            return row[0]
+        return self._insert("INSERT INTO DataSource (name, url) VALUES (%s, %s)", (name, url))
+
+
+class Progress:
+    """Rows/sec reporting and the IngestionProgress checkpoint"""
+
+    def __init__(self, conn, file_key, source_id, year, report_every):
+        self.conn = conn
+        self.file_key = file_key
+        self.source_id = source_id
+        self.year = year
+        self.report_every = report_every
+        self.started = time.monotonic()
+        self.rows_read = 0
+        self.rows_written = 0
+
+    def resume_point(self):
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT rows_done, completed FROM IngestionProgress WHERE file_key = %s",
+            (self.file_key,)
+        )
+        row = cursor.fetchone()
+        cursor.close()
+        return (row[0], bool(row[1])) if row else (0, False)
+
+    def checkpoint(self, rows_done, completed=False):
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            INSERT INTO IngestionProgress (file_key, source_id, year, rows_done, completed)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE rows_done = VALUES(rows_done), completed = VALUES(completed)
+        """, (self.file_key, self.source_id, self.year, rows_done, completed))
+        cursor.close()
+
+    def reset(self):
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM IngestionProgress WHERE file_key = %s", (self.file_key,))
+        cursor.close()
+        self.conn.commit()
+
+    def row_read(self):
+        self.rows_read += 1
+        if self.rows_read % self.report_every == 0:
+            self.report()
+
+    def report(self, final=False):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        label = "done" if final else "progress"
+        print(f"[INGEST_LOG] {label}: {self.rows_read} rows read, {self.rows_written} stats upserted, "
+              f"{self.rows_read / elapsed:.0f} rows/sec")
+
+
+def upsert_batch(conn, batch):
+    if not batch:
+        return 0
+    cursor = conn.cursor()
+    values = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(batch))
+    cursor.execute(UPSERT_SQL.format(values=values), [value for row in batch for value in row])
+    cursor.close()
+    return len(batch)
+
+
+def stream_rows(path, columns):
+    """Yield tuples of just `columns` from each CSV row, in file order"""
+    csv.field_size_limit(sys.maxsize)
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        positions = {name: i for i, name in enumerate(header)}
+        missing = [c for c in columns if c is not None and c not in positions]
+        if missing:
+            raise SystemExit(f"Columns not found in {path}: {', '.join(missing)}")
+        picks = [positions[c] if c is not None else None for c in columns]
+        for row in reader:
+            yield tuple(row[i] if i is not None and i < len(row) else None for i in picks)
+
+
+def ingest_kaggle(conn, catalog, args, source_id, progress):
+    skip, completed = progress.resume_point()
+    if completed:
+        print(f"[INGEST_LOG] {args.path} already loaded for year {args.year}; use --restart to reload")
+        return
+    if skip:
+        print(f"[INGEST_LOG] Resuming after row {skip}")
+
+    columns = [args.name_column, args.category_column, args.salary_column,
+               args.count_column, args.growth_column]
+    batch = []
+    row_number = 0
+    for name, category, salary, count, growth in stream_rows(args.path, columns):
+        row_number += 1
+        progress.row_read()
+        if row_number <= skip or not name:
+            continue
+        major_id = catalog.major_id(clean_major_name(name), category.strip() if category else None)
+        batch.append((major_id, source_id, args.year, to_number(salary), to_number(growth),
+                      to_number(count, int)))
+        if len(batch) >= args.batch_size:
+            progress.rows_written += upsert_batch(conn, batch)
+            progress.checkpoint(row_number)
+            conn.commit()
+            batch = []
+
+    progress.rows_written += upsert_batch(conn, batch)
+    progress.checkpoint(row_number, completed=True)
+    conn.commit()
+
+
+def ingest_scorecard(conn, catalog, args, source_id, progress):
+    columns = [args.name_column, args.category_column, args.salary_column,
+               args.count_column, 'CREDLEV']
+    # major name -> [cip family, weighted salary sum, weight, grad sum, grad rows]
+    totals = {}
+    for name, cip, salary, count, level in stream_rows(args.path, columns):
+        progress.row_read()
+        if not name or (args.credential_level and (level or '').strip() != args.credential_level):
+            continue
+        major = clean_major_name(name)
+        entry = totals.setdefault(major, [cip_family(cip), 0.0, 0, 0, 0])
+        salary = to_number(salary)
+        count = to_number(count, int)
+        if salary is not None:
+            weight = count or 1
+            entry[1] += salary * weight
+            entry[2] += weight
+        if count is not None:
+            entry[3] += count
+            entry[4] += 1
+
+    batch = []
+    for major, (family, salary_sum, weight, grads, grad_rows) in totals.items():
+        major_id = catalog.major_id(major, CIP_FAMILY_AREAS.get(family, 'Interdisciplinary'))
+        batch.append((major_id, source_id, args.year,
+                      round(salary_sum / weight, 2) if weight else None,
+                      None,
+                      grads if grad_rows else None))
+        if len(batch) >= args.batch_size:
+            progress.rows_written += upsert_batch(conn, batch)
+            batch = []
+    progress.rows_written += upsert_batch(conn, batch)
+    progress.checkpoint(progress.rows_read, completed=True)
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load major statistics CSVs into the database")
+    parser.add_argument('format', choices=sorted(FORMATS))
+    parser.add_argument('path')
+    parser.add_argument('--year', type=int, required=True, help="year the statistics describe")
+    parser.add_argument('--source-name')
+    parser.add_argument('--source-url')
+    parser.add_argument('--name-column')
+    parser.add_argument('--category-column')
+    parser.add_argument('--salary-column')
+    parser.add_argument('--count-column')
+    parser.add_argument('--growth-column')
+    parser.add_argument('--credential-level', default='3',
+                        help="scorecard CREDLEV to keep (3 = bachelor's); empty keeps all")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--report-every', type=int, default=10000)
+    parser.add_argument('--restart', action='store_true', help="ignore any saved checkpoint")
+    args = parser.parse_args()
+
+    for key, value in FORMATS[args.format].items():
+        if getattr(args, key) is None:
+            setattr(args, key, value)
+
+    conn = mysql.connector.connect(**config)
+    try:
+        start_bulk_load(conn)
+        catalog = Catalog(conn)
+        source_id = catalog.source_id(args.source_name, args.source_url)
+        conn.commit()
+
+        file_key = f"{args.format}:{os.path.basename(args.path)}:{args.year}:{source_id}"
+        progress = Progress(conn, file_key, source_id, args.year, args.report_every)
+        if args.restart:
+            progress.reset()
+
+        if args.format == 'kaggle':
+            ingest_kaggle(conn, catalog, args, source_id, progress)
+        else:
+            ingest_scorecard(conn, catalog, args, source_id, progress)
+        progress.report(final=True)
+    except mysql.connector.Error as e:
+        conn.rollback()
+        print(f"[ERROR_LOG] Database error during ingestion: {e.msg} (Error code: {e.errno})")
+        sys.exit(1)
+    finally:
+        # Batches committed before a failure need aggregating too
+        try:
+            refresh_major_aggregate(conn)
+        except mysql.connector.Error as e:
+            print(f"[ERROR_LOG] Could not rebuild MajorAggregate: {e.msg} (Error code: {e.errno}); "
+                  "run CALL sp_refresh_major_aggregate() by hand")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+In-memory columnar engine for /majors
+
+Loads MajorAggregate into NumPy column arrays and answers the /majors
+filters (area, min salary, min growth) with vectorized masks, plus sorting
+and top-k, without a database round-trip. A background thread polls the
+'major_stats' row of DataVersion and swaps in a freshly built snapshot when
+it changes; readers always see one complete snapshot.
+
+Enabled with MAJORS_ENGINE=memory (requires numpy).
+"""
+
+import json
+import logging
+import threading
+from bisect import bisect_left
+from functools import partial
+
+import numpy as np
+
+from app_logging import get_logger, log_event
+
+log = get_logger('majors_engine')
+
+LOAD_QUERY = """
+    SELECT
+        m.major_id,
+        m.major_name,
+        ma.interest_area_id,
+        ROUND(ma.avg_salary, 2) AS average_salary,
+        ROUND(ma.avg_growth_rate * 100, 2) AS job_growth_rate,
+        ROUND(ma.avg_grads, 0) AS grads,
+        ma.avg_salary AS raw_salary,
+        ma.avg_growth_rate * 100 AS raw_growth,
+        ma.avg_grads AS raw_grads
+    FROM MajorAggregate ma
+    JOIN Major m ON m.major_id = ma.major_id
+    ORDER BY ma.major_id
+"""
+
+VERSION_QUERY = "SELECT version FROM DataVersion WHERE name = 'major_stats'"
+
+default_dumps = partial(json.dumps, default=str, sort_keys=True, separators=(",", ":"))
+
+RESPONSE_FIELDS = ('major_id', 'major_name', 'interest_area_id',
+                   'average_salary', 'job_growth_rate', 'grads')
+
+
+def _as_float(values):
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+
+class MajorColumns:
+    """Immutable column snapshot of the major aggregates"""
+
+    def __init__(self, rows, version, dumps=default_dumps):
+        self.version = version
+        self.rows = [{k: row[k] for k in RESPONSE_FIELDS} for row in rows]
+        # Pre-encoded JSON per row so a response is a join, not a re-encode
+        self.fragments = [dumps(row) for row in self.rows]
+
+        self.major_id = np.array([row['major_id'] for row in rows], dtype=np.int64)
+        self.area_id = np.array(
+            [-1 if row['interest_area_id'] is None else row['interest_area_id'] for row in rows],
+            dtype=np.int64
+        )
+        self.salary = _as_float(row['raw_salary'] for row in rows)
+        self.growth = _as_float(row['raw_growth'] for row in rows)
+        self.grads = _as_float(row['raw_grads'] for row in rows)
+        # Dense rank of the case-folded name, so equal names tie and fall
+        # back to major_id like they do in SQL
+        names = [row['major_name'].casefold() for row in rows]
+        self.unique_names = sorted(set(names))
+        rank_of = {name: i for i, name in enumerate(self.unique_names)}
+        self.name_rank = np.array([rank_of[name] for name in names], dtype=np.int64)
+
+        # Unrounded values, used to build pagination cursors
+        self.raw = {
+            'major_id': [row['major_id'] for row in rows],
+            'major_name': [row['major_name'] for row in rows],
+            'average_salary': [row['raw_salary'] for row in rows],
+            'job_growth_rate': [row['raw_growth'] for row in rows],
+            'grads': [row['raw_grads'] for row in rows],
+        }
+
+        # NULLs sort first ascending / last descending, as in MySQL
+        self.sort_keys = {
+            'major_id': self.major_id.astype(np.float64),
+            'major_name': self.name_rank.astype(np.float64),
+            'average_salary': np.nan_to_num(self.salary, nan=-np.inf),
+            'job_growth_rate': np.nan_to_num(self.growth, nan=-np.inf),
+            'grads': np.nan_to_num(self.grads, nan=-np.inf),
+        }
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _cursor_key(self, sort, value):
+        """Map a cursor's sort value onto the numeric sort key space"""
+        if value is None:
+            return -np.inf
+        if sort == 'major_name':
+            folded = value.casefold()
+            rank = bisect_left(self.unique_names, folded)
+            if rank == len(self.unique_names) or self.unique_names[rank] != folded:
+                rank -= 0.5
+            return float(rank)
+        return float(value)
+
+    def select(self, area_id=None, min_salary=0, min_growth=0, sort=None, descending=False,
+               limit=None, after=None):
+        """
+        Return row positions matching the filters, sorted and truncated.
+        `after` is a (sort value, major_id) keyset cursor from sort_value().
+        """
+        # NaN (NULL averages) never passes a >= comparison, same as SQL
+        mask = (self.salary >= min_salary) & (self.growth >= min_growth)
+        if area_id is not None:
+            mask &= self.area_id == area_id
+        idx = np.flatnonzero(mask)
+
+        if sort is None:
+            if after is None and limit is None:
+                return idx
+            sort = 'major_id'
+
+        key = self.sort_keys[sort][idx]
+        ids = self.major_id[idx]
+        if descending:
+            key, ids = -key, -ids
+
+        if after is not None:
+            after_key = self._cursor_key(sort, after[0])
+            after_id = after[1]
+            if descending:
+                after_key, after_id = -after_key, -after_id
+            keep = (key > after_key) | ((key == after_key) & (ids > after_id))
+            idx, key, ids = idx[keep], key[keep], ids[keep]
+
+        if limit is not None and limit < len(idx):
+            # Top-k: keep everything up to the k-th key (ties included), then
+            # sort only that candidate set
+            kth = np.partition(key, limit - 1)[limit - 1]
+            keep = key <= kth
+            idx, key, ids = idx[keep], key[keep], ids[keep]
+
+        order = np.lexsort((ids, key))
+        if limit is not None:
+            order = order[:limit]
+        return idx[order]
+
+    def sort_value(self, sort, i):
+        return self.raw[sort or 'major_id'][i]
+
+    def render(self, idx):
+        return "[" + ",".join(self.fragments[i] for i in idx) + "]"
+
+    def records(self, idx):
+        return [self.rows[i] for i in idx]
+
+
+class MajorsEngine:
+    """Holds the current MajorColumns snapshot and keeps it fresh"""
+
+    def __init__(self, connect, poll_interval=5.0, dumps=default_dumps):
+        self._connect = connect
+        self._dumps = dumps
+        self.poll_interval = poll_interval
+        self.current = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _fetch_version(self, cursor):
+        cursor.execute(VERSION_QUERY)
+        row = cursor.fetchone()
+        return row['version'] if row else 0
+
+    def load(self):
+        """Build a new snapshot and swap it in"""
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.cursor(dictionary=True)
+            try:
+                # Version first: a concurrent change bumps it again, so the
+                # next poll reloads instead of missing the update
+                version = self._fetch_version(cursor)
+                cursor.execute(LOAD_QUERY)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+                conn.close()
+            self.current = MajorColumns(rows, version, self._dumps)
+        return self.current
+
+    def check(self):
+        """Reload if the data version moved; returns True when reloaded"""
+        conn = self._connect()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            version = self._fetch_version(cursor)
+        finally:
+            cursor.close()
+            conn.close()
+        if self.current is None or version != self.current.version:
+            self.load()
+            return True
+        return False
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                log_event(log, logging.ERROR, "ERROR_LOG", "Majors engine refresh failed", error=str(e))
+
+    def start(self):
+        if self.current is None:
+            self.load()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._poll, name="majors-engine", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,239 @@
+"""
+In-process metrics in the Prometheus text exposition format
+
+app.py records, per route template:
+  - request counts by method and status code
+  - request latency
+  - database time and number of SQL statements spent inside each request
+and process-wide:
+  - connection pool checkout time (includes connect/ping when needed)
+  - bcrypt time by operation
+
+Per-request database numbers are collected through a context variable:
+begin_request() starts a RequestStats for the current request and every
+InstrumentedCursor executed in that context adds to it.
+"""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-2] + [None]):
+                cumulative = series[-1] if count is None else cumulative + count
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(float(series[-2]))}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {series[-1]}")
+        return lines
+
+
+class Gauges:
+    """Point-in-time values read from a callback when /metrics is scraped"""
+
+    def __init__(self, prefix, help, collect):
+        self.prefix = prefix
+        self.help = help
+        self.collect = collect
+
+    def render(self):
+        lines = []
+        for key, value in sorted(self.collect().items()):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"{self.prefix}_{key}"
+            lines += [f"# HELP {name} {self.help} ({key})", f"# TYPE {name} gauge",
+                      f"{name} {_number(value)}"]
+        return lines
+
+
+class RequestStats:
+    __slots__ = ("db_time", "statements")
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.statements = 0
+
+
+def begin_request():
+    """Start collecting DB work for the current request; returns a reset token"""
+    return _current.set(RequestStats())
+
+
+def current_request():
+    return _current.get()
+
+
+def end_request(token):
+    stats = _current.get()
+    _current.reset(token)
+    return stats
+
+
+class InstrumentedCursor:
+    """Cursor proxy that times statements and fetches"""
+
+    def __init__(self, cursor, registry):
+        self._cursor = cursor
+        self._registry = registry
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+
+    def _timed(self, fn, args, kwargs, statement):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._registry.db_time.inc(amount=elapsed)
+            if statement:
+                self._registry.db_statements.inc()
+            stats = _current.get()
+            if stats is not None:
+                stats.db_time += elapsed
+                if statement:
+                    stats.statements += 1
+
+    def execute(self, *args, **kwargs):
+        return self._timed(self._cursor.execute, args, kwargs, True)
+
+    def executemany(self, *args, **kwargs):
+        return self._timed(self._cursor.executemany, args, kwargs, True)
+
+    def callproc(self, *args, **kwargs):
+        return self._timed(self._cursor.callproc, args, kwargs, True)
+
+    def fetchone(self):
+        return self._timed(self._cursor.fetchone, (), {}, False)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._timed(self._cursor.fetchmany, args, kwargs, False)
+
+    def fetchall(self):
+        return self._timed(self._cursor.fetchall, (), {}, False)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.requests = Counter(
+            "http_requests_total", "HTTP requests by route, method and status",
+            ("route", "method", "status"))
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Time to produce the response",
+            ("route", "method"))
+        self.request_db_time = Histogram(
+            "http_request_db_seconds", "Database time spent inside one request",
+            ("route", "method"))
+        self.request_statements = Histogram(
+            "http_request_db_statements", "SQL statements executed by one request",
+            ("route", "method"), buckets=COUNT_BUCKETS)
+        self.db_time = Counter("db_seconds_total", "Database time including fetches")
+        self.db_statements = Counter("db_statements_total", "SQL statements executed")
+        self.checkout = Histogram(
+            "db_pool_checkout_seconds", "Time to borrow a pooled connection")
+        self.bcrypt = Histogram(
+            "bcrypt_seconds", "bcrypt queue plus work time", ("operation",),
+            buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+        self._extra = []
+
+    def add(self, metric):
+        """Register another renderable (e.g. Gauges)"""
+        self._extra.append(metric)
+        return metric
+
+    def wrap_cursor(self, cursor):
+        return InstrumentedCursor(cursor, self)
+
+    def observe_request(self, route, method, status, elapsed, stats):
+        self.requests.inc(route, method, str(status))
+        self.latency.observe(elapsed, route, method)
+        if stats is not None:
+            self.request_db_time.observe(stats.db_time, route, method)
+            self.request_statements.observe(stats.statements, route, method)
+
+    def render(self):
+        lines = []
+        for metric in (self.requests, self.latency, self.request_db_time, self.request_statements,
+                       self.db_time, self.db_statements, self.checkout, self.bcrypt, *self._extra):
+            lines += metric.render()
+        return '\n'.join(lines) + '\n'
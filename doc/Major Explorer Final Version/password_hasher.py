@@ -0,0 +1,111 @@
+"""
+Bounded worker pool for bcrypt work
+
+bcrypt releases the GIL while hashing, so a small thread pool keeps the
+CPU-heavy password work off the request threads' budget and caps how much
+of it can run at once. When more than `max_pending` calls are queued or
+running, new calls fail fast with HasherBusy instead of piling up.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503"""
+
+    def __init__(self, retry_after=1):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    def __init__(self, rounds=12, workers=2, max_pending=32, retry_after=1, on_done=None):
+        self.rounds = rounds
+        self.on_done = on_done  # optional callable(kind, seconds)
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {
+            "hashes": 0,
+            "checks": 0,
+            "rejected": 0,
+            "latency_total": 0.0,
+            "latency_max": 0.0,
+        }
+
+    def _submit(self, kind, fn, *args):
+        """Queue `fn` on the pool; the slot is released when it finishes"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise HasherBusy(self.retry_after)
+        with self._lock:
+            self._pending += 1
+        started = time.perf_counter()
+
+        def done(_future):
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._pending -= 1
+                self._stats[kind] += 1
+                self._stats["latency_total"] += elapsed
+                self._stats["latency_max"] = max(self._stats["latency_max"], elapsed)
+            self._slots.release()
+            if self.on_done is not None:
+                self.on_done(kind, elapsed)
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            done(None)
+            raise
+        future.add_done_callback(done)
+        return future
+
+    def _submit_hash(self, password):
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._submit("hashes", bcrypt.hashpw, password.encode('utf-8'), salt)
+
+    def _submit_check(self, password, hashed):
+        return self._submit("checks", bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def hash(self, password):
+        """bcrypt hash of `password` at the configured cost, as str"""
+        return self._submit_hash(password).result().decode('utf-8')
+
+    def check(self, password, hashed):
+        return self._submit_check(password, hashed).result()
+
+    async def hash_async(self, password):
+        """hash() for asyncio callers; the event loop is never blocked"""
+        return (await asyncio.wrap_future(self._submit_hash(password))).decode('utf-8')
+
+    async def check_async(self, password, hashed):
+        return await asyncio.wrap_future(self._submit_check(password, hashed))
+
+    def needs_rehash(self, hashed):
+        """True when `hashed` was made with a different cost than configured"""
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["queue_depth"] = self._pending
+        calls = snapshot["hashes"] + snapshot["checks"]
+        snapshot.update({
+            "rounds": self.rounds,
+            "max_pending": self.max_pending,
+            "latency_avg": snapshot["latency_total"] / calls if calls else 0.0,
+        })
+        return snapshot
@@ -0,0 +1,118 @@
+"""
+In-memory token-bucket rate limiting for the bcrypt routes
+
+/login and /signup each spend ~100-250 ms of CPU in bcrypt, so a burst of
+password guesses or scripted signups can starve every other route. Each
+TokenBucketLimiter allows `limit` requests per `period` seconds per key,
+refilling continuously, with bursts of up to `limit`. A key costs one
+small list [tokens, last refill] in an OrderedDict kept in last-use
+order. A bucket untouched for a whole `period` has refilled completely
+and carries no information, so those are dropped from the front on each
+hit, and `max_keys` caps the table by evicting the least recently used
+key; both are O(1) per key removed, so the lock is never held for a scan.
+
+RouteRateLimit applies one limiter keyed by client IP and one keyed by
+the submitted username/email; the caller checks it before touching the
+database or the hasher.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class RateLimited(Exception):
+    """Raised when a key is over its limit; callers should answer 429"""
+
+    def __init__(self, retry_after=1):
+        super().__init__("Too many requests")
+        self.retry_after = retry_after
+
+
+def parse_rate(spec):
+    """"20/60" -> (20, 60.0); "" / "0" / "off" -> None (unlimited)"""
+    spec = (spec or '').strip().lower()
+    if spec in ('', '0', 'off', 'none'):
+        return None
+    count, _, period = spec.partition('/')
+    limit, period = int(count), float(period or 1)
+    if limit <= 0 or period <= 0:
+        raise ValueError(f"Bad rate limit {spec!r}; expected <count>/<seconds>")
+    return limit, period
+
+
+class TokenBucketLimiter:
+    def __init__(self, limit, period, max_keys=100000, clock=time.monotonic):
+        self.limit = limit
+        self.period = period
+        self.rate = limit / period
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets = OrderedDict()  # key -> [tokens, last refill], least recently used first
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.evicted = 0
+
+    def hit(self, key):
+        """Take one token for `key`; returns 0 if allowed, else seconds to wait"""
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    # Full of active keys: forget the least recently used one
+                    self._buckets.popitem(last=False)
+                    self.evicted += 1
+                self._buckets[key] = [self.limit - 1, now]
+                return 0
+            self._buckets.move_to_end(key)
+            tokens = min(self.limit, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0
+            bucket[0] = tokens
+            self.rejected += 1
+            return (1 - tokens) / self.rate
+
+    def _expire(self, now):
+        """Drop buckets idle for a full period; they are back to `limit` tokens"""
+        cutoff = now - self.period
+        buckets = self._buckets
+        while buckets:
+            key, (tokens, last) = next(iter(buckets.items()))
+            if last > cutoff:
+                break
+            del buckets[key]
+            self.evicted += 1
+
+    def stats(self):
+        with self._lock:
+            return {"keys": len(self._buckets), "rejected": self.rejected, "evicted": self.evicted}
+
+
+class RouteRateLimit:
+    """Per-IP and per-identity limits for one route; either may be None"""
+
+    def __init__(self, ip_rate=None, identity_rate=None, max_keys=100000):
+        self.by_ip = TokenBucketLimiter(*ip_rate, max_keys=max_keys) if ip_rate else None
+        self.by_identity = TokenBucketLimiter(*identity_rate, max_keys=max_keys) if identity_rate else None
+
+    def check(self, ip, identity=None):
+        """Raises RateLimited when either key is over its limit"""
+        if self.by_ip is not None and ip:
+            wait = self.by_ip.hit(ip)
+            if wait:
+                raise RateLimited(max(1, int(wait + 0.999)))
+        if self.by_identity is not None and identity:
+            wait = self.by_identity.hit(str(identity).strip().lower())
+            if wait:
+                raise RateLimited(max(1, int(wait + 0.999)))
+
+    def stats(self):
+        stats = {}
+        for name, limiter in (('ip', self.by_ip), ('identity', self.by_identity)):
+            if limiter is not None:
+                stats.update({f"{name}_{key}": value for key, value in limiter.stats().items()})
+        return stats
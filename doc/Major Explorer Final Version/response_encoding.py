@@ -0,0 +1,173 @@
+"""
+JSON encoding and compression for API responses
+
+FastJSONProvider replaces Flask's default JSON provider (app.json) and is
+also what asgi_app.json_response() encodes with. In compact mode, i.e.
+every jsonify() outside debug, it encodes with orjson when that is
+installed (JSON_ENCODER=orjson, the default) and produces the same bytes
+as Flask's DefaultJSONProvider: sorted keys, "," / ":" separators, ASCII
+only, Decimal as a string and date/datetime as an HTTP date. Anything
+orjson would write differently is re-encoded with the stdlib:
+
+- output with non-ASCII characters (the stdlib escapes them as \\uXXXX)
+- floats in exponent form or below 1e-4 ("1e+16" vs orjson's "1e16")
+- dicts with non-str keys, ints past 64 bits, unsupported types
+
+DEL (U+007F) is ASCII, so orjson writes it raw where the stdlib writes
+\\u007f. A raw 0x7f byte can only be inside a string, so it is rewritten
+to \\u007f in place instead of falling back.
+
+NaN and Infinity, which MySQL never returns, come out as null instead of
+the stdlib's (invalid JSON) NaN token. JSON_ENCODER=json always uses the
+stdlib.
+
+choose_encoding() / should_compress() / compress() decide whether a body
+is worth compressing: gzip, or brotli when the `brotli` module is
+installed, for JSON and text bodies of at least COMPRESS_MIN_SIZE bytes
+whose client sent a matching Accept-Encoding.
+"""
+
+import gzip
+import re
+import threading
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import parse_accept_header
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPACT = (",", ":")
+
+# Number tokens the stdlib writes differently: orjson's exponent form
+# ("1e16", "1.5e-7") and plain magnitudes below 1e-4 ("0.00001"), which the
+# stdlib writes as "1e-05". Scanning a large body with a regex costs more
+# than encoding it, so the exponent regex only runs on bodies with a digit
+# right before an "e".
+_EXPONENT = re.compile(rb'(?:^|[:,\[])-?\d+(?:\.\d+)?e')
+_TINY = (b':0.0000', b':-0.0000', b',0.0000', b',-0.0000', b'[0.0000', b'[-0.0000')
+_DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'000000000')
+
+_DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+
+def _http_date(o):
+    """werkzeug.http.http_date() without the email.utils round trip"""
+    if isinstance(o, datetime):
+        if o.tzinfo is not None:
+            o = o.astimezone(timezone.utc)
+        hour, minute, second = o.hour, o.minute, o.second
+    else:
+        hour = minute = second = 0
+    return (f"{_DAYS[o.weekday()]}, {o.day:02d} {_MONTHS[o.month - 1]} {o.year:04d} "
+            f"{hour:02d}:{minute:02d}:{second:02d} GMT")
+
+
+def _fast_default(o):
+    """DefaultJSONProvider.default with the common row types checked first"""
+    if type(o) is Decimal:
+        return str(o)
+    if isinstance(o, date):
+        return _http_date(o)
+    return DefaultJSONProvider.default(o)
+
+
+def _differs_from_stdlib(out):
+    if not out.isascii():
+        return True  # the stdlib escapes non-ASCII as \uXXXX
+    if b'0e' in out.translate(_DIGITS_TO_ZERO) and _EXPONENT.search(out):
+        return True
+    return out.startswith((b'0.0000', b'-0.0000')) or any(tiny in out for tiny in _TINY)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    def __init__(self, app, encoder='orjson'):
+        super().__init__(app)
+        if encoder not in ('orjson', 'json'):
+            raise ValueError(f"Unknown JSON_ENCODER {encoder!r}; expected orjson or json")
+        self.encoder = encoder if orjson is not None else 'json'
+        self._lock = threading.Lock()
+        self._stats = {"fast": 0, "fallbacks": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _orjson(self, obj):
+        """Compact bytes from orjson, or None where they would differ from the stdlib's"""
+        try:
+            out = orjson.dumps(obj, default=_fast_default,
+                               option=orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                               | orjson.OPT_PASSTHROUGH_DATACLASS)
+        except TypeError:
+            return None
+        if _differs_from_stdlib(out):
+            return None
+        if b'\x7f' in out:
+            out = out.replace(b'\x7f', b'\\u007f')
+        return out
+
+    def encode(self, obj):
+        """Compact JSON bytes plus the trailing newline jsonify() adds"""
+        if self.encoder == 'orjson':
+            out = self._orjson(obj)
+            if out is not None:
+                self._count("fast")
+                return out + b"\n"
+            self._count("fallbacks")
+        return super().dumps(obj, separators=COMPACT).encode('ascii') + b"\n"
+
+    def dumps(self, obj, **kwargs):
+        if self.encoder == 'orjson' and kwargs == {"separators": COMPACT}:
+            out = self._orjson(obj)
+            if out is not None:
+                self._count("fast")
+                return out.decode('ascii')
+            self._count("fallbacks")
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            # Indented debug output stays with the stdlib
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj), mimetype=self.mimetype)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, orjson=int(self.encoder == 'orjson'))
+
+
+def choose_encoding(accept_encoding):
+    """'br', 'gzip' or None for an Accept-Encoding header value"""
+    if not accept_encoding:
+        return None
+    offers = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return parse_accept_header(accept_encoding).best_match(offers)
+
+
+def should_compress(content_type, content_encoding, size, min_size):
+    if min_size is None or size < min_size or content_encoding:
+        return False
+    return (content_type or '').startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
@@ -0,0 +1,128 @@
+-- Base schema for a local college_major_db (benchmarks, development).
+-- Tables follow "Database Implementation.md"; User carries the timestamp
+-- columns from setup_users_table.sql. Afterwards run, in order:
+--   setup_data_version.sql, setup_major_aggregate.sql,
+--   setup_pagination_indexes.sql, setup_ingestion.sql, setup_hot_majors.sql
+CREATE TABLE IF NOT EXISTS User (
+    user_id INT AUTO_INCREMENT PRIMARY KEY,
+    username VARCHAR(50) NOT NULL UNIQUE,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    password_hash VARCHAR(255) NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Tokens of user_id issued ("iat", epoch seconds) before revoked_before are
+-- rejected; written by password changes, read by every API process
+CREATE TABLE IF NOT EXISTS SessionRevocation (
+    user_id INT PRIMARY KEY,
+    revoked_before DECIMAL(16,6) NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES User(user_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS InterestArea (
+    interest_area_id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Major (
+    major_id INT AUTO_INCREMENT PRIMARY KEY,
+    major_name VARCHAR(100) NOT NULL,
+    interest_area_id INT,
+    FOREIGN KEY (interest_area_id) REFERENCES InterestArea(interest_area_id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS DataSource (
+    source_id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    url VARCHAR(2083)
+);
+
+CREATE TABLE IF NOT EXISTS MajorStats (
+    stat_id INT AUTO_INCREMENT PRIMARY KEY,
+    major_id INT,
+    source_id INT,
+    year INT,
+    avg_salary DECIMAL(10,2),
+    job_growth_rate DECIMAL(5,4),
+    grad_count INT,
+    FOREIGN KEY (major_id) REFERENCES Major(major_id) ON DELETE CASCADE,
+    FOREIGN KEY (source_id) REFERENCES DataSource(source_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS UserInterestArea (
+    user_id INT,
+    interest_area_id INT,
+    saved_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, interest_area_id),
+    FOREIGN KEY (user_id) REFERENCES User(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (interest_area_id) REFERENCES InterestArea(interest_area_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS SavedComparison (
+    user_id INT,
+    major_id INT,
+    saved_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, major_id),
+    FOREIGN KEY (user_id) REFERENCES User(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (major_id) REFERENCES Major(major_id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_major_interest_area ON Major(interest_area_id);
+CREATE INDEX idx_savedcomparison_major ON SavedComparison(major_id);
+
+DELIMITER $$
+
+-- /save-comparison relies on errno 1644 with this message for duplicates.
+-- generate_data.py sets @bulk_load while it inserts saves it already knows
+-- are distinct, which skips the lookup.
+DROP TRIGGER IF EXISTS trg_savedcomparison_no_duplicates$$
+CREATE TRIGGER trg_savedcomparison_no_duplicates
+BEFORE INSERT ON SavedComparison
+FOR EACH ROW
+check_row: BEGIN
+    IF @bulk_load IS NOT NULL THEN
+        LEAVE check_row;
+    END IF;
+    IF EXISTS (SELECT 1 FROM SavedComparison
+               WHERE user_id = NEW.user_id AND major_id = NEW.major_id) THEN
+        SIGNAL SQLSTATE '45000'
+               SET MESSAGE_TEXT = 'Comparison already saved';
+    END IF;
+END$$
+
+-- Same procedure as "Major Explorer First Version/setup_stored_procedure.sql"
+DROP PROCEDURE IF EXISTS sp_basic_signup$$
+CREATE PROCEDURE sp_basic_signup (
+    IN  p_username       VARCHAR(50),
+    IN  p_email          VARCHAR(255),
+    IN  p_password_hash  VARCHAR(255)
+)
+BEGIN
+    DECLARE v_user_id INT;
+
+    IF EXISTS (SELECT 1 FROM User
+               WHERE username = p_username
+                  OR email    = p_email) THEN
+        SIGNAL SQLSTATE '45000'
+               SET MESSAGE_TEXT = 'Username or e-mail already taken';
+    END IF;
+
+    INSERT INTO User (username, email, password_hash)
+    VALUES (p_username, p_email, p_password_hash);
+
+    SET v_user_id = LAST_INSERT_ID();
+
+    INSERT INTO SavedComparison (user_id, major_id, saved_at)
+    SELECT v_user_id, major_id, NOW()
+    FROM (
+        SELECT sc.major_id
+        FROM   SavedComparison sc
+        WHERE  sc.saved_at >= NOW() - INTERVAL 30 DAY
+        GROUP  BY sc.major_id
+        ORDER  BY COUNT(*) DESC
+        LIMIT 3
+    ) AS hot;
+END$$
+
+DELIMITER ;
@@ -0,0 +1,141 @@
+"""
+In-process autocomplete index over InterestArea names
+
+Answers /search-interest-areas without a database round-trip per
+keystroke. Names are case-folded and indexed by every 1-, 2- and 3-gram;
+a query of up to three characters is a single posting lookup, longer
+queries intersect their trigram postings and verify the substring.
+Results are ranked exact match, then name prefix, then word prefix, then
+any other substring, alphabetically within each group.
+
+A background thread polls the 'interest_area' row of DataVersion and
+rebuilds the index when the table changes.
+"""
+
+import logging
+import threading
+
+from app_logging import get_logger, log_event
+
+log = get_logger('search_index')
+
+LOAD_QUERY = "SELECT interest_area_id, name FROM InterestArea ORDER BY interest_area_id"
+
+VERSION_QUERY = "SELECT version FROM DataVersion WHERE name = 'interest_area'"
+
+MAX_GRAM = 3
+
+
+def _grams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class NameIndex:
+    """Immutable n-gram index over one snapshot of rows"""
+
+    def __init__(self, rows, version):
+        self.version = version
+        self.rows = [{'interest_area_id': row['interest_area_id'], 'name': row['name']} for row in rows]
+        self.folded = [row['name'].casefold() for row in self.rows]
+        self.postings = {}
+        for pos, name in enumerate(self.folded):
+            for n in range(1, MAX_GRAM + 1):
+                for gram in _grams(name, n):
+                    self.postings.setdefault(gram, set()).add(pos)
+
+    def _candidates(self, q):
+        if len(q) <= MAX_GRAM:
+            return self.postings.get(q, set())
+        grams = sorted(_grams(q, MAX_GRAM), key=lambda g: len(self.postings.get(g, ())))
+        result = set(self.postings.get(grams[0], set()))
+        for gram in grams[1:]:
+            if not result:
+                break
+            result &= self.postings.get(gram, set())
+        return {pos for pos in result if q in self.folded[pos]}
+
+    def _rank(self, pos, q):
+        name = self.folded[pos]
+        if name == q:
+            group = 0
+        elif name.startswith(q):
+            group = 1
+        elif any(word.startswith(q) for word in name.split()):
+            group = 2
+        else:
+            group = 3
+        return group, name, self.rows[pos]['interest_area_id']
+
+    def search(self, query, limit=None):
+        q = query.strip().casefold()
+        if not q:
+            return []
+        ranked = sorted(self._candidates(q), key=lambda pos: self._rank(pos, q))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.rows[pos] for pos in ranked]
+
+
+class InterestAreaIndex:
+    """Holds the current NameIndex and rebuilds it when the data changes"""
+
+    def __init__(self, connect, poll_interval=30.0):
+        self._connect = connect
+        self.poll_interval = poll_interval
+        self.current = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _fetch_version(self, cursor):
+        cursor.execute(VERSION_QUERY)
+        row = cursor.fetchone()
+        return row['version'] if row else 0
+
+    def load(self):
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.cursor(dictionary=True)
+            try:
+                version = self._fetch_version(cursor)
+                cursor.execute(LOAD_QUERY)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+                conn.close()
+            self.current = NameIndex(rows, version)
+        return self.current
+
+    def check(self):
+        conn = self._connect()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            version = self._fetch_version(cursor)
+        finally:
+            cursor.close()
+            conn.close()
+        if self.current is None or version != self.current.version:
+            self.load()
+            return True
+        return False
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                log_event(log, logging.ERROR, "ERROR_LOG", "Interest area index refresh failed", error=str(e))
+
+    def start(self):
+        if self.current is None:
+            self.load()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._poll, name="interest-area-index", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def search(self, query, limit=None):
+        return self.current.search(query, limit)
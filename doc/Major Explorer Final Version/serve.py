@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Production entry point: pre-forked gunicorn workers with warm caches
+
+    python serve.py                  # app.py (WSGI), one worker per core
+    python serve.py --asgi           # asgi_app.py on uvicorn workers
+    kill -HUP <master pid>           # graceful reload
+
+The master only binds the socket and forks; each worker imports the app
+itself, so connection pools, background pollers and the log listener
+thread are created after fork and never shared. Each worker runs
+app.warm_up() (pool prefill, interest-area index, majors engine or the
+default /majors query, DataVersion counters) before it accepts its
+first request: WSGI workers from post_worker_init, uvicorn workers from
+asgi_app's lifespan, which also opens the aiomysql pools. On the way out
+app.shut_down() closes the worker's pooled connections (worker_exit, or
+the end of the lifespan) so MySQL is not left holding them until timeout.
+
+SIGHUP starts a fresh set of workers, which re-import the code and warm
+up, and then lets the old ones finish their in-flight requests
+(WEB_GRACEFUL_TIMEOUT) before exiting. The listening socket stays open in
+the master the whole time, so connections queue instead of being refused.
+
+Per-process state stays per process: the logout deny-list, rate-limit
+buckets, read-your-writes pins, count cache, saved-comparisons cache and
+/metrics are kept by each worker separately. The saved-comparisons cache
+checks SavedComparisonVersion on every read, so it never serves a list
+that another worker has since changed. Password-change revocations are
+stored in MySQL and reach the other workers within SESSION_REVOCATION_TTL.
+
+Environment (flags override):
+    WEB_BIND              host:port, default 127.0.0.1:5000
+    WEB_WORKERS           default: number of cores
+    WEB_THREADS           threads per WSGI worker, default 4
+    WEB_TIMEOUT           seconds before a stuck worker is restarted, default 60
+    WEB_GRACEFUL_TIMEOUT  seconds old workers get to drain on reload/stop, default 30
+"""
+
+import argparse
+import logging
+import os
+import secrets
+
+from dotenv import load_dotenv
+from gunicorn.app.base import BaseApplication
+
+from app_logging import setup_logging, get_logger, log_event
+
+log = get_logger('serve')
+
+
+def post_worker_init(worker):
+    """Runs in each WSGI worker after fork and app import, before it accepts"""
+    import app
+    app.warm_up()
+
+
+def worker_exit(server, worker):
+    """Runs in each WSGI worker as it exits, after its requests have drained"""
+    import app
+    app.shut_down()
+
+
+class Server(BaseApplication):
+    def __init__(self, app_uri, options):
+        self.app_uri = app_uri
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # Imported lazily in the worker (preload_app is off)
+        module, _, name = self.app_uri.partition(':')
+        return getattr(__import__(module), name)
+
+
+def share_process_settings(workers):
+    """Settings every worker must agree on, fixed once in the master"""
+    if not os.getenv('SESSION_KEYS'):
+        # Otherwise each worker would sign with its own random key and
+        # reject the others' tokens; this one lasts until the master exits
+        os.environ['SESSION_KEYS'] = f"boot:{secrets.token_urlsafe(32)}"
+        log_event(log, logging.WARNING, "STARTUP_LOG",
+                  "SESSION_KEYS not set; using a per-boot key shared by the workers")
+    # BCRYPT_WORKERS defaults to the core count per process; split it
+    os.environ.setdefault('BCRYPT_WORKERS', str(max(1, (os.cpu_count() or 2) // workers)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the College Major Explorer API with pre-forked workers")
+    parser.add_argument('--bind', default=os.getenv('WEB_BIND', '127.0.0.1:5000'))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_WORKERS', str(os.cpu_count() or 2))))
+    parser.add_argument('--threads', type=int, default=int(os.getenv('WEB_THREADS', '4')))
+    parser.add_argument('--timeout', type=int, default=int(os.getenv('WEB_TIMEOUT', '60')))
+    parser.add_argument('--graceful-timeout', type=int, default=int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30')))
+    parser.add_argument('--asgi', action='store_true', help="serve asgi_app.py on uvicorn workers")
+    args = parser.parse_args()
+
+    share_process_settings(args.workers)
+    options = {
+        'bind': args.bind,
+        'workers': args.workers,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'keepalive': 5,
+        'preload_app': False,
+    }
+    if args.asgi:
+        # The lifespan warms up; a hook here would do it a second time
+        options['worker_class'] = 'uvicorn.workers.UvicornWorker'
+        app_uri = 'asgi_app:app'
+    else:
+        options.update(worker_class='gthread', threads=args.threads,
+                       post_worker_init=post_worker_init, worker_exit=worker_exit)
+        app_uri = 'app:app'
+
+    log_event(log, logging.INFO, "STARTUP_LOG", "Starting pre-forked server", bind=args.bind,
+              workers=args.workers, app=app_uri, pid=os.getpid())
+    Server(app_uri, options).run()
+
+
+if __name__ == '__main__':
+    load_dotenv()
+    setup_logging(os.getenv('LOG_LEVEL', 'INFO'), os.getenv('LOG_FORMAT', 'json'))
+    main()
@@ -0,0 +1,159 @@
+"""
+Stateless signed session tokens
+
+A token is "<payload>.<signature>", both base64url without padding. The
+payload is compact JSON {"uid", "iat", "exp", "kid", "jti"} ("iat" to the
+microsecond, so a password change can cut off exactly the tokens issued
+before it), plus "wrt"
+(epoch seconds of the user's last write) on tokens handed out by write
+handlers, which the replica router reads for read-your-writes; the
+signature is HMAC-SHA256 over the encoded payload with the key named by
+"kid". verify() needs no database: decode, look up the key, compare
+digests, check expiry and the in-memory deny-list.
+
+Keys rotate by listing several: the first signs new tokens, all of them
+verify, so tokens signed with a retiring key keep working until they
+expire. Logout revokes one token in a per-process deny-list whose entries
+disappear once the tokens would have expired. A password change revokes
+every earlier token of the user with a cutoff "iat"; revoke_user() holds
+it in this process, and app.py also stores it in MySQL so that other
+processes apply it through check_revoked().
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+
+
+class InvalidToken(Exception):
+    """Raised for malformed, forged, expired or revoked tokens"""
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def parse_keys(spec):
+    """"kid1:secret1,kid2:secret2" -> [(kid, key bytes)], signing key first"""
+    keys = []
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        kid, sep, secret = item.partition(':')
+        if not sep or not kid or not secret:
+            raise ValueError("SESSION_KEYS entries must look like kid:secret")
+        keys.append((kid, secret.encode('utf-8')))
+    return keys
+
+
+class SessionTokens:
+    def __init__(self, keys=None, ttl=12 * 3600, clock=time.time):
+        if not keys:
+            # Per-process key: fine for one process, tokens die on restart
+            keys = [('local', secrets.token_bytes(32))]
+        self.signing_kid, self.signing_key = keys[0]
+        self.keys = dict(keys)
+        self.ttl = ttl
+        self._clock = clock
+        self._revoked_tokens = {}  # jti -> exp
+        self._revoked_users = {}   # uid -> (cutoff iat, exp of the newest token it covers)
+        self._lock = threading.Lock()
+        self._next_prune = 0
+
+    def now(self):
+        """Current time as "iat" and revocation cutoffs round it, so they compare exactly"""
+        return round(self._clock(), 6)
+
+    def _sign(self, key, payload):
+        return _b64encode(hmac.new(key, payload.encode('ascii'), hashlib.sha256).digest())
+
+    def issue(self, user_id, wrote_at=None, expires_at=None):
+        """
+        Returns (token, expires_at epoch seconds). `expires_at` keeps the
+        expiry of a token being replaced instead of starting a new ttl.
+        """
+        now = self.now()
+        claims = {"uid": user_id, "iat": now, "exp": expires_at or int(now) + self.ttl,
+                  "kid": self.signing_kid, "jti": secrets.token_urlsafe(9)}
+        if wrote_at is not None:
+            claims["wrt"] = round(wrote_at, 3)
+        payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+        return f"{payload}.{self._sign(self.signing_key, payload)}", claims["exp"]
+
+    def verify(self, token):
+        """Claims of a valid token; raises InvalidToken otherwise"""
+        payload, sep, signature = (token or '').partition('.')
+        if not sep:
+            raise InvalidToken("Malformed token")
+        try:
+            claims = json.loads(_b64decode(payload))
+            kid, uid, iat, exp, jti = (claims["kid"], claims["uid"], claims["iat"],
+                                       claims["exp"], claims["jti"])
+        except (ValueError, KeyError, TypeError):
+            raise InvalidToken("Malformed token")
+        key = self.keys.get(kid) if isinstance(kid, str) else None
+        if key is None:
+            raise InvalidToken("Unknown signing key")
+        if not hmac.compare_digest(signature.encode('utf-8'), self._sign(key, payload).encode('ascii')):
+            raise InvalidToken("Bad signature")
+        now = self._clock()
+        if exp <= now:
+            raise InvalidToken("Token expired")
+        if self._revoked_tokens or self._revoked_users:
+            self._prune(now)
+            if jti in self._revoked_tokens:
+                raise InvalidToken("Token revoked")
+            cutoff = self._revoked_users.get(uid)
+            if cutoff is not None and iat < cutoff[0]:
+                raise InvalidToken("Token revoked")
+        return claims
+
+    def revoke(self, token):
+        """Deny this token until it expires (logout)"""
+        claims = self.verify(token)
+        with self._lock:
+            self._revoked_tokens[claims["jti"]] = claims["exp"]
+
+    def revoke_user(self, user_id, cutoff=None):
+        """
+        Deny every token of `user_id` issued before `cutoff` (default: now)
+        and return the cutoff; a token issued right after, even within the
+        same second, still verifies.
+        """
+        cutoff = self.now() if cutoff is None else cutoff
+        with self._lock:
+            self._revoked_users[user_id] = (cutoff, cutoff + self.ttl)
+        return cutoff
+
+    def check_revoked(self, claims, revoked_before):
+        """Raises InvalidToken if verified `claims` predate the user's stored cutoff"""
+        if revoked_before is not None and claims["iat"] < revoked_before:
+            raise InvalidToken("Token revoked")
+
+    def _prune(self, now):
+        if now < self._next_prune:
+            return
+        with self._lock:
+            self._next_prune = now + 60
+            self._revoked_tokens = {jti: exp for jti, exp in self._revoked_tokens.items() if exp > now}
+            self._revoked_users = {uid: cut for uid, cut in self._revoked_users.items() if cut[1] > now}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "signing_kid": self.signing_kid,
+                "verification_kids": sorted(self.keys),
+                "ttl": self.ttl,
+                "revoked_tokens": len(self._revoked_tokens),
+                "revoked_users": len(self._revoked_users),
+            }
+
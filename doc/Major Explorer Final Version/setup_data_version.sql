@@ -0,0 +1,124 @@
+-- Monotonic version counters for reference data. Triggers bump them when
+-- the underlying tables change so the app can tell when its in-memory
+-- copies are stale without re-reading the data itself.
+CREATE TABLE IF NOT EXISTS DataVersion (
+    name VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+INSERT IGNORE INTO DataVersion (name, version)
+VALUES ('major_stats', 1), ('interest_area', 1), ('data_source', 1);
+
+CREATE TABLE IF NOT EXISTS SavedComparisonVersion (
+    user_id INT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES User(user_id) ON DELETE CASCADE
+);
+
+DELIMITER $$
+
+DROP PROCEDURE IF EXISTS sp_bump_data_version$$
+CREATE PROCEDURE sp_bump_data_version (
+    IN p_name VARCHAR(50)
+)
+BEGIN
+    INSERT INTO DataVersion (name, version) VALUES (p_name, 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END$$
+
+-- InterestArea changes invalidate the in-process autocomplete index
+DROP TRIGGER IF EXISTS trg_interestarea_version_insert$$
+CREATE TRIGGER trg_interestarea_version_insert
+AFTER INSERT ON InterestArea
+FOR EACH ROW
+BEGIN
+    CALL sp_bump_data_version('interest_area');
+END$$
+
+DROP TRIGGER IF EXISTS trg_interestarea_version_update$$
+CREATE TRIGGER trg_interestarea_version_update
+AFTER UPDATE ON InterestArea
+FOR EACH ROW
+BEGIN
+    CALL sp_bump_data_version('interest_area');
+END$$
+
+DROP TRIGGER IF EXISTS trg_interestarea_version_delete$$
+CREATE TRIGGER trg_interestarea_version_delete
+AFTER DELETE ON InterestArea
+FOR EACH ROW
+BEGIN
+    CALL sp_bump_data_version('interest_area');
+END$$
+
+-- /major-jobs rows carry the source name and url
+DROP TRIGGER IF EXISTS trg_datasource_version_insert$$
+CREATE TRIGGER trg_datasource_version_insert
+AFTER INSERT ON DataSource
+FOR EACH ROW
+BEGIN
+    CALL sp_bump_data_version('data_source');
+END$$
+
+DROP TRIGGER IF EXISTS trg_datasource_version_update$$
+CREATE TRIGGER trg_datasource_version_update
+AFTER UPDATE ON DataSource
+FOR EACH ROW
+BEGIN
+    CALL sp_bump_data_version('data_source');
+END$$
+
+DROP TRIGGER IF EXISTS trg_datasource_version_delete$$
+CREATE TRIGGER trg_datasource_version_delete
+AFTER DELETE ON DataSource
+FOR EACH ROW
+BEGIN
+    CALL sp_bump_data_version('data_source');
+END$$
+
+-- Per-user counterpart for the saved-comparisons cache: bumped in the same
+-- transaction as every change to a user's saved list, so each app process
+-- can check its cached copy with one primary-key read. A missing row reads
+-- as version 0. Sessions with @bulk_load set skip it and bump each loaded
+-- user once at the end (generate_data.py).
+DROP PROCEDURE IF EXISTS sp_bump_saved_version$$
+CREATE PROCEDURE sp_bump_saved_version (
+    IN p_user_id INT
+)
+bump: BEGIN
+    IF @bulk_load IS NOT NULL THEN
+        LEAVE bump;
+    END IF;
+    INSERT INTO SavedComparisonVersion (user_id, version) VALUES (p_user_id, 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END$$
+
+DROP TRIGGER IF EXISTS trg_savedcomparison_version_insert$$
+CREATE TRIGGER trg_savedcomparison_version_insert
+AFTER INSERT ON SavedComparison
+FOR EACH ROW
+BEGIN
+    CALL sp_bump_saved_version(NEW.user_id);
+END$$
+
+DROP TRIGGER IF EXISTS trg_savedcomparison_version_update$$
+CREATE TRIGGER trg_savedcomparison_version_update
+AFTER UPDATE ON SavedComparison
+FOR EACH ROW
+BEGIN
+    CALL sp_bump_saved_version(NEW.user_id);
+    IF NOT (OLD.user_id <=> NEW.user_id) THEN
+        CALL sp_bump_saved_version(OLD.user_id);
+    END IF;
+END$$
+
+DROP TRIGGER IF EXISTS trg_savedcomparison_version_delete$$
+CREATE TRIGGER trg_savedcomparison_version_delete
+AFTER DELETE ON SavedComparison
+FOR EACH ROW
+BEGIN
+    CALL sp_bump_saved_version(OLD.user_id);
+END$$
+
+DELIMITER ;
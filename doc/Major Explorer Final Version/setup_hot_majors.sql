@@ -0,0 +1,95 @@
+-- "Hot majors" leaderboard for sp_basic_signup and /trending-majors.
+-- An event rolls the last 30 days of SavedComparison up into HotMajors every
+-- 5 minutes, so signup copies k ranked rows instead of grouping 30 days of
+-- saves inside its transaction. Saves and signups themselves write nothing
+-- extra: there are no counter rows for them to lock. Run after schema.sql
+-- (it replaces sp_basic_signup).
+-- Requires the MySQL event scheduler (SET GLOBAL event_scheduler = ON);
+-- without it, CALL sp_refresh_hot_majors(30, 10) from cron instead.
+CREATE TABLE IF NOT EXISTS HotMajors (
+    rank_pos INT PRIMARY KEY,
+    major_id INT NOT NULL,
+    saves INT NOT NULL,
+    window_days INT NOT NULL,
+    refreshed_at DATETIME NOT NULL,
+    FOREIGN KEY (major_id) REFERENCES Major(major_id) ON DELETE CASCADE
+);
+
+-- Covers the rollup: a range scan over the window, grouped by major_id
+CREATE INDEX idx_savedcomparison_saved_at ON SavedComparison(saved_at, major_id);
+
+DELIMITER $$
+
+-- Rebuild the top p_k over the last p_days days (today included) from
+-- idx_savedcomparison_saved_at. READ COMMITTED makes the INSERT ... SELECT
+-- a plain consistent read, so it takes no locks on SavedComparison and
+-- concurrent saves never wait on a refresh. (It sets the isolation level
+-- of the calling session; the event runs in a session of its own.)
+DROP PROCEDURE IF EXISTS sp_refresh_hot_majors$$
+
+CREATE PROCEDURE sp_refresh_hot_majors (
+    IN p_days INT,
+    IN p_k    INT
+)
+BEGIN
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED;
+
+    START TRANSACTION;
+    DELETE FROM HotMajors;
+    INSERT INTO HotMajors (rank_pos, major_id, saves, window_days, refreshed_at)
+    SELECT ROW_NUMBER() OVER (ORDER BY COUNT(*) DESC, sc.major_id),
+           sc.major_id, COUNT(*), p_days, NOW()
+    FROM SavedComparison sc
+    WHERE sc.saved_at >= CURDATE() - INTERVAL (p_days - 1) DAY
+    GROUP BY sc.major_id
+    ORDER BY COUNT(*) DESC, sc.major_id
+    LIMIT p_k;
+    COMMIT;
+END$$
+
+-- Same contract as before: new users start with the top 3 hot majors.
+-- Under READ COMMITTED the INSERT ... SELECT reads HotMajors without
+-- locking it, so signups never wait on a refresh.
+DROP PROCEDURE IF EXISTS sp_basic_signup$$
+
+CREATE PROCEDURE sp_basic_signup (
+    IN  p_username       VARCHAR(50),
+    IN  p_email          VARCHAR(255),
+    IN  p_password_hash  VARCHAR(255)
+)
+BEGIN
+    DECLARE v_user_id INT;
+
+    IF EXISTS (SELECT 1 FROM User
+               WHERE username = p_username
+                  OR email    = p_email) THEN
+        SIGNAL SQLSTATE '45000'
+               SET MESSAGE_TEXT = 'Username or e-mail already taken';
+    END IF;
+
+    INSERT INTO User (username, email, password_hash)
+    VALUES (p_username, p_email, p_password_hash);
+
+    SET v_user_id = LAST_INSERT_ID();
+
+    INSERT INTO SavedComparison (user_id, major_id, saved_at)
+    SELECT v_user_id, major_id, NOW()
+    FROM HotMajors
+    WHERE rank_pos <= 3
+    ORDER BY rank_pos;
+END$$
+
+CREATE EVENT IF NOT EXISTS ev_refresh_hot_majors
+ON SCHEDULE EVERY 5 MINUTE
+DO CALL sp_refresh_hot_majors(30, 10)$$
+
+DELIMITER ;
+
+-- Build the first leaderboard from the existing saves
+CALL sp_refresh_hot_majors(30, 10);
@@ -0,0 +1,14 @@
+-- Support for ingest_data.py: one MajorStats row per (major, source, year)
+-- so re-running a load upserts instead of duplicating, plus a checkpoint
+-- table so an interrupted load can resume where it stopped.
+CREATE UNIQUE INDEX uq_majorstats_major_source_year ON MajorStats(major_id, source_id, year);
+
+CREATE TABLE IF NOT EXISTS IngestionProgress (
+    file_key VARCHAR(255) PRIMARY KEY,
+    source_id INT,
+    year INT,
+    rows_done BIGINT NOT NULL DEFAULT 0,
+    completed BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (source_id) REFERENCES DataSource(source_id) ON DELETE CASCADE
+);
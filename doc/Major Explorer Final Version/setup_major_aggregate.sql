@@ -0,0 +1,182 @@
+-- Materialized per-major aggregate of MajorStats, read by /majors and
+-- /saved-comparisons instead of running AVG() ... GROUP BY on every request.
+-- Sums and non-NULL counts are kept per column so the averages match AVG().
+-- Requires setup_data_version.sql; every change bumps the 'major_stats' version.
+CREATE TABLE IF NOT EXISTS MajorAggregate (
+    major_id INT PRIMARY KEY,
+    interest_area_id INT,
+    stat_count INT NOT NULL DEFAULT 0,
+    salary_sum DECIMAL(20,2) NOT NULL DEFAULT 0,
+    salary_count INT NOT NULL DEFAULT 0,
+    growth_sum DECIMAL(20,4) NOT NULL DEFAULT 0,
+    growth_count INT NOT NULL DEFAULT 0,
+    grad_sum BIGINT NOT NULL DEFAULT 0,
+    grad_count INT NOT NULL DEFAULT 0,
+    avg_salary DECIMAL(16,6),
+    avg_growth_rate DECIMAL(12,8),
+    avg_grads DECIMAL(16,4),
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (major_id) REFERENCES Major(major_id) ON DELETE CASCADE
+);
+
+-- min_salary / min_growth filters become range scans on these
+CREATE INDEX idx_majoragg_area_salary ON MajorAggregate(interest_area_id, avg_salary);
+CREATE INDEX idx_majoragg_salary ON MajorAggregate(avg_salary);
+CREATE INDEX idx_majoragg_growth ON MajorAggregate(avg_growth_rate);
+
+DELIMITER $$
+
+-- Add (p_sign = 1) or remove (p_sign = -1) one MajorStats row.
+-- Bulk loaders (ingest_data.py, generate_data.py) SET @bulk_load = 1 so
+-- their sessions skip this per-row work, then CALL sp_refresh_major_aggregate()
+-- once at the end.
+DROP PROCEDURE IF EXISTS sp_major_aggregate_apply$$
+CREATE PROCEDURE sp_major_aggregate_apply (
+    IN p_major_id   INT,
+    IN p_salary     DECIMAL(10,2),
+    IN p_growth     DECIMAL(5,4),
+    IN p_grads      INT,
+    IN p_sign       INT
+)
+apply_row: BEGIN
+    IF @bulk_load IS NOT NULL THEN
+        LEAVE apply_row;
+    END IF;
+
+    INSERT INTO MajorAggregate (major_id, interest_area_id)
+    SELECT major_id, interest_area_id FROM Major WHERE major_id = p_major_id
+    ON DUPLICATE KEY UPDATE major_id = major_id;
+
+    UPDATE MajorAggregate
+    SET stat_count      = stat_count + p_sign,
+        salary_sum      = salary_sum + p_sign * COALESCE(p_salary, 0),
+        salary_count    = salary_count + p_sign * (p_salary IS NOT NULL),
+        growth_sum      = growth_sum + p_sign * COALESCE(p_growth, 0),
+        growth_count    = growth_count + p_sign * (p_growth IS NOT NULL),
+        grad_sum        = grad_sum + p_sign * COALESCE(p_grads, 0),
+        grad_count      = grad_count + p_sign * (p_grads IS NOT NULL),
+        avg_salary      = salary_sum / NULLIF(salary_count, 0),
+        avg_growth_rate = growth_sum / NULLIF(growth_count, 0),
+        avg_grads       = grad_sum / NULLIF(grad_count, 0)
+    WHERE major_id = p_major_id;
+
+    DELETE FROM MajorAggregate WHERE major_id = p_major_id AND stat_count <= 0;
+
+    CALL sp_bump_data_version('major_stats');
+END$$
+
+-- Full rebuild; use after bulk loads or if the table is ever out of sync
+DROP PROCEDURE IF EXISTS sp_refresh_major_aggregate$$
+CREATE PROCEDURE sp_refresh_major_aggregate ()
+BEGIN
+    DELETE FROM MajorAggregate;
+
+    INSERT INTO MajorAggregate (
+        major_id, interest_area_id, stat_count,
+        salary_sum, salary_count, growth_sum, growth_count, grad_sum, grad_count,
+        avg_salary, avg_growth_rate, avg_grads
+    )
+    SELECT
+        m.major_id,
+        m.interest_area_id,
+        COUNT(*),
+        COALESCE(SUM(ms.avg_salary), 0), COUNT(ms.avg_salary),
+        COALESCE(SUM(ms.job_growth_rate), 0), COUNT(ms.job_growth_rate),
+        COALESCE(SUM(ms.grad_count), 0), COUNT(ms.grad_count),
+        AVG(ms.avg_salary), AVG(ms.job_growth_rate), AVG(ms.grad_count)
+    FROM MajorStats ms
+    JOIN Major m ON m.major_id = ms.major_id
+    GROUP BY m.major_id, m.interest_area_id;
+
+    CALL sp_bump_data_version('major_stats');
+END$$
+
+DROP TRIGGER IF EXISTS trg_majorstats_agg_insert$$
+CREATE TRIGGER trg_majorstats_agg_insert
+AFTER INSERT ON MajorStats
+FOR EACH ROW
+BEGIN
+    CALL sp_major_aggregate_apply(NEW.major_id, NEW.avg_salary, NEW.job_growth_rate, NEW.grad_count, 1);
+END$$
+
+DROP TRIGGER IF EXISTS trg_majorstats_agg_update$$
+CREATE TRIGGER trg_majorstats_agg_update
+AFTER UPDATE ON MajorStats
+FOR EACH ROW
+BEGIN
+    CALL sp_major_aggregate_apply(OLD.major_id, OLD.avg_salary, OLD.job_growth_rate, OLD.grad_count, -1);
+    CALL sp_major_aggregate_apply(NEW.major_id, NEW.avg_salary, NEW.job_growth_rate, NEW.grad_count, 1);
+END$$
+
+DROP TRIGGER IF EXISTS trg_majorstats_agg_delete$$
+CREATE TRIGGER trg_majorstats_agg_delete
+AFTER DELETE ON MajorStats
+FOR EACH ROW
+BEGIN
+    CALL sp_major_aggregate_apply(OLD.major_id, OLD.avg_salary, OLD.job_growth_rate, OLD.grad_count, -1);
+END$$
+
+DROP TRIGGER IF EXISTS trg_major_agg_area$$
+CREATE TRIGGER trg_major_agg_area
+AFTER UPDATE ON Major
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.interest_area_id <=> NEW.interest_area_id) THEN
+        UPDATE MajorAggregate
+        SET interest_area_id = NEW.interest_area_id
+        WHERE major_id = NEW.major_id;
+    END IF;
+    -- major_name is served alongside the aggregate, so renames count too
+    CALL sp_bump_data_version('major_stats');
+END$$
+
+DROP TRIGGER IF EXISTS trg_major_agg_delete$$
+CREATE TRIGGER trg_major_agg_delete
+AFTER DELETE ON Major
+FOR EACH ROW
+BEGIN
+    CALL sp_bump_data_version('major_stats');
+END$$
+
+-- ON DELETE CASCADE from DataSource does not fire the MajorStats triggers,
+-- so subtract that source's rows here before they disappear.
+DROP TRIGGER IF EXISTS trg_datasource_agg_delete$$
+CREATE TRIGGER trg_datasource_agg_delete
+BEFORE DELETE ON DataSource
+FOR EACH ROW
+BEGIN
+    UPDATE MajorAggregate ma
+    JOIN (
+        SELECT major_id,
+               COUNT(*) AS stat_count,
+               COALESCE(SUM(avg_salary), 0) AS salary_sum, COUNT(avg_salary) AS salary_count,
+               COALESCE(SUM(job_growth_rate), 0) AS growth_sum, COUNT(job_growth_rate) AS growth_count,
+               COALESCE(SUM(grad_count), 0) AS grad_sum, COUNT(grad_count) AS grad_count
+        FROM MajorStats
+        WHERE source_id = OLD.source_id
+        GROUP BY major_id
+    ) d ON d.major_id = ma.major_id
+    SET ma.stat_count      = ma.stat_count - d.stat_count,
+        ma.salary_sum      = ma.salary_sum - d.salary_sum,
+        ma.salary_count    = ma.salary_count - d.salary_count,
+        ma.growth_sum      = ma.growth_sum - d.growth_sum,
+        ma.growth_count    = ma.growth_count - d.growth_count,
+        ma.grad_sum        = ma.grad_sum - d.grad_sum,
+        ma.grad_count      = ma.grad_count - d.grad_count;
+
+    -- Multi-table UPDATE does not guarantee assignment order, so the
+    -- averages are recomputed in a separate single-table pass
+    UPDATE MajorAggregate
+    SET avg_salary      = salary_sum / NULLIF(salary_count, 0),
+        avg_growth_rate = growth_sum / NULLIF(growth_count, 0),
+        avg_grads       = grad_sum / NULLIF(grad_count, 0)
+    WHERE major_id IN (SELECT major_id FROM MajorStats WHERE source_id = OLD.source_id);
+
+    DELETE FROM MajorAggregate WHERE stat_count <= 0;
+
+    CALL sp_bump_data_version('major_stats');
+END$$
+
+DELIMITER ;
+
+CALL sp_refresh_major_aggregate();
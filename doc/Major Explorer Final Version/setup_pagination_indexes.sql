@@ -0,0 +1,12 @@
+-- Indexes backing keyset pagination and the sort options of /majors and
+-- /major-jobs. InnoDB secondary indexes carry the primary key, so each one
+-- also covers the (sort column, id) tie-breaker used by the cursors.
+CREATE INDEX idx_majoragg_grads ON MajorAggregate(avg_grads);
+
+-- sort=major_name: scan Major in name order, joining MajorAggregate by id
+CREATE INDEX idx_major_name ON Major(major_name);
+
+CREATE INDEX idx_majorstats_major_salary ON MajorStats(major_id, avg_salary);
+CREATE INDEX idx_majorstats_major_growth ON MajorStats(major_id, job_growth_rate);
+CREATE INDEX idx_majorstats_major_grads ON MajorStats(major_id, grad_count);
+CREATE INDEX idx_majorstats_major_year ON MajorStats(major_id, year);
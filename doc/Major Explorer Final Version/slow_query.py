@@ -0,0 +1,254 @@
+"""
+Slow-query log with automatic EXPLAIN capture
+
+Every statement run through a SlowQueryCursor is timed and folded into
+per-fingerprint totals (literals, placeholders and repeated value lists
+collapsed, so "IN (%s, %s)" and "IN (%s, %s, %s)" count as one query).
+Fingerprinting costs several regex passes, so fast statements are only
+counted under their exact text, at most `max_statements` of them, and
+folded into fingerprints when report() runs or the table fills up.
+A statement slower than `threshold` seconds is fingerprinted straight
+away and appended to a bounded ring buffer; at most once per `explain_interval` seconds per fingerprint, its
+EXPLAIN FORMAT=JSON plan is captured on a dedicated connection by a
+background thread, so the request that hit the slow path never waits for
+it. Parameters are used for the EXPLAIN but never stored.
+"""
+
+import json
+import logging
+import queue
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from app_logging import get_logger, log_event
+
+log = get_logger('slow_query')
+
+EXPLAINABLE = ('select', 'insert', 'update', 'delete', 'replace', 'with')
+
+_COMMENTS = re.compile(r'/\*.*?\*/|--[^\n]*', re.S)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_REPEATED_TUPLES = re.compile(r'(\((?:[^()]|\([^()]*\))*\))(?:\s*,\s*\1)+')
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Normalized statement text used to group executions of one query"""
+    text = _COMMENTS.sub(' ', sql)
+    text = _STRINGS.sub('?', text)
+    text = text.replace('%s', '?')
+    text = _NUMBERS.sub('?', text)
+    text = _SPACES.sub(' ', text).strip()
+    text = _PLACEHOLDER_LISTS.sub('(?+)', text)
+    text = _REPEATED_TUPLES.sub(r'\1, ...', text)
+    return text
+
+
+class SlowQueryCursor:
+    """Cursor proxy that reports execute/callproc timings to a SlowQueryLog"""
+
+    def __init__(self, cursor, log):
+        self._cursor = cursor
+        self._log = log
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._log.record(operation, params, time.perf_counter() - started)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            self._log.record(operation, None, time.perf_counter() - started)
+
+    def callproc(self, procname, args=(), *rest, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.callproc(procname, args, *rest, **kwargs)
+        finally:
+            self._log.record(f"CALL {procname}({', '.join(['%s'] * len(args))})",
+                             None, time.perf_counter() - started)
+
+
+class SlowQueryLog:
+    """
+    threshold         seconds after which a statement is logged as slow
+    explain_interval  minimum seconds between EXPLAINs of one fingerprint
+    capacity          slow statements kept in the ring buffer
+    connect           callable returning a connection for EXPLAIN (kept open
+                      by the capture thread); None disables EXPLAIN capture
+    context           optional callable returning extra fields (e.g. route)
+    max_statements    distinct statement texts counted before folding
+    """
+
+    def __init__(self, threshold=0.2, explain_interval=60.0, capacity=100,
+                 connect=None, context=None, max_sql_length=2000, max_statements=1000):
+        self.threshold = threshold
+        self.explain_interval = explain_interval
+        self.capacity = capacity
+        self.max_sql_length = max_sql_length
+        self.max_statements = max_statements
+        self._connect = connect
+        self._context = context
+        self._entries = deque(maxlen=capacity)
+        self._statements = {}  # exact sql -> [count, total_ms, max_ms], not yet fingerprinted
+        self._fingerprints = {}
+        self._last_explained = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=16)
+        self._thread = None
+        self._explain_conn = None
+
+    def wrap_cursor(self, cursor):
+        return SlowQueryCursor(cursor, self)
+
+    def _fingerprint_stats(self, fp):
+        """Totals for `fp`, created on first use; caller holds the lock"""
+        stats = self._fingerprints.get(fp)
+        if stats is None:
+            stats = self._fingerprints[fp] = {
+                "fingerprint": fp, "count": 0, "slow": 0,
+                "total_ms": 0.0, "max_ms": 0.0, "explain": None,
+            }
+        return stats
+
+    def _fold(self):
+        """Move the per-statement totals into their fingerprints; caller holds the lock"""
+        for sql, (count, total_ms, max_ms) in self._statements.items():
+            stats = self._fingerprint_stats(fingerprint(sql))
+            stats["count"] += count
+            stats["total_ms"] += total_ms
+            stats["max_ms"] = max(stats["max_ms"], max_ms)
+        self._statements = {}
+
+    def record(self, sql, params, elapsed):
+        elapsed_ms = elapsed * 1000
+        if elapsed < self.threshold:
+            with self._lock:
+                stats = self._statements.get(sql)
+                if stats is None:
+                    if len(self._statements) >= self.max_statements:
+                        self._fold()
+                    stats = self._statements[sql] = [0, 0.0, 0.0]
+                stats[0] += 1
+                stats[1] += elapsed_ms
+                if elapsed_ms > stats[2]:
+                    stats[2] = elapsed_ms
+            return
+
+        fp = fingerprint(sql)
+        explain = False
+        with self._lock:
+            stats = self._fingerprint_stats(fp)
+            stats["count"] += 1
+            stats["slow"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            now = time.monotonic()
+            if self._connect is not None and fp.lower().startswith(EXPLAINABLE) \
+                    and now - self._last_explained.get(fp, -self.explain_interval) >= self.explain_interval:
+                self._last_explained[fp] = now
+                explain = True
+
+        entry = {
+            "fingerprint": fp,
+            "sql": sql if len(sql) <= self.max_sql_length else sql[:self.max_sql_length] + '...',
+            "duration_ms": round(elapsed_ms, 3),
+            "at": datetime.now().isoformat(timespec='milliseconds'),
+        }
+        if self._context is not None:
+            try:
+                entry.update(self._context())
+            except Exception:
+                pass
+        with self._lock:
+            self._entries.append(entry)
+        log_event(log, logging.WARNING, "SLOW_QUERY_LOG", "Slow statement", **entry)
+
+        if explain:
+            self._start()
+            try:
+                self._queue.put_nowait((fp, sql, params))
+            except queue.Full:
+                with self._lock:
+                    self._last_explained.pop(fp, None)
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="slow-query-explain", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            fp, sql, params = self._queue.get()
+            try:
+                plan = self._explain(sql, params)
+            except Exception as e:
+                plan = {"error": str(e)}
+                if self._explain_conn is not None:
+                    try:
+                        self._explain_conn.close()
+                    except Exception:
+                        pass
+                    self._explain_conn = None
+            with self._lock:
+                self._fingerprints[fp]["explain"] = plan
+                self._fingerprints[fp]["explained_at"] = datetime.now().isoformat(timespec='seconds')
+                for entry in reversed(self._entries):
+                    if entry["fingerprint"] == fp:
+                        entry["explain"] = plan
+                        break
+
+    def _explain(self, sql, params):
+        if self._explain_conn is None:
+            self._explain_conn = self._connect()
+        cursor = self._explain_conn.cursor()
+        try:
+            cursor.execute("EXPLAIN FORMAT=JSON " + sql, params)
+            row = cursor.fetchone()
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        return json.loads(row[0]) if row else None
+
+    def report(self, limit=20):
+        """Recent slow statements (newest first) and the costliest fingerprints"""
+        with self._lock:
+            self._fold()
+            entries = list(reversed(self._entries))
+            fingerprints = sorted(
+                (dict(stats) for stats in self._fingerprints.values()),
+                key=lambda stats: stats["total_ms"], reverse=True
+            )[:limit]
+        for stats in fingerprints:
+            stats["avg_ms"] = stats["total_ms"] / stats["count"]
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "explain_interval": self.explain_interval,
+            "capacity": self.capacity,
+            "entries": entries,
+            "fingerprints": fingerprints,
+        }
@@ -0,0 +1,185 @@
+"""
+Route tests for asgi_app.py against an in-memory stand-in for the aiomysql pool
+
+Run with: python -m pytest test_asgi_app.py
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from starlette.testclient import TestClient
+
+import app as flask_app_module
+import asgi_app
+from app import (REVOKED_BEFORE_QUERY, SAVED_COMPARISONS_QUERY, SAVED_VERSION_QUERY,
+                 USER_PROFILE_QUERY, session_tokens)
+from search_index import NameIndex
+from ttl_cache import TTLCache
+
+USER = {"user_id": 7, "username": "alice", "email": "alice@example.com"}
+SAVED = [{"major_id": 3, "major_name": "Computer Science", "avg_salary": Decimal("85000.00"),
+          "job_count": 4, "saved_at": datetime(2024, 1, 2, 3, 4, 5)}]
+MAJORS = [{"major_id": 3, "major_name": "Computer Science", "interest_area_id": 1,
+           "average_salary": Decimal("85000.00"), "job_growth_rate": Decimal("2.10"),
+           "grads": Decimal("120")}]
+INTEREST_AREAS = [{"interest_area_id": 1, "name": "Technology"}]
+
+
+class FakeCursor:
+    def __init__(self, pool):
+        self.pool = pool
+        self.queries = pool.queries
+        self.rows = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        self.queries.append(query)
+        if query == USER_PROFILE_QUERY:
+            self.rows = [USER] if params[0] == USER["user_id"] else []
+        elif query == SAVED_VERSION_QUERY:
+            self.rows = [{"version": self.pool.saved_version}] if self.pool.saved_version else []
+        elif query == SAVED_COMPARISONS_QUERY:
+            self.rows = list(SAVED)
+        elif query == REVOKED_BEFORE_QUERY:
+            revoked_before = self.pool.revoked_before.get(params[0])
+            self.rows = [{"revoked_before": revoked_before}] if revoked_before else []
+        else:
+            self.rows = list(MAJORS)
+
+    async def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    async def fetchall(self):
+        return self.rows
+
+
+class FakePool:
+    def __init__(self):
+        self.queries = []
+        self.saved_version = 3
+        self.revoked_before = {}  # user_id -> SessionRevocation.revoked_before
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield SimpleNamespace(cursor=lambda *args: FakeCursor(self))
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(asgi_app, 'db_pool', pool)
+    monkeypatch.setattr(flask_app_module, 'interest_area_index',
+                        SimpleNamespace(current=NameIndex(INTEREST_AREAS, version=1)))
+    monkeypatch.setattr(asgi_app, 'saved_comparisons_cache', TTLCache())
+    monkeypatch.setattr(asgi_app, 'session_revocations', TTLCache())
+    return pool
+
+
+@pytest.fixture
+def client():
+    # No `with`: the lifespan would open real MySQL pools
+    return TestClient(asgi_app.app)
+
+
+def auth(user_id):
+    token, _ = session_tokens.issue(user_id)
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.parametrize('path', ['/saved-comparisons/7', '/bootstrap/7'])
+def test_per_user_routes_require_session(pool, client, path):
+    response = client.get(path)
+    assert response.status_code == 401
+    assert response.headers['www-authenticate'] == 'Bearer'
+    assert client.get(path, headers=auth(8)).status_code == 403
+    assert pool.queries == []
+
+
+def test_tokens_before_a_stored_revocation_are_rejected(pool, client, monkeypatch):
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(session_tokens, '_clock', lambda: now[0])
+    old = auth(7)
+    # A password change in another process stored this cutoff
+    now[0] += 0.000001
+    pool.revoked_before[7] = Decimal(str(session_tokens.now()))
+    response = client.get('/saved-comparisons/7', headers=old)
+    assert response.status_code == 401
+    assert response.json() == {"error": "Token revoked"}
+    assert pool.queries.count(SAVED_COMPARISONS_QUERY) == 0
+
+    # The cutoff is cached per user, and later tokens still work
+    assert client.get('/saved-comparisons/7', headers=auth(7)).status_code == 200
+    assert pool.queries.count(REVOKED_BEFORE_QUERY) == 1
+
+
+def test_saved_comparisons_cold_cache(pool, client):
+    response = client.get('/saved-comparisons/7', headers=auth(7))
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 1
+    assert body["saved_comparisons"][0]["avg_salary"] == "85000.00"
+    assert body["saved_comparisons"][0]["saved_at"] == "Tue, 02 Jan 2024 03:04:05 GMT"
+
+    # Second read is served from the cache
+    assert client.get('/saved-comparisons/7', headers=auth(7)).json() == body
+    assert pool.queries.count(SAVED_COMPARISONS_QUERY) == 1
+
+
+def test_saved_comparisons_reload_after_version_bump(pool, client):
+    client.get('/saved-comparisons/7', headers=auth(7))
+    # A write through any process bumps SavedComparisonVersion
+    pool.saved_version += 1
+    assert client.get('/saved-comparisons/7', headers=auth(7)).status_code == 200
+    assert pool.queries.count(SAVED_COMPARISONS_QUERY) == 2
+
+
+def test_bootstrap_cold_cache(pool, client):
+    response = client.get('/bootstrap/7', headers=auth(7))
+    assert response.status_code == 200
+    body = response.json()
+    assert body["user"] == USER
+    assert body["interest_areas"] == INTEREST_AREAS
+    assert body["majors"][0]["major_id"] == 3
+    assert body["saved_count"] == 1
+    assert pool.queries.count(SAVED_COMPARISONS_QUERY) == 1
+
+
+def test_bootstrap_builds_interest_area_index_when_warm_up_did_not(pool, client, monkeypatch):
+    index = SimpleNamespace(current=NameIndex(INTEREST_AREAS, version=1))
+    monkeypatch.setattr(flask_app_module, 'interest_area_index', None)
+    monkeypatch.setattr(asgi_app, 'get_interest_area_index', lambda: index)
+    response = client.get('/bootstrap/7', headers=auth(7))
+    assert response.status_code == 200
+    assert response.json()["interest_areas"] == INTEREST_AREAS
+
+
+def test_etag_watchers_are_built_off_the_event_loop(pool, client, monkeypatch):
+    calls = []
+
+    class Versions:
+        def etag(self, names, overrides=None):
+            return "interest_area.1"
+
+    def get_data_versions():
+        try:
+            asyncio.get_running_loop()
+            calls.append("event loop")
+        except RuntimeError:
+            calls.append("thread")
+        return Versions()
+
+    monkeypatch.setattr(flask_app_module, 'data_versions', None)
+    monkeypatch.setattr(flask_app_module, 'get_data_versions', get_data_versions)
+    response = client.get('/interest-areas')
+    assert response.status_code == 200
+    assert response.headers['etag'] == '"interest_area.1"'
+    assert calls == ["thread"]
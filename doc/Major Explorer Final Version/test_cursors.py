@@ -0,0 +1,82 @@
+"""
+Tests for the keyset pagination cursors in app.py
+
+Run with: python -m pytest test_cursors.py
+"""
+
+import base64
+import json
+from decimal import Decimal
+
+import pytest
+
+from app import decode_cursor, encode_cursor, keyset_condition
+
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+@pytest.mark.parametrize('value, row_id', [
+    (Decimal("85000.00"), 12),
+    (Decimal("-0.0125"), 1),
+    (2015, 7),
+    (None, 3),
+])
+def test_numeric_round_trip(value, row_id):
+    cursor = encode_cursor(value, row_id)
+    assert '=' not in cursor
+    decoded = decode_cursor(cursor)
+    assert decoded == (None if value is None else Decimal(value), row_id)
+
+
+def test_text_round_trip():
+    cursor = encode_cursor("Ökonomie & \"Design\"", 42)
+    assert decode_cursor(cursor, numeric=False) == ("Ökonomie & \"Design\"", 42)
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor("???>>>", 1)
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+
+@pytest.mark.parametrize('cursor', [
+    '',
+    'not a cursor',
+    '%%%',
+    'é',
+    raw_cursor(b'not json'),
+    raw_cursor(b'[1]'),
+    raw_cursor(b'[1, 2, 3]'),
+    raw_cursor(b'{"value": 1}'),
+    raw_cursor(b'["100", "x"]'),
+    raw_cursor(b'["100", null]'),
+    raw_cursor(b'[[1], 2]'),
+    raw_cursor(b'[{"a": 1}, 2]'),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize('value', ["abc", "1e", "NaN", "Infinity", "-inf", "sNaN"])
+def test_tampered_numeric_value_is_rejected(value):
+    cursor = raw_cursor(json.dumps([value, 5]).encode('utf-8'))
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+    # The same value is fine as a text sort key
+    assert decode_cursor(cursor, numeric=False) == (value, 5)
+
+
+def test_keyset_condition_ascending():
+    assert keyset_condition('c', 'id', 5, 9, False) == (
+        "(c > %s OR (c = %s AND id > %s))", [5, 5, 9])
+    assert keyset_condition('c', 'id', None, 9, False) == (
+        "((c IS NULL AND id > %s) OR c IS NOT NULL)", [9])
+
+
+def test_keyset_condition_descending():
+    assert keyset_condition('c', 'id', 5, 9, True) == (
+        "(c < %s OR (c = %s AND id < %s) OR c IS NULL)", [5, 5, 9])
+    assert keyset_condition('c', 'id', None, 9, True) == (
+        "(c IS NULL AND id < %s)", [9])
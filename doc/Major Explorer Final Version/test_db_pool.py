@@ -0,0 +1,207 @@
+"""
+Tests for db_pool.py
+
+Run with: python -m pytest test_db_pool.py
+"""
+
+import threading
+import time
+
+import pytest
+
+import db_pool
+from db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self, n):
+        self.n = n
+        self.closed = False
+        self.in_transaction = False
+        self.unread_result = False
+        self.autocommit = False
+        self.fail_ping = False
+        self.fail_reset = False
+        self.resets = 0
+        self.rollbacks = 0
+
+    def ping(self, reconnect=False):
+        if self.fail_ping:
+            raise OSError("gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def reset_session(self):
+        if self.fail_reset:
+            raise OSError("lost connection")
+        self.resets += 1
+
+    def cursor(self, *args, **kwargs):
+        return ("cursor", self.n)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    opened = []
+
+    def connect(**config):
+        opened.append(FakeConnection(len(opened)))
+        return opened[-1]
+
+    monkeypatch.setattr(db_pool.mysql.connector, 'connect', connect)
+    return opened
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(db_pool, 'time', clock)
+    return clock
+
+
+def test_returned_connection_is_reused(opened):
+    pool = ConnectionPool({}, size=2)
+    conn = pool.connect()
+    conn.close()
+    pool.connect().close()
+    assert len(opened) == 1
+    assert opened[0].resets == 2
+    assert not opened[0].closed
+
+
+def test_closed_proxy_refuses_use(opened):
+    pool = ConnectionPool({})
+    conn = pool.connect()
+    assert conn.cursor() == ("cursor", 0)
+    conn.close()
+    conn.close()  # idempotent
+    with pytest.raises(db_pool.errors.OperationalError):
+        conn.cursor()
+    assert pool.stats()["checked_out"] == 0
+
+
+def test_size_plus_overflow_bounds_open_connections(opened):
+    pool = ConnectionPool({}, size=1, max_overflow=1, timeout=0.05)
+    first, second = pool.connect(), pool.connect()
+    with pytest.raises(PoolTimeout):
+        pool.connect()
+    stats = pool.stats()
+    assert (stats["open"], stats["overflow"], stats["timeouts"]) == (2, 1, 1)
+
+    # Only `size` connections stay idle; the overflow one is closed
+    first.close()
+    second.close()
+    assert pool.stats()["idle"] == 1
+    assert [c.closed for c in opened] == [False, True]
+
+
+def test_waiter_gets_the_returned_connection(opened):
+    pool = ConnectionPool({}, size=1, max_overflow=0, timeout=5)
+    held = pool.connect()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.connect()))
+    waiter.start()
+    while pool.stats()["waiters"] < 1:
+        time.sleep(0.001)
+    held.close()
+    waiter.join(5)
+
+    assert got[0].n == 0
+    assert len(opened) == 1
+    assert pool.stats()["waits"] == 1
+
+
+def test_failed_connect_releases_the_slot(monkeypatch):
+    def connect(**config):
+        raise db_pool.errors.InterfaceError("refused")
+
+    monkeypatch.setattr(db_pool.mysql.connector, 'connect', connect)
+    pool = ConnectionPool({}, size=1, max_overflow=0, timeout=0.05)
+    for _ in range(3):
+        with pytest.raises(db_pool.errors.InterfaceError):
+            pool.connect()
+    assert pool.stats()["open"] == 0
+
+
+def test_open_transaction_is_rolled_back_on_checkin(opened):
+    pool = ConnectionPool({}, autocommit=True)
+    conn = pool.connect()
+    opened[0].in_transaction = True
+    opened[0].autocommit = False
+    conn.close()
+    assert opened[0].rollbacks == 1
+    assert opened[0].autocommit is True
+
+
+def test_connection_failing_reset_is_discarded(opened):
+    pool = ConnectionPool({})
+    conn = pool.connect()
+    opened[0].fail_reset = True
+    conn.close()
+    assert opened[0].closed
+    stats = pool.stats()
+    assert (stats["open"], stats["idle"], stats["discarded"]) == (0, 0, 1)
+
+
+def test_connection_with_unread_rows_is_discarded(opened):
+    pool = ConnectionPool({})
+    conn = pool.connect()
+    opened[0].unread_result = True
+    conn.close()
+    assert opened[0].closed
+    assert opened[0].resets == 0
+    assert pool.connect().n == 1
+
+
+def test_idle_connection_past_max_idle_is_replaced(opened, clock):
+    pool = ConnectionPool({}, max_idle=300, pre_ping=False)
+    pool.connect().close()
+    clock.now += 300
+    assert pool.connect().n == 0
+    clock.now += 301
+    fresh = pool.connect()
+    assert fresh.n == 1
+    assert opened[0].closed
+
+
+def test_connection_failing_ping_is_replaced(opened):
+    pool = ConnectionPool({})
+    pool.connect().close()
+    opened[0].fail_ping = True
+    assert pool.connect().n == 1
+    assert opened[0].closed
+    assert pool.stats()["open"] == 1
+
+
+def test_prefill_opens_up_to_size(opened):
+    pool = ConnectionPool({}, size=3)
+    pool.prefill(2)
+    assert (len(opened), pool.stats()["idle"]) == (2, 2)
+    pool.prefill()
+    pool.prefill(10)
+    assert (len(opened), pool.stats()["idle"]) == (3, 3)
+
+
+def test_dispose_closes_idle_and_returned_connections(opened):
+    pool = ConnectionPool({}, size=2)
+    pool.prefill()
+    held = pool.connect()
+    pool.dispose()
+    assert [c.closed for c in opened] == [True, False]
+
+    held.close()
+    assert all(c.closed for c in opened)
+    assert pool.stats()["open"] == 0
@@ -0,0 +1,176 @@
+"""
+Tests for db_router.py
+
+Run with: python -m pytest test_db_router.py
+"""
+
+import mysql.connector
+import pytest
+
+import app as flask_app_module
+from db_router import ReplicaRouter
+
+NOW = 1_700_000_000.0
+
+
+class Clock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCursor:
+    def __init__(self, replica):
+        self.replica = replica
+        self.rows = None
+
+    def execute(self, query):
+        self.replica.queries.append(query)
+        if self.replica.error is not None:
+            raise self.replica.error
+        if query == "SHOW REPLICA STATUS" and self.replica.legacy:
+            raise mysql.connector.ProgrammingError("You have an error in your SQL syntax")
+        self.rows = self.replica.rows
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeReplica:
+    """Stands in for the replica server; connect() opens a session to it"""
+
+    def __init__(self, lag=0):
+        self.rows = [{"Seconds_Behind_Source": lag}]
+        self.legacy = False
+        self.error = None
+        self.queries = []
+        self.connections = 0
+        self.closed = 0
+
+    def connect(self):
+        self.connections += 1
+        return self
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def close(self):
+        self.closed += 1
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def wall_clock():
+    return Clock(NOW)
+
+
+@pytest.fixture
+def replica():
+    return FakeReplica()
+
+
+@pytest.fixture
+def router(replica, clock, wall_clock):
+    return ReplicaRouter(replica.connect, max_lag=5, sticky_window=10, lag_interval=1,
+                         clock=clock, wall_clock=wall_clock)
+
+
+def test_no_lag_check_yet_reads_from_primary(router):
+    assert router.use_replica() is False
+    assert router.stats()["lag_fallbacks"] == 1
+
+
+@pytest.mark.parametrize('lag, replica_ok', [(0, True), (5, True), (6, False)])
+def test_lag_threshold(router, replica, lag, replica_ok):
+    replica.rows = [{"Seconds_Behind_Source": lag}]
+    assert router.check_lag() == lag
+    assert router.use_replica() is replica_ok
+
+
+def test_stopped_replication_reads_from_primary(router, replica):
+    replica.rows = [{"Seconds_Behind_Source": 0}, {"Seconds_Behind_Source": None}]
+    assert router.check_lag() is None
+    assert router.use_replica() is False
+
+
+def test_server_without_replication_counts_as_caught_up(router, replica):
+    replica.rows = []
+    assert router.check_lag() == 0
+    assert router.use_replica() is True
+
+
+def test_older_servers_fall_back_to_show_slave_status(router, replica):
+    replica.legacy = True
+    replica.rows = [{"Seconds_Behind_Master": 2}]
+    assert router.check_lag() == 2
+    assert replica.queries == ["SHOW REPLICA STATUS", "SHOW SLAVE STATUS"]
+
+
+def test_failed_probe_reconnects_on_the_next_check(router, replica):
+    router.check_lag()
+    replica.error = mysql.connector.OperationalError("Lost connection")
+    assert router.check_lag() is None
+    assert router.use_replica() is False
+    assert replica.closed == 1
+
+    replica.error = None
+    assert router.check_lag() == 0
+    assert replica.connections == 2
+    assert router.use_replica() is True
+
+
+def test_stale_lag_reading_reads_from_primary(router, clock):
+    router.check_lag()
+    clock.now = 3
+    assert router.use_replica() is True
+    clock.now = 3.5
+    assert router.use_replica() is False
+
+
+def test_replica_failure_holds_until_the_next_good_check(router):
+    router.check_lag()
+    router.replica_failed(mysql.connector.InterfaceError("Can't connect"))
+    assert router.use_replica() is False
+    assert router.stats()["replica_errors"] == 1
+    router.check_lag()
+    assert router.use_replica() is True
+
+
+def test_recent_write_pins_reads_to_the_primary(router):
+    router.check_lag()
+    assert router.use_replica(wrote_at=NOW - 9.9) is False
+    assert router.use_replica(wrote_at=NOW - 10) is True
+    assert router.use_replica(wrote_at=None) is True
+    stats = router.stats()
+    assert (stats["sticky_reads"], stats["replica_reads"]) == (1, 2)
+
+
+class FailingPool:
+    def connect(self):
+        raise mysql.connector.InterfaceError("Can't connect to replica")
+
+
+def test_read_connection_falls_back_to_the_primary(monkeypatch, router, wall_clock):
+    router.check_lag()
+    primary = object()
+    monkeypatch.setattr(flask_app_module, 'get_replica_router', lambda: router)
+    monkeypatch.setattr(flask_app_module, 'get_replica_pool', FailingPool)
+    monkeypatch.setattr(flask_app_module, 'get_db_connection', lambda: primary)
+
+    assert flask_app_module.get_read_connection() is primary
+    assert router.stats()["replica_errors"] == 1
+    assert router.use_replica() is False
+
+    # A session that just wrote never touches the replica pool
+    router.check_lag()
+    monkeypatch.setattr(flask_app_module, 'get_replica_pool', None)
+    assert flask_app_module.get_read_connection({"wrt": wall_clock.now - 1}) is primary
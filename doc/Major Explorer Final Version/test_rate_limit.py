@@ -0,0 +1,126 @@
+"""
+Tests for rate_limit.py
+
+Run with: python -m pytest test_rate_limit.py
+"""
+
+import pytest
+
+import app as flask_app_module
+from rate_limit import RateLimited, RouteRateLimit, TokenBucketLimiter, parse_rate
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.mark.parametrize('spec, expected', [
+    ("20/60", (20, 60.0)),
+    (" 5/0.5 ", (5, 0.5)),
+    ("3", (3, 1.0)),
+    ("", None),
+    (None, None),
+    ("0", None),
+    ("OFF", None),
+])
+def test_parse_rate(spec, expected):
+    assert parse_rate(spec) == expected
+
+
+@pytest.mark.parametrize('spec', ["-1/60", "5/0", "x/60", "5/y"])
+def test_parse_rate_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        parse_rate(spec)
+
+
+def test_burst_up_to_limit_then_wait(clock):
+    limiter = TokenBucketLimiter(3, 60, clock=clock)
+    assert [limiter.hit('a') for _ in range(3)] == [0, 0, 0]
+    assert limiter.hit('a') == pytest.approx(20)
+    assert limiter.hit('b') == 0  # keys are independent
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_tokens_refill_continuously(clock):
+    limiter = TokenBucketLimiter(3, 60, clock=clock)
+    for _ in range(3):
+        limiter.hit('a')
+    clock.now = 5
+    assert limiter.hit('a') == pytest.approx(15)
+    clock.now = 20
+    assert limiter.hit('a') == 0
+    assert limiter.hit('a') == pytest.approx(20)
+
+
+def test_refill_is_capped_at_limit(clock):
+    limiter = TokenBucketLimiter(2, 60, clock=clock)
+    limiter.hit('a')
+    clock.now = 59  # far more than one token's worth of time, still tracked
+    assert [limiter.hit('a') for _ in range(3)] == [0, 0, pytest.approx(30)]
+
+
+def test_idle_buckets_expire_oldest_first(clock):
+    limiter = TokenBucketLimiter(5, 60, clock=clock)
+    limiter.hit('a')
+    clock.now = 10
+    limiter.hit('b')
+    clock.now = 60
+    limiter.hit('c')
+    assert limiter.stats() == {"keys": 2, "rejected": 0, "evicted": 1}
+    clock.now = 70
+    limiter.hit('c')
+    assert limiter.stats()["keys"] == 1
+
+
+def test_max_keys_evicts_least_recently_used(clock):
+    limiter = TokenBucketLimiter(1, 60, max_keys=2, clock=clock)
+    limiter.hit('a')
+    limiter.hit('b')
+    clock.now = 1
+    assert limiter.hit('a') > 0  # a is now the most recently used
+    limiter.hit('c')
+    assert limiter.stats()["evicted"] == 1
+    assert limiter.hit('b') == 0  # forgotten, so it starts with a full bucket
+    assert limiter.hit('c') > 0
+
+
+def test_route_limit_checks_ip_and_normalised_identity():
+    limit = RouteRateLimit(ip_rate=(100, 60), identity_rate=(1, 60))
+    limit.check('10.0.0.1', 'Alice@Example.com')
+    with pytest.raises(RateLimited) as raised:
+        limit.check('10.0.0.2', '  alice@example.com ')
+    assert raised.value.retry_after == 60
+    limit.check('10.0.0.2', None)
+    limit.check(None, 'bob')
+    assert limit.stats()["ip_keys"] == 2
+    assert limit.stats()["identity_rejected"] == 1
+
+
+def test_retry_after_rounds_up_to_whole_seconds():
+    limit = RouteRateLimit(ip_rate=(4, 1))
+    for _ in range(4):
+        limit.check('10.0.0.1')
+    with pytest.raises(RateLimited) as raised:
+        limit.check('10.0.0.1')
+    assert raised.value.retry_after == 1
+
+
+def test_login_answers_429_with_retry_after(monkeypatch):
+    monkeypatch.setitem(flask_app_module.rate_limits, 'login', RouteRateLimit(ip_rate=(1, 30)))
+    client = flask_app_module.app.test_client()
+
+    # The limit is checked before validation or any database work
+    assert client.post('/login', json={}).status_code == 400
+    response = client.post('/login', json={})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '30'
+    assert response.get_json() == {"error": "Too many attempts, please try again later"}
@@ -0,0 +1,234 @@
+"""
+Tests for response_encoding.py and the compression hooks in app.py / asgi_app.py
+
+Run with: python -m pytest test_response_encoding.py
+"""
+
+import gzip
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from starlette.responses import Response
+from starlette.testclient import TestClient
+
+import app as flask_app_module
+import asgi_app
+import response_encoding
+from response_encoding import (COMPACT, FastJSONProvider, choose_encoding, compress,
+                               should_compress)
+
+needs_orjson = pytest.mark.skipif(response_encoding.orjson is None, reason="orjson not installed")
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+@pytest.fixture
+def providers(app):
+    # The providers only hold a weak reference to `app`
+    return FastJSONProvider(app), DefaultJSONProvider(app)
+
+
+def stdlib_bytes(default, obj):
+    return default.dumps(obj, separators=COMPACT).encode('ascii') + b"\n"
+
+
+@pytest.mark.parametrize('obj', [
+    {"b": 1, "a": [True, None, "x"]},
+    {"name": "Ökonomie", "city": "東京", "emoji": "😀"},
+    {"values": [1e16, 1.5e-7, 0.00001, -0.00001, 0.0001, 2.5e+20, 1e300, 123.456]},
+    [1e-05],
+    -0.00002,
+    {"text": "a\x7fb", "key\x7f": 1},
+    {"ctrl": "tab\there\nnewline \"quoted\" \\ \x01"},
+    {"salary": Decimal("85000.00"), "growth": Decimal("-0.0125")},
+    {"day": date(2024, 1, 2), "at": datetime(2024, 1, 2, 3, 4, 5),
+     "utc": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)},
+    {"big": 2 ** 70, "small": -2 ** 63},
+    {1: "a", 2: "b"},
+])
+def test_same_bytes_as_the_default_provider(providers, obj):
+    fast, default = providers
+    assert fast.encode(obj) == stdlib_bytes(default, obj)
+    assert fast.dumps(obj, separators=COMPACT) == default.dumps(obj, separators=COMPACT)
+
+
+@needs_orjson
+@pytest.mark.parametrize('obj', [
+    {"name": "Ökonomie"},
+    {"value": 1e16},
+    {"value": 0.00001},
+    {1: "a"},
+    {"big": 2 ** 70},
+])
+def test_outputs_orjson_would_change_fall_back(providers, obj):
+    fast, _ = providers
+    fast.encode(obj)
+    assert fast.stats()["fallbacks"] == 1
+    assert fast.stats()["fast"] == 0
+
+
+@needs_orjson
+def test_del_is_escaped_on_the_fast_path(providers):
+    fast, _ = providers
+    assert fast.encode({"text": "a\x7fb"}) == b'{"text":"a\\u007fb"}\n'
+    assert fast.stats() == {"fast": 1, "fallbacks": 0, "orjson": 1}
+
+
+@needs_orjson
+@pytest.mark.parametrize('value', [float('nan'), float('inf'), float('-inf')])
+def test_non_finite_floats_become_null(providers, value):
+    fast, default = providers
+    assert fast.encode({"x": value}) == b'{"x":null}\n'
+    assert b'null' not in stdlib_bytes(default, {"x": value})
+
+
+def test_stdlib_encoder_matches_the_default_provider(app):
+    fast = FastJSONProvider(app, encoder='json')
+    obj = {"value": 1e16, "name": "Ökonomie"}
+    assert fast.encode(obj) == stdlib_bytes(DefaultJSONProvider(app), obj)
+    with pytest.raises(ValueError):
+        FastJSONProvider(app, encoder='ujson')
+
+
+def test_jsonify_response_matches_the_default_provider(app, providers):
+    fast, default = providers
+    obj = {"b": [1.5, Decimal("2.50")], "a": "Ökonomie"}
+    with app.app_context():
+        assert fast.response(obj).get_data() == default.response(obj).get_data()
+        assert fast.response(obj).mimetype == 'application/json'
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None),
+    ('', None),
+    ('identity', None),
+    ('gzip', 'gzip'),
+    ('gzip;q=0, deflate', None),
+    ('deflate, gzip;q=0.5', 'gzip'),
+    ('*', 'gzip'),
+])
+def test_choose_encoding_without_brotli(monkeypatch, header, expected):
+    monkeypatch.setattr(response_encoding, 'brotli', None)
+    assert choose_encoding(header) == expected
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip, deflate, br', 'br'),
+    ('br;q=0.5, gzip', 'gzip'),
+    ('br', 'br'),
+    ('gzip', 'gzip'),
+])
+def test_choose_encoding_prefers_brotli_when_available(monkeypatch, header, expected):
+    # choose_encoding() only checks that the module imported
+    monkeypatch.setattr(response_encoding, 'brotli', object())
+    assert choose_encoding(header) == expected
+
+
+@pytest.mark.parametrize('content_type, content_encoding, size, min_size, expected', [
+    ('application/json', None, 2000, 1024, True),
+    ('text/csv', None, 1024, 1024, True),
+    ('application/json', None, 1023, 1024, False),
+    ('application/json', 'gzip', 2000, 1024, False),
+    ('image/png', None, 2000, 1024, False),
+    (None, None, 2000, 1024, False),
+    ('application/json', None, 2000, None, False),
+])
+def test_should_compress(content_type, content_encoding, size, min_size, expected):
+    assert should_compress(content_type, content_encoding, size, min_size) is expected
+
+
+def test_gzip_round_trip_is_deterministic():
+    body = b'{"a":1}' * 500
+    assert compress(body, 'gzip') == compress(body, 'gzip')
+    assert gzip.decompress(compress(body, 'gzip')) == body
+
+
+def test_brotli_round_trip():
+    brotli = pytest.importorskip('brotli')
+    body = b'{"a":1}' * 500
+    assert brotli.decompress(compress(body, 'br')) == body
+
+
+BODY = {"majors": [{"major_id": i, "major_name": f"Major {i}"} for i in range(100)]}
+
+
+def flask_response(accept_encoding):
+    app = flask_app_module.app
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+    with app.test_request_context('/majors', headers=headers):
+        response = app.json.response(BODY)
+        response.set_etag('v1')
+        return flask_app_module.compress_response(response)
+
+
+@pytest.fixture
+def min_size(monkeypatch):
+    monkeypatch.setattr(flask_app_module, 'compress_min_size', 1024)
+    monkeypatch.setattr(asgi_app, 'compress_min_size', 1024)
+    monkeypatch.setattr(response_encoding, 'brotli', None)
+
+
+def test_flask_gzips_large_json_and_weakens_the_etag(min_size):
+    response = flask_response('gzip, deflate')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.headers['ETag'] == 'W/"v1"'
+    assert json.loads(gzip.decompress(response.get_data())) == BODY
+
+
+def test_flask_leaves_the_body_alone_without_accept_encoding(min_size):
+    response = flask_response(None)
+    assert 'Content-Encoding' not in response.headers
+    # Still varies: a client that accepts gzip would get a different body
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.headers['ETag'] == '"v1"'
+    assert json.loads(response.get_data()) == BODY
+
+
+def test_flask_skips_small_bodies(min_size, monkeypatch):
+    monkeypatch.setattr(flask_app_module, 'compress_min_size', 1_000_000)
+    response = flask_response('gzip')
+    assert 'Content-Encoding' not in response.headers
+    assert 'Vary' not in response.headers
+
+
+def asgi_client(etag='"v1"', content_type='application/json'):
+    body = json.dumps(BODY).encode('ascii')
+
+    async def endpoint(scope, receive, send):
+        headers = {'ETag': etag} if etag else {}
+        await Response(body, media_type=content_type, headers=headers)(scope, receive, send)
+
+    return TestClient(asgi_app.CompressionMiddleware(endpoint))
+
+
+def test_asgi_gzips_large_json_and_weakens_the_etag(min_size):
+    response = asgi_client().get('/', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert response.headers['etag'] == 'W/"v1"'
+    assert int(response.headers['content-length']) < len(json.dumps(BODY))
+    assert response.json() == BODY  # httpx decodes the gzip body
+
+
+def test_asgi_keeps_weak_etags_and_identity_bodies(min_size):
+    response = asgi_client(etag='W/"v1"').get('/', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['etag'] == 'W/"v1"'
+
+    response = asgi_client().get('/', headers={'Accept-Encoding': 'identity'})
+    assert 'content-encoding' not in response.headers
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert response.headers['etag'] == '"v1"'
+
+
+def test_asgi_skips_other_content_types(min_size):
+    response = asgi_client(content_type='image/png').get('/', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in response.headers
+    assert 'vary' not in response.headers
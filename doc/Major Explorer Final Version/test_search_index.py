@@ -0,0 +1,130 @@
+"""
+Tests for search_index.py
+
+Run with: python -m pytest test_search_index.py
+"""
+
+import pytest
+
+from search_index import LOAD_QUERY, VERSION_QUERY, InterestAreaIndex, NameIndex
+
+AREAS = [
+    {"interest_area_id": 1, "name": "Engineering"},
+    {"interest_area_id": 2, "name": "Computer Science"},
+    {"interest_area_id": 3, "name": "Social Sciences"},
+    {"interest_area_id": 4, "name": "Science"},
+    {"interest_area_id": 5, "name": "Environmental Science"},
+    {"interest_area_id": 6, "name": "Arts"},
+    {"interest_area_id": 7, "name": "Liberal Arts"},
+]
+
+
+def names(results):
+    return [row["name"] for row in results]
+
+
+@pytest.fixture
+def index():
+    return NameIndex(AREAS, version=1)
+
+
+def test_ranks_exact_then_prefix_then_word_prefix_then_substring(index):
+    assert names(index.search("science")) == [
+        "Science",                # exact
+        "Computer Science",       # word prefix, alphabetical
+        "Environmental Science",
+        "Social Sciences",
+    ]
+    assert names(index.search("scien")) == [
+        "Science",                # name prefix
+        "Computer Science",       # word prefix
+        "Environmental Science",
+        "Social Sciences",
+    ]
+    assert names(index.search("ience")) == [
+        "Computer Science",       # substring, alphabetical
+        "Environmental Science",
+        "Science",
+        "Social Sciences",
+    ]
+    assert names(index.search("arts")) == ["Arts", "Liberal Arts"]
+    assert names(index.search("ts")) == ["Arts", "Liberal Arts"]  # substring only
+
+
+@pytest.mark.parametrize('query', ["e", "en", "eng", "engi", "ngineer"])
+def test_short_and_long_queries_find_substrings(index, query):
+    expected = [row["name"] for row in AREAS if query in row["name"].casefold()]
+    assert sorted(names(index.search(query))) == sorted(expected)
+
+
+def test_long_query_verifies_the_whole_substring(index):
+    # "Engineering" contains both trigrams of "ingi" ("ing", "ngi") but not "ingi" itself
+    assert index.search("ingi") == []
+
+
+def test_query_is_trimmed_and_case_folded(index):
+    assert names(index.search("  COMPUTER ")) == ["Computer Science"]
+
+
+def test_blank_query_and_limit(index):
+    assert index.search("   ") == []
+    assert names(index.search("s", limit=2)) == ["Science", "Social Sciences"]
+
+
+def test_results_are_plain_rows(index):
+    assert index.search("arts")[0] == {"interest_area_id": 6, "name": "Arts"}
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = None
+
+    def execute(self, query, params=None):
+        self.db.queries.append(query)
+        if query == VERSION_QUERY:
+            self.result = [{"version": self.db.version}]
+        elif query == LOAD_QUERY:
+            self.result = list(self.db.rows)
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeDB:
+    def __init__(self):
+        self.version = 1
+        self.rows = AREAS[:2]
+        self.queries = []
+
+    def connect(self):
+        return self
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def close(self):
+        pass
+
+
+def test_index_rebuilds_only_when_the_version_changes():
+    db = FakeDB()
+    areas = InterestAreaIndex(db.connect)
+    areas.load()
+    assert names(areas.search("art")) == []
+
+    assert areas.check() is False
+    assert db.queries.count(LOAD_QUERY) == 1
+
+    db.rows = AREAS
+    db.version = 2
+    assert areas.check() is True
+    assert db.queries.count(LOAD_QUERY) == 2
+    assert areas.current.version == 2
+    assert names(areas.search("art")) == ["Arts", "Liberal Arts"]
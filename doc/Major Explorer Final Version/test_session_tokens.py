@@ -0,0 +1,166 @@
+"""
+Tests for session_tokens.py
+
+Run with: python -m pytest test_session_tokens.py
+"""
+
+import pytest
+
+from session_tokens import InvalidToken, SessionTokens, _b64decode, _b64encode, parse_keys
+
+NOW = 1_700_000_000.0
+
+
+class Clock:
+    def __init__(self, now=NOW):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def tokens(clock):
+    return SessionTokens(parse_keys("k1:first-secret"), ttl=3600, clock=clock)
+
+
+def test_issue_and_verify(tokens):
+    token, expires_at = tokens.issue(7, wrote_at=NOW - 0.25)
+    claims = tokens.verify(token)
+    assert claims["uid"] == 7
+    assert claims["exp"] == expires_at == int(NOW) + 3600
+    assert claims["wrt"] == NOW - 0.25
+
+
+@pytest.mark.parametrize('token', [None, '', 'no-dot', 'not-base64!.sig', _b64encode(b'[1]') + '.sig'])
+def test_malformed_tokens_are_rejected(tokens, token):
+    with pytest.raises(InvalidToken, match="Malformed"):
+        tokens.verify(token)
+
+
+def test_tampered_payload_is_rejected(tokens):
+    token, _ = tokens.issue(7)
+    payload, signature = token.split('.')
+    forged = _b64encode(_b64decode(payload).replace(b'"uid":7', b'"uid":8'))
+    with pytest.raises(InvalidToken, match="Bad signature"):
+        tokens.verify(f"{forged}.{signature}")
+
+
+def test_signature_from_another_secret_is_rejected(tokens, clock):
+    other = SessionTokens(parse_keys("k1:other-secret"), clock=clock)
+    token, _ = other.issue(7)
+    with pytest.raises(InvalidToken, match="Bad signature"):
+        tokens.verify(token)
+
+
+def test_expired_token_is_rejected(tokens, clock):
+    token, expires_at = tokens.issue(7)
+    clock.now = expires_at - 1
+    tokens.verify(token)
+    clock.now = expires_at
+    with pytest.raises(InvalidToken, match="expired"):
+        tokens.verify(token)
+
+
+def test_replacement_token_keeps_the_original_expiry(tokens, clock):
+    _, expires_at = tokens.issue(7)
+    clock.now += 600
+    token, replaced_expiry = tokens.issue(7, expires_at=expires_at)
+    assert replaced_expiry == expires_at
+    assert tokens.verify(token)["exp"] == expires_at
+
+
+def test_key_rotation(clock):
+    old = SessionTokens(parse_keys("k1:first-secret"), clock=clock)
+    old_token, _ = old.issue(7)
+
+    rotated = SessionTokens(parse_keys("k2:second-secret,k1:first-secret"), clock=clock)
+    new_token, _ = rotated.issue(7)
+    assert rotated.verify(new_token)["kid"] == "k2"
+    # Tokens signed with the retiring key keep working ...
+    assert rotated.verify(old_token)["kid"] == "k1"
+
+    # ... until it is dropped from the list
+    retired = SessionTokens(parse_keys("k2:second-secret"), clock=clock)
+    retired.verify(new_token)
+    with pytest.raises(InvalidToken, match="Unknown signing key"):
+        retired.verify(old_token)
+
+
+def test_revoke(tokens):
+    token, _ = tokens.issue(7)
+    other, _ = tokens.issue(7)
+    tokens.revoke(token)
+    with pytest.raises(InvalidToken, match="revoked"):
+        tokens.verify(token)
+    tokens.verify(other)
+
+
+def test_revoke_user_cuts_off_earlier_tokens_in_the_same_second(tokens, clock):
+    before, _ = tokens.issue(7)
+    other_user, _ = tokens.issue(8)
+    clock.now += 0.2
+    tokens.revoke_user(7)
+    clock.now += 0.2
+    after, _ = tokens.issue(7)
+
+    with pytest.raises(InvalidToken, match="revoked"):
+        tokens.verify(before)
+    assert tokens.verify(after)["uid"] == 7
+    assert tokens.verify(other_user)["uid"] == 8
+
+
+def test_token_issued_at_the_revocation_instant_survives(tokens):
+    tokens.revoke_user(7)
+    token, _ = tokens.issue(7)
+    tokens.verify(token)
+
+
+def test_revoke_user_with_a_stored_cutoff(tokens, clock):
+    before, _ = tokens.issue(7)
+    clock.now += 0.000001
+    cutoff = tokens.now()
+    clock.now += 5
+    after_cutoff, _ = tokens.issue(7)
+    assert tokens.revoke_user(7, cutoff) == cutoff
+
+    with pytest.raises(InvalidToken, match="revoked"):
+        tokens.verify(before)
+    tokens.verify(after_cutoff)
+
+
+def test_check_revoked_against_another_process_cutoff(tokens, clock):
+    before, _ = tokens.issue(7)
+    clock.now += 0.000001
+    cutoff = tokens.now()  # as read back from SessionRevocation
+    at_cutoff, _ = tokens.issue(7)
+
+    with pytest.raises(InvalidToken, match="revoked"):
+        tokens.check_revoked(tokens.verify(before), cutoff)
+    tokens.check_revoked(tokens.verify(at_cutoff), cutoff)
+    tokens.check_revoked(tokens.verify(before), None)
+
+
+def test_revocations_are_pruned_after_expiry(tokens, clock):
+    token, _ = tokens.issue(7)
+    tokens.revoke(token)
+    tokens.revoke_user(8)
+    assert tokens.stats()["revoked_tokens"] == 1
+    assert tokens.stats()["revoked_users"] == 1
+
+    clock.now += 3600 + 1
+    fresh, _ = tokens.issue(9)
+    tokens.verify(fresh)
+    assert tokens.stats()["revoked_tokens"] == 0
+    assert tokens.stats()["revoked_users"] == 0
+
+
+@pytest.mark.parametrize('spec', ["no-separator", ":secret", "kid:"])
+def test_parse_keys_rejects_bad_entries(spec):
+    with pytest.raises(ValueError):
+        parse_keys(spec)
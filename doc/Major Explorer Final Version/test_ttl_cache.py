@@ -0,0 +1,190 @@
+"""
+Tests for ttl_cache.py
+
+Run with: python -m pytest test_ttl_cache.py
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ttl_cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def loader(value, calls):
+    def load():
+        calls.append(value)
+        return value
+    return load
+
+
+def test_hit_after_miss(clock):
+    cache = TTLCache(capacity=10, ttl=30, clock=clock)
+    calls = []
+    assert cache.get('a', loader(1, calls)) == 1
+    assert cache.get('a', loader(2, calls)) == 1
+    assert calls == [1]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(capacity=10, ttl=30, clock=clock)
+    calls = []
+    cache.get('a', loader(1, calls))
+    clock.now = 29.9
+    assert cache.get('a', loader(2, calls)) == 1
+    clock.now = 30
+    assert cache.get('a', loader(2, calls)) == 2
+    assert calls == [1, 2]
+    assert cache.stats()["expirations"] == 1
+
+
+def test_expired_keys_are_purged_without_being_read(clock):
+    cache = TTLCache(capacity=10, ttl=30, clock=clock)
+    for key in 'abc':
+        cache.get(key, lambda: key)
+    clock.now = 31
+    cache.get('d', lambda: 'd')
+    assert cache.stats()["size"] == 1
+    assert cache.stats()["expirations"] == 3
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(capacity=2, ttl=30, clock=clock)
+    calls = []
+    cache.get('a', loader('a', calls))
+    cache.get('b', loader('b', calls))
+    cache.get('a', loader('a', calls))  # 'b' is now least recently used
+    cache.get('c', loader('c', calls))
+    assert cache.stats()["evictions"] == 1
+    cache.get('a', loader('a', calls))
+    cache.get('b', loader('b', calls))
+    assert calls == ['a', 'b', 'c', 'b']
+
+
+def test_zero_capacity_caches_nothing(clock):
+    cache = TTLCache(capacity=0, ttl=30, clock=clock)
+    calls = []
+    cache.get('a', loader(1, calls))
+    cache.get('a', loader(1, calls))
+    assert calls == [1, 1]
+
+
+def test_failed_load_is_not_cached(clock):
+    cache = TTLCache(capacity=10, ttl=30, clock=clock)
+
+    def fail():
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        cache.get('a', fail)
+    assert cache.get('a', lambda: 1) == 1
+    assert cache.stats()["loading"] == 0
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'value'
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get('k', slow_load)))
+    leader.start()
+    started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(cache.get('k', slow_load)))
+               for _ in range(4)]
+    for thread in waiters:
+        thread.start()
+    while cache.stats()["coalesced"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + waiters:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ['value'] * 5
+
+
+def test_waiters_see_the_leaders_error():
+    cache = TTLCache()
+    started, release = threading.Event(), threading.Event()
+
+    def failing_load():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("db down")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get('k', failing_load)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    while cache.stats()["coalesced"] < 1:
+        time.sleep(0.001)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+    assert errors == ["db down", "db down"]
+
+
+def test_get_async_coalesces_misses():
+    cache = TTLCache()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 'value'
+
+    async def main():
+        return await asyncio.gather(*(cache.get_async('k', load) for _ in range(5)))
+
+    assert asyncio.run(main()) == ['value'] * 5
+    assert calls == [1]
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_get_async_error_reaches_every_waiter():
+    cache = TTLCache()
+
+    async def load():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    async def main():
+        return await asyncio.gather(*(cache.get_async('k', load) for _ in range(3)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [str(e) for e in results] == ["db down"] * 3
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,148 @@
+"""
+Bounded LRU + TTL cache with coalesced misses
+
+Used by app.py for each user's saved-comparisons list, the session
+revocation cutoffs and the X-Total-Count results. An entry lives until it is the least recently used
+one past `capacity` or until `ttl` seconds after it was loaded; nothing
+is invalidated in place. Callers whose data changes put a version in the
+key instead (the saved-comparisons cache keys on SavedComparisonVersion),
+so a write shows up as a miss in every process. Expired entries are also
+swept out once per `ttl`, so keys that are never read again, including
+superseded versions, do not linger.
+
+Concurrent misses on one key share a single load: the first caller runs
+it, the others wait for its result (get() for threads, get_async() for
+the ASGI event loop).
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Load:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self, done):
+        self.done = done
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    def __init__(self, capacity=10000, ttl=30.0, clock=time.monotonic):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._loading = {}             # key -> _Load
+        self._lock = threading.Lock()
+        self._next_purge = clock() + ttl
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0,
+                       "expirations": 0}
+
+    def _lookup(self, key):
+        """(True, value) on a fresh hit; caller holds the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= self._clock():
+            del self._entries[key]
+            self._stats["expirations"] += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return True, entry[1]
+
+    def _purge(self, now):
+        """Drop every expired entry; caller holds the lock"""
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        self._stats["expirations"] += len(expired)
+        self._next_purge = now + self.ttl
+
+    def _store(self, key, load, value):
+        with self._lock:
+            if self._loading.get(key) is load:
+                del self._loading[key]
+            if self.capacity <= 0:
+                return
+            now = self._clock()
+            if now >= self._next_purge:
+                self._purge(now)
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _abandon(self, key, load):
+        with self._lock:
+            if self._loading.get(key) is load:
+                del self._loading[key]
+
+    def get(self, key, load_fn):
+        """Cached value for `key`, calling load_fn() at most once per miss"""
+        with self._lock:
+            hit, value = self._lookup(key)
+            if hit:
+                return value
+            load = self._loading.get(key)
+            leader = load is None
+            if leader:
+                load = self._loading[key] = _Load(threading.Event())
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            load.done.wait()
+            if load.error is not None:
+                raise load.error
+            return load.value
+        try:
+            load.value = load_fn()
+        except BaseException as e:
+            load.error = e
+            self._abandon(key, load)
+            raise
+        finally:
+            load.done.set()
+        self._store(key, load, load.value)
+        return load.value
+
+    async def get_async(self, key, load_fn):
+        """get() for coroutines: load_fn() returns an awaitable"""
+        with self._lock:
+            hit, value = self._lookup(key)
+            if hit:
+                return value
+            load = self._loading.get(key)
+            leader = load is None
+            if leader:
+                load = self._loading[key] = _Load(asyncio.get_running_loop().create_future())
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            # shield: one cancelled waiter must not cancel the shared load
+            return await asyncio.shield(load.done)
+        try:
+            value = await load_fn()
+        except BaseException as e:
+            self._abandon(key, load)
+            if isinstance(e, asyncio.CancelledError):
+                load.done.cancel()
+            else:
+                load.done.set_exception(e)
+                load.done.exception()  # mark retrieved when nobody else waits
+            raise
+        load.done.set_result(value)
+        self._store(key, load, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._entries), capacity=self.capacity,
+                        loading=len(self._loading))